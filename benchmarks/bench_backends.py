@@ -0,0 +1,49 @@
+"""
+Parse time of the CSS definitions of the fixture pages (tests/assets/css) with the lxml
+engine and every installed backend supporting them.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_backends [--repeat 10]
+"""
+import argparse
+import time
+
+from pyparsy import Parsy
+from pyparsy.backends import BACKENDS
+from benchmarks.bench_parse import ASSETS, FIXTURES
+
+
+def bench(function, repeat: int) -> float:
+    function()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--repeat", type=int, default=10)
+    args = arg_parser.parse_args()
+
+    backends = ["lxml"]
+    for name, backend in BACKENDS.items():
+        if backend.available():
+            backends.append(name)
+        else:
+            print(f"backend {name} skipped, {backend.requires} is not installed")
+    print(f"{'fixture':<22}" + "".join(f" {name:>10}" for name in backends) + "  (ms)")
+    for name in FIXTURES:
+        html = (ASSETS / f"{name}.html").read_text()
+        timings = []
+        for backend in backends:
+            parser = Parsy.from_file(ASSETS / "css" / f"{name}.yaml", backend=backend)
+            timings.append(bench(lambda: parser.parse(html), args.repeat))
+        print(f"{name:<22}" + "".join(f" {timing:10.2f}" for timing in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Overhead of a budget on the parse time of the fixture pages, and the latency of adversarial
+pages with and without a budget.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_budget [--repeat 10]
+"""
+import argparse
+import time
+
+from pyparsy import Budget, Parsy
+from benchmarks.bench_parse import ASSETS, FIXTURES
+
+# Field and page timeouts of the adversarial pages
+FIELD_TIMEOUT = 0.1
+PAGE_TIMEOUT = 0.25
+
+ADVERSARIAL = {
+    "backtracking regex": (
+        {"slow": {"selector": r"(a+)+$", "selector_type": "REGEX", "return_type": "STRING"}},
+        f"<html><body><p>{'a' * 23}b</p></body></html>",
+    ),
+    "nested blocks": (
+        {
+            "blocks": {
+                "selector": "//div",
+                "selector_type": "XPATH",
+                "return_type": "MAP",
+                "multiple": True,
+                "children": {
+                    "text": {
+                        "selector": "normalize-space(.)",
+                        "selector_type": "XPATH",
+                        "return_type": "STRING",
+                    }
+                },
+            }
+        },
+        "<div>" * 2000 + "<span>cell</span>" * 8000 + "</div>" * 2000,
+    ),
+}
+
+
+def bench(function, repeat: int) -> float:
+    function()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--repeat", type=int, default=10)
+    args = arg_parser.parse_args()
+
+    budget = Budget(max_input_size=10_000_000, field_timeout=10, page_timeout=30)
+    print(f"{'fixture':<22} {'no budget':>10} {'budget':>10}  (ms)")
+    for name in FIXTURES:
+        html = (ASSETS / f"{name}.html").read_text()
+        plain = Parsy.from_file(ASSETS / f"{name}.yaml")
+        limited = Parsy.from_file(ASSETS / f"{name}.yaml", budget=budget)
+        print(
+            f"{name:<22} {bench(lambda: plain.parse(html), args.repeat):10.2f} "
+            f"{bench(lambda: limited.parse(html), args.repeat):10.2f}"
+        )
+
+    budget = Budget(field_timeout=FIELD_TIMEOUT, page_timeout=PAGE_TIMEOUT)
+    print(f"\n{'adversarial page':<22} {'no budget':>10} {'budget':>10}  (ms)")
+    for name, (definition, html) in ADVERSARIAL.items():
+        plain = Parsy(definition)
+        limited = Parsy(definition, budget=budget)
+        # Adversarial pages are slow, a single run is measured
+        print(
+            f"{name:<22} {bench(lambda: plain.parse(html), 1):10.2f} "
+            f"{bench(lambda: limited.parse(html), 1):10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
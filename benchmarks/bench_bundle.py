@@ -0,0 +1,73 @@
+"""
+Parse time of several definitions on the same page: a `parse` call per definition, which
+parses the HTML every time, compared to a ParsyBundle parsing it once for all of them.
+
+The definitions are the fixture definition of the page and small definitions of a few
+fields like the ones extracting breadcrumbs or SEO metadata.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_bundle [--repeat 10] [--definitions 5] [--fixture amazon_de_search]
+"""
+import argparse
+import time
+
+from pyparsy import Parsy, ParsyBundle
+from benchmarks.bench_parse import ASSETS
+
+METADATA = {
+    "title": {"selector": "//title/text()", "selector_type": "XPATH", "return_type": "STRING"},
+    "description": {
+        "selector": "//meta[@name='description']/@content",
+        "selector_type": "XPATH",
+        "return_type": "STRING",
+    },
+    "canonical": {
+        "selector": "//link[@rel='canonical']/@href",
+        "selector_type": "XPATH",
+        "return_type": "STRING",
+    },
+}
+
+
+def bench(function, repeat: int) -> float:
+    function()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--repeat", type=int, default=10)
+    arg_parser.add_argument("--definitions", type=int, default=5)
+    arg_parser.add_argument("--fixture", default="amazon_de_search")
+    args = arg_parser.parse_args()
+
+    html = (ASSETS / f"{args.fixture}.html").read_text()
+    parsers = {"page": Parsy.from_file(ASSETS / f"{args.fixture}.yaml")}
+    for number in range(1, args.definitions):
+        parsers[f"metadata_{number}"] = Parsy(METADATA)
+
+    print(f"{'definitions':>11} {'separate':>10} {'bundle':>10} {'saved':>10}  (ms)")
+    single = None
+    for count in range(1, args.definitions + 1):
+        selected = dict(list(parsers.items())[:count])
+        bundle = ParsyBundle(selected)
+        separate = bench(lambda: [parser.parse(html) for parser in selected.values()], args.repeat)
+        bundled = bench(lambda: bundle.parse(html), args.repeat)
+        print(f"{count:>11} {separate:10.2f} {bundled:10.2f} {separate - bundled:10.2f}")
+        single = single or (separate, bundled)
+    if args.definitions > 1:
+        extra = args.definitions - 1
+        print(
+            f"per extra definition: separate {(separate - single[0]) / extra:.2f} ms, "
+            f"bundle {(bundled - single[1]) / extra:.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Cold import time of pyparsy measured with `python -X importtime` in fresh interpreters,
+and the heavy dependencies loaded by typical uses.
+
+Run from the repository root, --path measures another checkout, e.g. an older version:
+
+    python -m benchmarks.bench_import [--repeat 10] [--top 10] [--path .]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+HEAVY = ("yaml", "schema", "parsel", "cssselect", "w3lib", "jmespath", "asyncio")
+
+SCENARIOS = {
+    "import": "import pyparsy",
+    "dict definition": (
+        "import pyparsy\n"
+        "parser = pyparsy.Parsy({'title': {'selector': '//h1/text()', 'selector_type': 'XPATH',"
+        " 'return_type': 'STRING'}}, validate=False)\n"
+        "parser.parse('<html><body><h1>Title</h1></body></html>')"
+    ),
+    "from_file": (
+        "import pathlib, pyparsy\n"
+        "pyparsy.Parsy.from_file(pathlib.Path('tests/assets/amazon_bestseller_de.yaml'))"
+    ),
+}
+
+
+def import_times(path: str) -> Dict[str, int]:
+    """
+    Cumulative import time in microseconds of every module imported by `import pyparsy`
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import pyparsy"],
+        cwd=path,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line.split("|")
+        times[module.strip()] = int(cumulative)
+    return times
+
+
+def loaded_modules(path: str, code: str) -> List[str]:
+    code += f"\nimport sys\nprint(' '.join(m for m in {HEAVY!r} if m in sys.modules))"
+    process = subprocess.run(
+        [sys.executable, "-c", code], cwd=path, capture_output=True, text=True, check=True
+    )
+    return process.stdout.split()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--repeat", type=int, default=10)
+    arg_parser.add_argument("--top", type=int, default=10)
+    arg_parser.add_argument("--path", default=str(ROOT))
+    args = arg_parser.parse_args()
+
+    runs = [import_times(args.path) for _ in range(args.repeat)]
+    totals = [run["pyparsy"] / 1000 for run in runs]
+    print(f"import pyparsy: median {statistics.median(totals):.1f} ms, best {min(totals):.1f} ms")
+    print(f"\nslowest modules (cumulative, median of {args.repeat} runs)")
+    modules = {module: statistics.median(run.get(module, 0) for run in runs) for module in runs[0]}
+    for module, elapsed in sorted(modules.items(), key=lambda item: -item[1])[1 : args.top + 1]:
+        print(f"  {module:<40} {elapsed / 1000:8.1f} ms")
+    print("\nheavy dependencies loaded")
+    for name, code in SCENARIOS.items():
+        print(f"  {name:<18} {', '.join(loaded_modules(args.path, code)) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Parse time with and without the document index by number of simple top level fields.
+
+The fields look up ids, classes, attribute values and tag names that exist on the
+amazon_de_search fixture, like typical definitions with many top level fields.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_index [--repeat 10] [--fields 5 10 20 40 80]
+"""
+import argparse
+import time
+
+import lxml.html
+
+from pyparsy import Parsy
+from benchmarks.bench_parse import ASSETS
+
+
+def simple_selectors(html: str, count: int):
+    """
+    Selectors of elements of the page: ids, CSS classes, attribute values and tags
+    """
+    root = lxml.html.fromstring(html)
+    ids = sorted({value for value in root.xpath("//@id") if '"' not in value})
+    classes = sorted({token for value in root.xpath("//@class") for token in value.split()})
+    asins = sorted({value for value in root.xpath("//@data-asin") if value})
+    tags = sorted({element.tag for element in root.iter() if isinstance(element.tag, str)})
+    pools = [
+        [(f'//*[@id="{value}"]//text()', "XPATH") for value in ids],
+        [(f".{value}::text", "CSS") for value in classes if value.isidentifier()],
+        [(f'//div[@data-asin="{value}"]//h2//text()', "XPATH") for value in asins],
+        [(f"//{tag}/@class", "XPATH") for tag in tags],
+    ]
+    selectors = []
+    while len(selectors) < count:
+        for pool in pools:
+            if pool and len(selectors) < count:
+                selectors.append(pool.pop(0))
+    return selectors
+
+
+def definition(selectors) -> dict:
+    return {
+        f"field_{number}": {
+            "selector": selector,
+            "selector_type": selector_type,
+            "return_type": "STRING",
+        }
+        for number, (selector, selector_type) in enumerate(selectors)
+    }
+
+
+def bench(parser: Parsy, html: str, repeat: int) -> float:
+    parser.parse(html)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parser.parse(html)
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--repeat", type=int, default=10)
+    arg_parser.add_argument("--fields", type=int, nargs="+", default=[5, 10, 20, 40, 80])
+    args = arg_parser.parse_args()
+
+    html = (ASSETS / "amazon_de_search.html").read_text()
+    print(f"{'fields':>6} {'xpath':>10} {'index':>10}")
+    for count in args.fields:
+        yaml_def = definition(simple_selectors(html, count))
+        plain = bench(Parsy(yaml_def), html, args.repeat)
+        indexed = bench(Parsy(yaml_def, document_index=True), html, args.repeat)
+        assert Parsy(yaml_def).parse(html) == Parsy(yaml_def, document_index=True).parse(html)
+        print(f"{count:>6} {plain:>7.2f} ms {indexed:>7.2f} ms  ({plain / indexed:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Parse time and peak memory of `Parsy.parse` by input type: a decoded `str` against raw
+bytes, memoryview, binary file and mmap.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_input [--repeat 20] [--items 100000]
+"""
+import argparse
+import io
+import mmap
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from pyparsy import Parsy
+from benchmarks.bench_parse import ASSETS, FIXTURES
+
+INPUTS = ("str", "bytes", "memoryview", "file", "mmap")
+
+ITEMS_YAML = """
+items:
+  selector: //li
+  selector_type: XPATH
+  multiple: true
+  return_type: MAP
+  children:
+    name:
+      selector: //span/text()
+      selector_type: XPATH
+      return_type: STRING
+"""
+
+# Reads the document like a crawler would get it and prints the peak RSS in KiB
+MEMORY_SCRIPT = """
+import mmap, resource, sys
+from pyparsy import Parsy
+
+parser = Parsy.from_string(sys.stdin.read())
+kind, path = sys.argv[1], sys.argv[2]
+with open(path, "rb") as file:
+    if kind == "str":
+        parser.parse(file.read().decode("utf-8"))
+    elif kind == "bytes":
+        parser.parse(file.read())
+    elif kind == "memoryview":
+        parser.parse(memoryview(file.read()))
+    elif kind == "file":
+        parser.parse(file)
+    else:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            parser.parse(mapped)
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def read_input(kind: str, path: Path):
+    """
+    Read the document the way it is passed to the parser, the file is left open
+    """
+    if kind == "str":
+        return path.read_text(encoding="utf-8")
+    if kind == "bytes":
+        return path.read_bytes()
+    if kind == "memoryview":
+        return memoryview(path.read_bytes())
+    file = path.open("rb")
+    if kind == "file":
+        return file
+    return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def bench_input(name: str, kind: str, repeat: int) -> float:
+    """
+    Read and parse a fixture `repeat` times and return the best per-page time in milliseconds
+    """
+    parser = Parsy.from_file(ASSETS / f"{name}.yaml")
+    path = ASSETS / f"{name}.html"
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        html = read_input(kind, path)
+        parser.parse(html)
+        timings.append(time.perf_counter() - start)
+        if isinstance(html, (io.IOBase, mmap.mmap)):
+            html.close()
+    return min(timings) * 1000
+
+
+def peak_memory(kind: str, path: Path) -> float:
+    """
+    Peak RSS in MiB of a fresh process parsing the document at `path`
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", MEMORY_SCRIPT, kind, str(path)],
+        input=ITEMS_YAML, capture_output=True, text=True, check=True,
+    )
+    return int(result.stdout) / 1024
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--repeat", type=int, default=20)
+    arg_parser.add_argument("--items", type=int, default=100000)
+    args = arg_parser.parse_args()
+
+    print(f"{'':<24}" + "".join(f"{kind:>12}" for kind in INPUTS))
+    for name in FIXTURES:
+        timings = [bench_input(name, kind, args.repeat) for kind in INPUTS]
+        print(f"{name:<24}" + "".join(f"{timing:9.2f} ms" for timing in timings))
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "items.html"
+        with path.open("w", encoding="utf-8") as file:
+            file.write("<html><body><ul>")
+            for i in range(args.items):
+                file.write(f"<li><span>Größe {i}</span><p>{'x' * 150}</p></li>")
+            file.write("</ul></body></html>")
+        size = path.stat().st_size / 1024 / 1024
+        print(f"\npeak RSS parsing a {size:.1f} MiB document with {args.items} items")
+        for kind in INPUTS:
+            print(f"{kind:<24}{peak_memory(kind, path):9.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Parse time of a definition with 40 top level fields when only a few of them are needed:
+the full result, a `fields` projection and a lazy result of which the fields are read.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_lazy [--repeat 10] [--fields 40] [--read 1 4 10]
+"""
+import argparse
+import time
+
+from pyparsy import Parsy
+from benchmarks.bench_index import definition, simple_selectors
+from benchmarks.bench_parse import ASSETS
+
+
+def bench(parse, repeat: int) -> float:
+    parse()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--repeat", type=int, default=10)
+    arg_parser.add_argument("--fields", type=int, default=40)
+    arg_parser.add_argument("--read", type=int, nargs="+", default=[1, 4, 10])
+    args = arg_parser.parse_args()
+
+    html = (ASSETS / "amazon_de_search.html").read_text()
+    parser = Parsy(definition(simple_selectors(html, args.fields)))
+    full = bench(lambda: parser.parse(html), args.repeat)
+    print(f"{'read':>6} {'full':>10} {'fields':>10} {'lazy':>10}")
+    for count in args.read:
+        # Spread the read fields over the definition
+        fields = list(parser.field_selectors)[:: max(1, args.fields // count)][:count]
+
+        def lazy():
+            result = parser.parse(html, lazy=True)
+            return [result[field] for field in fields]
+
+        projected = bench(lambda: parser.parse(html, fields=fields), args.repeat)
+        lazy_time = bench(lazy, args.repeat)
+        assert lazy() == [parser.parse(html)[field] for field in fields]
+        print(f"{count:>6} {full:>7.2f} ms {projected:>7.2f} ms {lazy_time:>7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Per-page parse time on the bundled test fixtures.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_parse [--repeat 20]
+"""
+import argparse
+import time
+from pathlib import Path
+
+from pyparsy import Parsy
+
+ASSETS = Path(__file__).resolve().parent.parent / "tests" / "assets"
+FIXTURES = (
+    "amazon_bestseller_de",
+    "amazon_com",
+    "amazon_de_search",
+    "ebay_de",
+    "google_com",
+)
+
+
+def bench_fixture(name: str, repeat: int) -> float:
+    """
+    Parse a fixture `repeat` times and return the best per-page time in milliseconds
+    """
+    parser = Parsy.from_file(ASSETS / f"{name}.yaml")
+    html = (ASSETS / f"{name}.html").read_text()
+    parser.parse(html)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parser.parse(html)
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--repeat", type=int, default=20)
+    args = arg_parser.parse_args()
+    for name in FIXTURES:
+        print(f"{name:<24} {bench_fixture(name, args.repeat):8.2f} ms/page")
+
+
+if __name__ == "__main__":
+    main()
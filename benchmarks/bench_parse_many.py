@@ -0,0 +1,49 @@
+"""
+Pages per second of `Parsy.parse_many` by number of worker processes or threads.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_parse_many [--pages 200] [--chunksize 4] [--max-workers N]
+        [--executor processes|threads]
+"""
+import argparse
+import os
+import time
+
+from pyparsy import Parsy
+from benchmarks.bench_parse import ASSETS
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--fixture", default="amazon_com")
+    arg_parser.add_argument("--pages", type=int, default=200)
+    arg_parser.add_argument("--chunksize", type=int, default=4)
+    arg_parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    arg_parser.add_argument("--executor", choices=("processes", "threads"), default="processes")
+    args = arg_parser.parse_args()
+
+    parser = Parsy.from_file(ASSETS / f"{args.fixture}.yaml")
+    html = (ASSETS / f"{args.fixture}.html").read_text()
+    pages = [html] * args.pages
+
+    start = time.perf_counter()
+    for page in pages:
+        parser.parse(page)
+    serial = args.pages / (time.perf_counter() - start)
+    print(f"{'serial':<10} {serial:8.1f} pages/s")
+
+    workers = 1
+    while workers <= args.max_workers:
+        start = time.perf_counter()
+        for _ in parser.parse_many(
+            pages, workers=workers, chunksize=args.chunksize, executor=args.executor
+        ):
+            pass
+        rate = args.pages / (time.perf_counter() - start)
+        print(f"{workers:<2} workers {rate:8.1f} pages/s  ({rate / serial:.2f}x)")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Parse time and tree memory of the fixture pages with and without pruning script and style
+elements and comments.
+
+The memory of a tree is allocated by libxml2 and not seen by tracemalloc, it is measured as
+the growth of the resident set size of a new interpreter keeping --trees trees, which
+needs Linux.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_prune [--repeat 10] [--trees 20]
+"""
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from pyparsy import PRUNED_NODES, Parsy
+from pyparsy.internal.tree import create_root_node, serialize
+from benchmarks.bench_parse import ASSETS, FIXTURES
+
+ROOT = Path(__file__).resolve().parent.parent
+# Measures the memory of a tree in a new interpreter, so that no freed memory is reused
+TREE_MEMORY = """
+import gc, sys
+from pyparsy.internal.tree import create_root_node
+
+def resident_size():
+    with open("/proc/self/statm") as file:
+        return int(file.read().split()[1]) * 4096
+
+html = open(sys.argv[1], "rb").read()
+prune, trees = tuple(sys.argv[3:]), int(sys.argv[2])
+create_root_node(html, prune=prune)
+gc.collect()
+before = resident_size()
+kept = [create_root_node(html, prune=prune) for _ in range(trees)]
+print((resident_size() - before) / trees / 1024)
+"""
+
+
+def bench(function, repeat: int) -> float:
+    function()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def tree_memory(path: Path, prune: tuple, trees: int) -> float:
+    """
+    Memory of one tree in KiB
+    """
+    process = subprocess.run(
+        [sys.executable, "-c", TREE_MEMORY, str(path), str(trees), *prune],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(process.stdout)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--repeat", type=int, default=10)
+    arg_parser.add_argument("--trees", type=int, default=20)
+    args = arg_parser.parse_args()
+
+    print(f"{'fixture':<22} {'parse ms':>17} {'tree KiB':>17} {'serialized KiB':>17}")
+    for name in FIXTURES:
+        html = (ASSETS / f"{name}.html").read_bytes()
+        path = ASSETS / f"{name}.yaml"
+        full, pruned = Parsy.from_file(path), Parsy.from_file(path, prune=True)
+        if pruned._pruned != PRUNED_NODES:
+            print(f"{name:<22} keeps {set(PRUNED_NODES) - set(pruned._pruned)}")
+        times = [bench(lambda: parser.parse(html), args.repeat) for parser in (full, pruned)]
+        prunes = ((), pruned._pruned)
+        memory = [tree_memory(ASSETS / f"{name}.html", prune, args.trees) for prune in prunes]
+        sizes = [len(serialize(create_root_node(html, prune=prune))) / 1024 for prune in prunes]
+        print(
+            f"{name:<22}"
+            + "".join(f" {before:8.1f}{after:9.1f}" for before, after in (times, memory, sizes))
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Memory of kept parse results: nested dictionaries against `records=True`.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_records [--pages 200]
+"""
+import argparse
+import gc
+import tracemalloc
+
+from pyparsy import Parsy
+from benchmarks.bench_parse import ASSETS, FIXTURES
+
+
+def kept_memory(parser: Parsy, html: str, pages: int) -> float:
+    """
+    Memory in MiB taken by the results of `pages` parses kept in a list
+    """
+    parser.parse(html)
+    gc.collect()
+    tracemalloc.start()
+    results = [parser.parse(html) for _ in range(pages)]
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del results
+    return size / 1024 / 1024
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--pages", type=int, default=200)
+    args = arg_parser.parse_args()
+    print(f"{'':<24} {'dict':>10} {'records':>10}")
+    for name in FIXTURES:
+        yaml_file = ASSETS / f"{name}.yaml"
+        html = (ASSETS / f"{name}.html").read_text()
+        plain = kept_memory(Parsy.from_file(yaml_file), html, args.pages)
+        records = kept_memory(Parsy.from_file(yaml_file, records=True), html, args.pages)
+        print(f"{name:<24} {plain:7.2f} MiB {records:7.2f} MiB  ({records / plain:.0%})")
+
+
+if __name__ == "__main__":
+    main()
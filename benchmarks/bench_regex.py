@@ -0,0 +1,80 @@
+"""
+Parse time of a definition with only REGEX fields on the google_com fixture, evaluated on
+the serialized document tree and with `raw_regex=True` on the input text without a tree.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_regex [--repeat 20]
+"""
+import argparse
+import time
+
+from pyparsy import Parsy
+from benchmarks.bench_parse import ASSETS
+
+YAML = r"""
+title:
+  selector: <title>(.*?)</title>
+  selector_type: REGEX
+  return_type: STRING
+search_term:
+  selector: name="q"[^>]*? value="([^"]*)"
+  selector_type: REGEX
+  return_type: STRING
+language:
+  selector: '"GWsdKe":"([^"]+)"'
+  selector_type: REGEX
+  return_type: STRING
+first_title:
+  selector: <h3 class="LC20lb[^"]*">([^<]+)
+  selector_type: REGEX
+  return_type: STRING
+first_link:
+  selector: <a href="(https?://[^"]+)"
+  selector_type: REGEX
+  return_type: STRING
+result_count:
+  selector: id="result-stats">[^0-9]*([0-9.,]+)
+  selector_type: REGEX
+  return_type: STRING
+missing:
+  selector: data-price="([0-9]+)"
+  selector_type: REGEX
+  return_type: INTEGER
+titles:
+  selector: <h3 class="LC20lb[^"]*">([^<]+)
+  selector_type: REGEX
+  multiple: true
+  return_type: STRING
+links:
+  selector: <a href="(https?://[^"]+)"
+  selector_type: REGEX
+  multiple: true
+  return_type: STRING
+"""
+
+
+def bench(parser: Parsy, html: str, repeat: int) -> float:
+    parser.parse(html)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parser.parse(html)
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--repeat", type=int, default=20)
+    args = arg_parser.parse_args()
+
+    html = (ASSETS / "google_com.html").read_text()
+    tree = bench(Parsy.from_string(YAML), html, args.repeat)
+    raw = bench(Parsy.from_string(YAML, raw_regex=True), html, args.repeat)
+    print(f"{'tree':<10} {tree:8.2f} ms")
+    print(f"{'raw_regex':<10} {raw:8.2f} ms  ({tree / raw:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
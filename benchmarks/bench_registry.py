@@ -0,0 +1,61 @@
+"""
+Startup time of loading a directory of definitions: `Parsy.from_file` for every file
+compared to `ParsyRegistry.from_directory` in the current process and in worker processes.
+
+The directory is filled with copies of the fixture definitions.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_registry [--definitions 200] [--workers N]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from pyparsy import Parsy, ParsyRegistry
+from benchmarks.bench_parse import ASSETS, FIXTURES
+
+
+def timed(function) -> float:
+    start = time.perf_counter()
+    function()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--definitions", type=int, default=200)
+    arg_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for number in range(args.definitions):
+            fixture = FIXTURES[number % len(FIXTURES)]
+            shutil.copy(ASSETS / f"{fixture}.yaml", Path(directory) / f"{fixture}_{number}.yaml")
+
+        def serial():
+            for path in sorted(Path(directory).glob("*.yaml")):
+                Parsy.from_file(path)
+
+        rows = [
+            ("from_file", serial),
+            ("registry 1 worker", lambda: ParsyRegistry.from_directory(directory, workers=1)),
+            (
+                f"registry {args.workers} workers",
+                lambda: ParsyRegistry.from_directory(directory, workers=args.workers),
+            ),
+            (
+                "registry + compile",
+                lambda: ParsyRegistry.from_directory(directory, workers=args.workers).compile(),
+            ),
+        ]
+        print(f"{args.definitions} definitions")
+        for name, function in rows:
+            print(f"{name:<24} {timed(function):9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Parse time of the fixture pages without a result cache compared to cache hits of the
+memory and disk backends, and the time to hash a page for its key.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_result_cache [--repeat 10]
+"""
+import argparse
+import tempfile
+import time
+
+from pyparsy import DiskBackend, MemoryBackend, Parsy, ResultCache
+from pyparsy.cache import content_hash
+from benchmarks.bench_parse import ASSETS, FIXTURES
+
+
+def bench(function, repeat: int) -> float:
+    function()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--repeat", type=int, default=10)
+    args = arg_parser.parse_args()
+
+    print(f"{'fixture':<26} {'parse':>9} {'hash':>9} {'memory':>9} {'disk':>9}  (ms)")
+    with tempfile.TemporaryDirectory() as directory:
+        for name in FIXTURES:
+            path = ASSETS / f"{name}.yaml"
+            html = (ASSETS / f"{name}.html").read_text()
+            uncached = Parsy.from_file(path)
+            memory = Parsy.from_file(path, result_cache=ResultCache(MemoryBackend()))
+            disk = Parsy.from_file(path, result_cache=ResultCache(DiskBackend(directory)))
+            timings = [
+                bench(lambda: uncached.parse(html), args.repeat),
+                bench(lambda: content_hash(html), args.repeat),
+                bench(lambda: memory.parse(html), args.repeat),
+                bench(lambda: disk.parse(html), args.repeat),
+            ]
+            print(f"{name:<26} " + " ".join(f"{timing:9.3f}" for timing in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Microbenchmarks of the number extraction in `pyparsy.utils`: one call per string against
+the batch functions used for multiple INTEGER and FLOAT fields.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_utils [--size 10000] [--repeat 20]
+"""
+import argparse
+import random
+import timeit
+
+from pyparsy.utils import extract_float, extract_floats, extract_integer, extract_integers
+
+
+def price_strings(size: int):
+    random.seed(size)
+    formats = ("{:,.2f} €", "EUR {:.2f}", "${:,.2f}", "{:.2f}")
+    prices = []
+    for _ in range(size):
+        price = random.uniform(0, 100000)
+        text = random.choice(formats).format(price)
+        if random.random() < 0.5:
+            # German notation
+            text = text.replace(",", "_").replace(".", ",").replace("_", ".")
+        prices.append(text)
+    return prices
+
+
+def count_strings(size: int):
+    random.seed(size)
+    return [f"{random.randint(0, 10 ** 6):,} Bewertungen" for _ in range(size)]
+
+
+def bench(function, repeat: int) -> float:
+    return min(timeit.repeat(function, number=1, repeat=repeat)) * 1000
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--size", type=int, default=10000)
+    arg_parser.add_argument("--repeat", type=int, default=20)
+    args = arg_parser.parse_args()
+
+    prices = price_strings(args.size)
+    counts = count_strings(args.size)
+    cases = [
+        ("extract_float per string", lambda: [extract_float(s) for s in prices]),
+        ("extract_floats", lambda: extract_floats(prices)),
+        ("extract_integer per string", lambda: [extract_integer(s) for s in counts]),
+        ("extract_integers", lambda: extract_integers(counts)),
+    ]
+    try:
+        import numpy  # noqa: F401
+
+        cases += [
+            ("extract_floats as_array", lambda: extract_floats(prices, as_array=True)),
+            ("extract_integers as_array", lambda: extract_integers(counts, as_array=True)),
+        ]
+    except ImportError:
+        pass
+    print(f"{args.size} strings")
+    for name, function in cases:
+        print(f"{name:<28} {bench(function, args.repeat):8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Throughput and peak memory of writing parse results: collecting the results and dumping
+them with `json.dumps` against streaming them with `Parsy.parse_to` and the writers.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_writers [--fixture amazon_bestseller_de] [--pages 200]
+"""
+import argparse
+import json
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from pyparsy import ArrowWriter, CSVWriter, JSONLinesWriter, Parsy
+from benchmarks.bench_parse import ASSETS
+
+
+def measure(function):
+    """
+    Run the function and return the seconds and the peak of the traced Python memory in MiB
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--fixture", default="amazon_bestseller_de")
+    arg_parser.add_argument("--field", default="products")
+    arg_parser.add_argument("--pages", type=int, default=200)
+    args = arg_parser.parse_args()
+
+    parser = Parsy.from_file(ASSETS / f"{args.fixture}.yaml")
+    html = (ASSETS / f"{args.fixture}.html").read_text()
+
+    def pages():
+        return (html for _ in range(args.pages))
+
+    with tempfile.TemporaryDirectory() as directory:
+        output = Path(directory)
+
+        def json_dumps():
+            results = [parser.parse(page) for page in pages()]
+            (output / "results.json").write_text(json.dumps(results), encoding="utf-8")
+
+        def json_dumps_lines():
+            results = [parser.parse(page) for page in pages()]
+            with (output / "dumps.jsonl").open("w", encoding="utf-8") as file:
+                for result in results:
+                    file.write(json.dumps(result) + "\n")
+
+        cases = [
+            ("json.dumps of all results", json_dumps),
+            ("json.dumps per result", json_dumps_lines),
+            ("parse_to JSONLinesWriter", lambda: parser.parse_to(
+                pages(), JSONLinesWriter(output / "results.jsonl"))),
+            ("parse_to CSVWriter items", lambda: parser.parse_to(
+                pages(), CSVWriter(output / "items.csv"), field=args.field)),
+        ]
+        try:
+            import pyarrow  # noqa: F401
+
+            cases.append(("parse_to ArrowWriter items", lambda: parser.parse_to(
+                pages(), ArrowWriter(output / "items.parquet"), field=args.field)))
+        except ImportError:
+            pass
+
+        print(f"{args.pages} pages of {args.fixture}")
+        for name, function in cases:
+            elapsed, peak = measure(function)
+            print(f"{name:<28} {args.pages / elapsed:8.1f} pages/s  peak {peak:7.2f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+Benchmark suite: construction of parsers, per-page parse latency and throughput, memory
+peaks, and scaling by number of fields and items on synthetic pages.
+
+The results are printed as a table and written as JSON with --output. With --baseline they
+are compared to saved results, metrics that got worse by more than --threshold are flagged
+and the exit status is 1:
+
+    python -m benchmarks.suite --output baseline.json
+    python -m benchmarks.suite --baseline baseline.json [--threshold 0.2] [--filter parse.]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import lxml.etree
+import yaml
+
+from pyparsy import Parsy
+from pyparsy.validator import Validator
+from benchmarks.bench_parse import ASSETS, FIXTURES
+from benchmarks.synthetic import synthetic_definition, synthetic_page
+
+# Units of metrics where a higher value is better, lower is better for all others
+HIGHER_IS_BETTER = {"pages/s"}
+
+
+class Metric(NamedTuple):
+    value: float
+    unit: str
+
+
+class Comparison(NamedTuple):
+    name: str
+    baseline: float
+    value: float
+    unit: str
+    # Relative change, positive if the metric got worse
+    change: float
+    regression: bool
+
+
+def best_time(function: Callable[[], object], repeat: int) -> float:
+    """
+    Best time of `repeat` calls after a warm-up call, in milliseconds
+    """
+    function()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def peak_memory(function: Callable[[], object]) -> float:
+    """
+    Peak of the Python memory allocated by a call, in KiB. Memory lxml allocates for the
+    tree itself isn't traced.
+    """
+    function()
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def bench_construction(repeat: int) -> Iterator[Tuple[str, Metric]]:
+    for name in FIXTURES:
+        path = ASSETS / f"{name}.yaml"
+        yaml_def = yaml.safe_load(path.read_text())
+        yield f"construction.from_file.{name}", Metric(
+            best_time(lambda: Parsy.from_file(path), repeat), "ms"
+        )
+        yield f"construction.validator.{name}", Metric(
+            best_time(lambda: Validator(yaml_def), repeat), "ms"
+        )
+
+
+def bench_parse(repeat: int) -> Iterator[Tuple[str, Metric]]:
+    for name in FIXTURES:
+        parser = Parsy.from_file(ASSETS / f"{name}.yaml")
+        html = (ASSETS / f"{name}.html").read_text()
+        parser.parse(html)
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            parser.parse(html)
+            timings.append(time.perf_counter() - start)
+        yield f"parse.latency.{name}", Metric(min(timings) * 1000, "ms")
+        yield f"parse.median.{name}", Metric(statistics.median(timings) * 1000, "ms")
+        yield f"parse.throughput.{name}", Metric(len(timings) / sum(timings), "pages/s")
+
+
+def bench_memory(repeat: int) -> Iterator[Tuple[str, Metric]]:
+    for name in FIXTURES:
+        parser = Parsy.from_file(ASSETS / f"{name}.yaml")
+        html = (ASSETS / f"{name}.html").read_text()
+        yield f"memory.parse.{name}", Metric(peak_memory(lambda: parser.parse(html)), "KiB")
+    parser = Parsy(synthetic_definition(10))
+    html = synthetic_page(10, 1000)
+    yield "memory.items.1000", Metric(peak_memory(lambda: parser.parse(html)), "KiB")
+
+
+def bench_scaling(repeat: int) -> Iterator[Tuple[str, Metric]]:
+    for fields in (5, 20, 80):
+        parser = Parsy(synthetic_definition(fields))
+        html = synthetic_page(fields, 20)
+        elapsed = best_time(lambda: parser.parse(html), repeat)
+        yield f"scaling.fields.{fields}", Metric(elapsed, "ms")
+    parser = Parsy(synthetic_definition(10))
+    for items in (10, 100, 1000):
+        html = synthetic_page(10, items)
+        elapsed = best_time(lambda: parser.parse(html), repeat)
+        yield f"scaling.items.{items}", Metric(elapsed, "ms")
+
+
+BENCHMARKS = (bench_construction, bench_parse, bench_memory, bench_scaling)
+
+
+def run(repeat: int, name_filter: Optional[str] = None) -> Dict[str, Metric]:
+    """
+    Run all benchmarks
+
+    :param repeat: number of timed runs of every benchmark, the best one is kept
+    :param name_filter: only keep metrics with this substring in the name
+    :return: dictionary of the metrics by name
+    """
+    results = {}
+    for benchmark in BENCHMARKS:
+        for name, metric in benchmark(repeat):
+            if name_filter is None or name_filter in name:
+                results[name] = metric
+                print(f"{name:<44} {metric.value:12.3f} {metric.unit}", file=sys.stderr)
+    return results
+
+
+def compare(
+    results: Dict[str, Metric], baseline: Dict[str, Metric], threshold: float
+) -> List[Comparison]:
+    """
+    Compare the metrics to a baseline
+
+    :param results: metrics by name
+    :param baseline: saved metrics by name, metrics missing in either are skipped
+    :param threshold: relative change above which a metric counts as a regression
+    :return: list of Comparison
+    """
+    comparisons = []
+    for name, metric in results.items():
+        saved = baseline.get(name)
+        if saved is None or saved.unit != metric.unit or not saved.value:
+            continue
+        change = (metric.value - saved.value) / saved.value
+        if metric.unit in HIGHER_IS_BETTER:
+            change = -change
+        comparisons.append(
+            Comparison(name, saved.value, metric.value, metric.unit, change, change > threshold)
+        )
+    return comparisons
+
+
+def metadata() -> dict:
+    return {
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "lxml": ".".join(map(str, lxml.etree.LXML_VERSION)),
+        "libxml2": ".".join(map(str, lxml.etree.LIBXML_VERSION)),
+    }
+
+
+def save(path: str, results: Dict[str, Metric]):
+    content = {
+        "metadata": metadata(),
+        "metrics": {name: metric._asdict() for name, metric in results.items()},
+    }
+    with open(path, "w") as file:
+        json.dump(content, file, indent=2)
+
+
+def load(path: str) -> Dict[str, Metric]:
+    with open(path) as file:
+        content = json.load(file)
+    return {name: Metric(**metric) for name, metric in content["metrics"].items()}
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--repeat", type=int, default=10)
+    arg_parser.add_argument("--filter", help="only keep metrics with this substring in the name")
+    arg_parser.add_argument("--output", help="write the results to this JSON file")
+    arg_parser.add_argument("--baseline", help="compare the results to this JSON file")
+    arg_parser.add_argument(
+        "--threshold", type=float, default=0.2, help="relative change flagged as regression"
+    )
+    args = arg_parser.parse_args()
+
+    results = run(args.repeat, args.filter)
+    if args.output:
+        save(args.output, results)
+    if not args.baseline:
+        return
+    comparisons = compare(results, load(args.baseline), args.threshold)
+    print(f"{'metric':<44} {'baseline':>12} {'current':>12} {'change':>8}")
+    for comparison in comparisons:
+        flag = "  REGRESSION" if comparison.regression else ""
+        print(
+            f"{comparison.name:<44} {comparison.baseline:12.3f} {comparison.value:12.3f} "
+            f"{comparison.change:+8.1%}{flag}"
+        )
+    regressions = [comparison for comparison in comparisons if comparison.regression]
+    print(
+        f"{len(regressions)} of {len(comparisons)} metrics regressed by more than "
+        f"{args.threshold:.0%}"
+    )
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
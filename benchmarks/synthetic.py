@@ -0,0 +1,63 @@
+"""
+Generated pages and definitions of any size for the scaling benchmarks.
+
+A page has `fields` top level values and a list of `items` products with `item_fields`
+values each, the definition extracts all of them.
+"""
+from typing import Dict
+
+
+def synthetic_definition(fields: int, item_fields: int = 4) -> Dict[str, dict]:
+    """
+    Definition of a synthetic page
+
+    :param fields: number of top level fields
+    :param item_fields: number of fields of every item
+    :return: YAML definition as a dictionary
+    """
+    definition = {}
+    for number in range(fields):
+        definition[f"field_{number}"] = {
+            "selector": f'//div[@id="field-{number}"]/span/text()',
+            "selector_type": "XPATH",
+            "return_type": "INTEGER" if number % 2 else "STRING",
+        }
+    children = {}
+    for number in range(item_fields):
+        children[f"value_{number}"] = {
+            "selector": f'//span[@class="value-{number}"]/text()',
+            "selector_type": "XPATH",
+            "return_type": "FLOAT" if number % 2 else "STRING",
+        }
+    definition["items"] = {
+        "selector": '//ul[@id="items"]/li',
+        "selector_type": "XPATH",
+        "multiple": True,
+        "return_type": "MAP",
+        "children": children,
+    }
+    return definition
+
+
+def synthetic_page(fields: int, items: int, item_fields: int = 4) -> str:
+    """
+    HTML page matching `synthetic_definition` with the same number of fields
+
+    :param fields: number of top level fields
+    :param items: number of items
+    :param item_fields: number of fields of every item
+    :return: str
+    """
+    parts = ["<html><head><title>Synthetic page</title></head><body>"]
+    for number in range(fields):
+        value = f"{number * 7} units" if number % 2 else f"Value {number}"
+        parts.append(f'<div id="field-{number}"><label>Field</label><span>{value}</span></div>')
+    parts.append('<ul id="items">')
+    for item in range(items):
+        parts.append(f'<li data-id="{item}"><a href="/item/{item}">Item {item}</a>')
+        for number in range(item_fields):
+            value = f"{item},{number:02d} EUR" if number % 2 else f"Item {item} value {number}"
+            parts.append(f'<span class="value-{number}">{value}</span>')
+        parts.append("</li>")
+    parts.append("</ul></body></html>")
+    return "".join(parts)
@@ -1,45 +1,287 @@
-from collections import defaultdict
+import os
+import sys
+import time
+from collections import defaultdict, deque
+from collections.abc import Mapping
 from pathlib import Path
-from typing import Any, Union, List
+from re import Pattern
+from typing import (
+    Any,
+    AsyncIterable,
+    BinaryIO,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Union,
+    List,
+    Tuple,
+    Iterable,
+    Iterator,
+    Optional,
+    TYPE_CHECKING,
+)
 
-import yaml
-from parsel import Selector, SelectorList
-from yaml import SafeLoader
+import lxml.etree
 
-from pyparsy.exceptions import YamlFileNotFound
+from pyparsy.backends import Backend, create_backend, register_backend
+from pyparsy.budget import (
+    INPUT_SIZE,
+    PAGE_TIMEOUT,
+    Budget,
+    Diagnostics,
+    check_deadline,
+    timed_patterns,
+)
+from pyparsy.bundle import ParsyBundle
+from pyparsy.cache import (
+    DefinitionCache,
+    DiskBackend,
+    MemoryBackend,
+    ResultCache,
+    content_hash,
+)
+from pyparsy.exceptions import (
+    BudgetExceededException,
+    FieldNotFoundException,
+    StreamingNotSupportedException,
+    YamlFileNotFound,
+)
 from pyparsy.enum_types import ReturnType, SelectorType
-from pyparsy.internal import Definition
-from pyparsy.utils import extract_float, extract_integer
+from pyparsy.internal import PRUNED_NODES, Definition, pruned_nodes
+from pyparsy.internal.compiler import compile_item_matcher
+from pyparsy.internal.index import DocumentIndex, IndexedNodes
+from pyparsy.internal.pool import (
+    init_thread_worker,
+    init_worker,
+    map_chunks,
+    parse_chunk,
+    parse_chunk_in_thread,
+)
+from pyparsy.internal.select import select_alternative
+from pyparsy.internal.stream import stream_items
+from pyparsy.internal.tree import (
+    ContextNodes,
+    HtmlInput,
+    create_root_node,
+    evaluate_regex,
+    evaluate_xpath,
+    read_text,
+    search_regex,
+    serialize,
+)
+from pyparsy.lazy import LazyResult
+from pyparsy.profiling import FieldEvent, FieldProfiler, ParseStats
+from pyparsy.records import Record, record_class
+from pyparsy.registry import ParsyRegistry
+from pyparsy.utils import (
+    extract_float,
+    extract_floats,
+    extract_integer,
+    extract_integers,
+    load_yaml,
+)
 from pyparsy.validator import Validator
+from pyparsy.writers import ArrowWriter, CSVWriter, JSONLinesWriter, Writer
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+    from parsel import Selector, SelectorList
+
+
+# Constructor options of Parsy kept as attributes of the same name, pickled with the parser
+# and passed to the copies of the parser in worker threads
+_OPTIONS = (
+    "strip_strings",
+    "reparse_items",
+    "document_index",
+    "records",
+    "raw_regex",
+    "prune",
+    "backend",
+    "budget",
+)
+# Options only shared with thread copies, the memory of a result cache stays in its process
+_THREAD_OPTIONS = ("result_cache",)
+
+
+def _as_nodes(html_data: Union["Selector", "SelectorList", List]) -> List:
+    """
+    Unwrap parsel selectors to the lxml nodes the compiled selectors run on
+    """
+    # parsel is only imported by callers passing its selectors
+    parsel = sys.modules.get("parsel")
+    if parsel is not None and isinstance(html_data, parsel.Selector):
+        return [html_data.root]
+    return [getattr(node, "root", node) for node in html_data]
+
+
+def _project(
+    definitions: Dict[str, Definition], requested: dict, parent: str
+) -> Dict[str, Definition]:
+    """
+    Definitions of the requested fields, MAP fields only with their requested children
+
+    :param definitions: field definitions of one level
+    :param requested: tree of the requested field names, None for whole fields
+    :param parent: dotted path of the level
+    :return: dict
+    """
+    for field in requested:
+        if field not in definitions:
+            raise FieldNotFoundException(f"{parent}{field}")
+    result = {}
+    for field, definition in definitions.items():
+        if field not in requested:
+            continue
+        children = requested[field]
+        if children is None:
+            result[field] = definition
+        elif definition.return_type != ReturnType.MAP:
+            raise FieldNotFoundException(definition.path, "is not a MAP field")
+        else:
+            result[field] = definition.project(
+                _project(definition.children, children, f"{definition.path}.")
+            )
+    return result
 
 
 class Parsy:
-    def __init__(self, yaml_def: dict = None, validate: bool = True, strip_strings=False):
+    def __init__(
+        self,
+        yaml_def: dict = None,
+        validate: bool = True,
+        strip_strings=False,
+        reparse_items: bool = False,
+        definitions: Optional[Dict[str, Definition]] = None,
+        document_index: bool = False,
+        records: bool = False,
+        raw_regex: bool = False,
+        result_cache: Optional[ResultCache] = None,
+        prune: Union[bool, Iterable[str]] = False,
+        backend: str = "lxml",
+        budget: Optional[Budget] = None,
+    ):
         """
         Parsing class initializer
 
         :param yaml_def: Yaml definition.
         :param validate: bool - turn on/off yaml schema validation
+        :param strip_strings: bool - strip whitespace from extracted strings
+        :param reparse_items: bool - serialize and parse every item of a multiple MAP
+            field as its own document instead of evaluating the children in place
+        :param definitions: field definitions already compiled from yaml_def, e.g. by a
+            DefinitionCache
+        :param document_index: bool - answer simple top level selectors (tag names, ids,
+            classes and attribute values) from an index of the document built for all
+            fields at once, pays off for definitions with many such fields
+        :param records: bool - return compact Record objects generated for the definition
+            instead of dictionaries, `Record.to_dict()` converts them
+        :param raw_regex: bool - evaluate top level REGEX fields on the input text as it
+            is instead of the serialized document tree, the tree isn't built at all if all
+            top level fields are REGEX fields
+        :param result_cache: ResultCache returning the stored result of a page parsed
+            before with the same definition and options instead of parsing it again
+        :param prune: remove script and style elements and comments from the tree of
+            the document if no field can select them or their content, so the results
+            stay the same, or the elements with the given names (`#comment` for
+            comments) unless a selector mentions them or REGEX fields are evaluated on
+            the tree
+        :param backend: engine evaluating the fields, `lxml`, a registered backend like
+            `lexbor` for definitions of CSS fields only, or `auto` for the first installed
+            backend supporting the definition and lxml otherwise
+        :param budget: Budget limiting the input size and the time of every field and
+            page, fields out of time return None, see `parse`. Parses with a budget use
+            the lxml engine.
+        :raises: BackendNotSupportedException, ImportError
         """
         self._definitions = yaml_def
         if validate:
             self.__validate()
-        self.field_selectors = self.__create_field_selectors()
-        self.html_string = None
+        self.field_selectors = definitions or self.__create_field_selectors()
         self.strip_strings = strip_strings
+        self.reparse_items = reparse_items
+        self.document_index = document_index
+        self._index_keys = self.__collect_index_keys() if document_index else ()
+        self.records = records
+        self._record_class = None
+        if records and self.field_selectors:
+            self._record_class = record_class("ResultRecord", tuple(self.field_selectors))
+        # Projected definitions, index keys and record class by requested field paths
+        self._projections: Dict[Tuple[str, ...], Tuple] = {}
+        self._hooks: Tuple[Callable, ...] = ()
+        self.raw_regex = raw_regex
+        self._needs_tree = self.__needs_tree(self.field_selectors or {})
+        self.result_cache = result_cache
+        self._definition_hash: Optional[str] = None
+        self.prune = prune if isinstance(prune, bool) else tuple(prune)
+        self._pruned: Tuple[str, ...] = ()
+        if prune and self.field_selectors:
+            candidates = PRUNED_NODES if prune is True else self.prune
+            self._pruned = pruned_nodes(
+                self.field_selectors, candidates, raw_regex, keep_content=prune is True
+            )
+        self.backend = backend
+        self._backend: Optional[Backend] = create_backend(backend, self)
+        self.budget = budget
+        if budget is not None:
+            self._parse_item = self.__parse_item_in_budget
 
     @classmethod
-    def from_file(cls, yaml_file: Path, validate: bool = True, strip_strings=False):
+    def from_file(
+        cls,
+        yaml_file: Path,
+        validate: bool = True,
+        strip_strings=False,
+        cache: Optional[DefinitionCache] = None,
+        **kwargs,
+    ):
         if yaml_file.is_file():
-            stream = yaml_file.open()
-            data = yaml.load(stream, Loader=SafeLoader)
-            return cls(data, validate, strip_strings)
+            if cache is not None:
+                return cls.__from_cache(
+                    cache, yaml_file.read_bytes(), validate, strip_strings, **kwargs
+                )
+            with yaml_file.open() as stream:
+                data = load_yaml(stream)
+            return cls(data, validate, strip_strings, **kwargs)
         raise YamlFileNotFound(yaml_file.name)
 
     @classmethod
-    def from_string(cls, yaml_string: str, validate: bool = True, strip_strings=False):
-        data = yaml.safe_load(yaml_string)
-        return cls(data, validate, strip_strings)
+    def from_string(
+        cls,
+        yaml_string: str,
+        validate: bool = True,
+        strip_strings=False,
+        cache: Optional[DefinitionCache] = None,
+        **kwargs,
+    ):
+        if cache is not None:
+            return cls.__from_cache(
+                cache, yaml_string.encode("utf-8"), validate, strip_strings, **kwargs
+            )
+        data = load_yaml(yaml_string)
+        return cls(data, validate, strip_strings, **kwargs)
+
+    @classmethod
+    def __from_cache(
+        cls, cache: DefinitionCache, yaml_bytes: bytes, validate: bool, strip_strings, **kwargs
+    ):
+        data, definitions = cache.load(yaml_bytes, validate)
+        return cls(data, False, strip_strings, definitions=definitions, **kwargs)
+
+    def __getstate__(self):
+        # Compiled XPath objects can't be pickled, the definitions are compiled again
+        state = {name: getattr(self, name) for name in _OPTIONS}
+        state["yaml_def"] = self._definitions
+        if self._definitions is None and self.field_selectors:
+            # Parsers created from compiled definitions only
+            state["yaml_def"] = {
+                field: definition.as_dict() for field, definition in self.field_selectors.items()
+            }
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__init__(validate=False, **state)
 
     def __create_field_selectors(self):
         if self._definitions:
@@ -48,134 +290,628 @@ class Parsy:
                 result[field] = Definition(field, definitions)
             return result
 
+    def __collect_index_keys(self, definitions: Optional[Dict[str, Definition]] = None) -> Tuple:
+        keys = {}
+        if definitions is None:
+            definitions = self.field_selectors or {}
+        for definition in definitions.values():
+            for indexed in definition.index_selectors or ():
+                if indexed is not None:
+                    keys[indexed[0]] = None
+        return tuple(keys)
+
+    def __projection(self, fields: Iterable[str]) -> Tuple:
+        key = tuple(fields)
+        projection = self._projections.get(key)
+        if projection is None:
+            requested: dict = {}
+            for path in key:
+                node = requested
+                *parents, field = path.split(".")
+                for parent in parents:
+                    if node.get(parent, {}) is None:
+                        # The whole parent is requested already
+                        break
+                    node = node.setdefault(parent, {})
+                else:
+                    node[field] = None
+            definitions = _project(self.field_selectors or {}, requested, "")
+            keys = self.__collect_index_keys(definitions) if self.document_index else ()
+            result_class = None
+            if self.records:
+                result_class = record_class("ResultRecord", tuple(definitions))
+            projection = self._projections[key] = (
+                definitions,
+                keys,
+                result_class,
+                self.__needs_tree(definitions),
+            )
+        return projection
+
+    def __needs_tree(self, definitions: Dict[str, Definition]) -> bool:
+        return not self.raw_regex or any(
+            definition.selector_type != SelectorType.REGEX
+            or definition.return_type == ReturnType.MAP
+            for definition in definitions.values()
+        )
+
+    def __definition_hash(self) -> str:
+        if self._definition_hash is None:
+            import json
+
+            # The compiled definitions, also of parsers created without yaml_def, in the
+            # field order of the results
+            definition = json.dumps(
+                {field: value.as_dict() for field, value in (self.field_selectors or {}).items()}
+            )
+            options = tuple(getattr(self, name) for name in _OPTIONS)
+            self._definition_hash = content_hash(definition, repr(options))
+        return self._definition_hash
+
     def __validate(self):
         try:
             return Validator(self._definitions)
         except Exception as e:
             raise e
 
-    def parse(self, html_string: str):
+    def parse(
+        self,
+        html_string: HtmlInput,
+        encoding: Optional[str] = None,
+        fields: Optional[Iterable[str]] = None,
+        lazy: bool = False,
+        diagnostics: Optional[Diagnostics] = None,
+    ):
         """
-        Parse the whole html_string to a default-dict
+        Parse the whole html_string to a default-dict.
+
+        Besides a `str` the document can be given as raw bytes, memoryview, mmap or binary
+        file object, which are passed to lxml without decoding them in Python first.
+        All state of a parse is local to the call, so a parser can be shared by threads.
 
-        :param html_string: HTML formatted string.
+        :param html_string: HTML formatted string, bytes-like object or binary file object.
+        :param encoding: encoding of binary input, taken from a byte order mark or the
+            meta charset of the document if not given and UTF-8 otherwise
+        :param fields: only evaluate these fields, nested fields are given by their dotted
+            path, e.g. `["title", "products.price"]` returns the title and the products
+            with only their price
+        :param lazy: bool - return a LazyResult evaluating every field when it is read,
+            lazy results aren't cached and have no budget
+        :param diagnostics: Diagnostics recording the fields that returned None because
+            the budget of the parser ran out
         :return: dictionary of the parsed data
+        :raises: FieldNotFoundException
         """
-        result = defaultdict()
-        html_data = Selector(html_string)
-        for field, definition in self.field_selectors.items():
-            if not definition.multiple:
-                result[field] = self.parse_field(html_data, definition)
+        if self.budget is not None and not lazy:
+            if diagnostics is None:
+                diagnostics = Diagnostics()
+            html_string, size = self.budget.limit_input(html_string)
+            if html_string is None:
+                diagnostics.input_size = size
+                return self.__skip_fields(fields, INPUT_SIZE, diagnostics)
+        if self.result_cache is None or lazy:
+            return self.__parse_document(html_string, encoding, fields, lazy, diagnostics)
+        if hasattr(html_string, "read"):
+            html_string = html_string.read()
+        if not isinstance(html_string, (bytes, str)):
+            html_string = bytes(html_string)
+        definition_hash = self.__definition_hash()
+        if fields is not None:
+            fields = tuple(fields)
+            definition_hash = content_hash(definition_hash, *fields)
+        key = self.result_cache.key(definition_hash, html_string, encoding)
+        result = self.result_cache.get(key)
+        if result is None:
+            result = self.__parse_document(html_string, encoding, fields, lazy, diagnostics)
+            # Fields skipped for the budget would be missing from later hits
+            if diagnostics is None or not diagnostics.exceeded:
+                self.result_cache.set(key, result)
+        return result
+
+    def __parse_document(
+        self,
+        html_string: HtmlInput,
+        encoding: Optional[str],
+        fields: Optional[Iterable[str]],
+        lazy: bool,
+        diagnostics: Optional[Diagnostics] = None,
+    ):
+        definitions, index_keys, result_class, needs_tree = self.__select(fields)
+        if self.budget is not None and not lazy:
+            return self.__parse_in_budget(
+                html_string,
+                encoding,
+                definitions,
+                index_keys,
+                result_class,
+                needs_tree,
+                diagnostics,
+            )
+        # Lazy and instrumented parses need the field evaluation of the lxml engine
+        if self._backend is not None and not lazy and not self._hooks:
+            return self._backend.parse(html_string, encoding, definitions, result_class)
+        html_data = self.__document_context(html_string, encoding, index_keys, needs_tree)
+        return self._parse_context(html_data, definitions, result_class, lazy)
+
+    def __document_context(
+        self, html_string: HtmlInput, encoding: Optional[str], index_keys: Tuple, needs_tree: bool
+    ) -> ContextNodes:
+        texts = None
+        if self.raw_regex:
+            if hasattr(html_string, "read"):
+                html_string = html_string.read()
+            texts = [read_text(html_string, encoding)]
+        if not needs_tree:
+            html_data = ContextNodes((), texts)
+        else:
+            root = create_root_node(html_string, encoding, self._pruned)
+            if index_keys:
+                html_data = IndexedNodes([root], DocumentIndex(root, index_keys), texts)
             else:
-                result[field] = list(self.parse_filed_multiple(html_data, definition))
+                html_data = ContextNodes([root], texts)
+        return html_data
+
+    def __parse_in_budget(
+        self,
+        html_string: HtmlInput,
+        encoding: Optional[str],
+        definitions: Dict[str, Definition],
+        index_keys: Tuple,
+        result_class: Optional[type],
+        needs_tree: bool,
+        diagnostics: Diagnostics,
+    ):
+        budget = self.budget
+        start = time.perf_counter()
+        page_deadline = None
+        if budget.page_timeout is not None:
+            page_deadline = start + budget.page_timeout
+        try:
+            html_data = budget.run(
+                lambda: self.__document_context(html_string, encoding, index_keys, needs_tree),
+                page_deadline,
+            )
+        except BudgetExceededException:
+            diagnostics.elapsed = time.perf_counter() - start
+            return self.__skip_fields(definitions, PAGE_TIMEOUT, diagnostics, result_class)
+        result = defaultdict()
+        for field, definition in definitions.items():
+            deadline, reason = budget.field_deadline(page_deadline)
+            try:
+                result[field] = budget.run(lambda: self._evaluate(html_data, definition), deadline)
+            except BudgetExceededException:
+                result[field] = None
+                diagnostics.record(field, reason)
+        diagnostics.elapsed = time.perf_counter() - start
+        if result_class is not None:
+            return result_class(*result.values())
+        return result
+
+    def __skip_fields(
+        self,
+        fields: Union[Dict[str, Definition], Iterable[str], None],
+        reason: str,
+        diagnostics: Diagnostics,
+        result_class: Optional[type] = None,
+    ):
+        if not isinstance(fields, dict):
+            fields, _, result_class, _ = self.__select(fields)
+        result = defaultdict()
+        for field in fields or {}:
+            result[field] = None
+            diagnostics.record(field, reason)
+        if result_class is not None:
+            return result_class(*result.values())
+        return result
+
+    def __parse_item_in_budget(self, item: Any, definition: Definition) -> defaultdict:
+        check_deadline()
+        return Parsy._parse_item(self, item, definition)
+
+    def parse_tree(
+        self,
+        tree: Union[lxml.etree._Element, "Selector"],
+        fields: Optional[Iterable[str]] = None,
+        lazy: bool = False,
+    ):
+        """
+        Parse a document tree built before instead of the HTML, e.g. a tree shared by
+        several parsers, see ParsyBundle. REGEX fields are evaluated on the serialized
+        tree, also with raw_regex.
+
+        :param tree: root element of an lxml HTML tree or a parsel Selector
+        :param fields: only evaluate these fields, see `parse`
+        :param lazy: bool - return a LazyResult evaluating every field when it is read
+        :return: dictionary of the parsed data
+        :raises: FieldNotFoundException
+        """
+        definitions, index_keys, result_class, _ = self.__select(fields)
+        root = getattr(tree, "root", tree)
+        if index_keys:
+            html_data = IndexedNodes([root], DocumentIndex(root, index_keys))
+        else:
+            html_data = ContextNodes([root])
+        return self._parse_context(html_data, definitions, result_class, lazy)
+
+    def __select(self, fields: Optional[Iterable[str]]) -> Tuple:
+        if fields is None:
+            return self.field_selectors, self._index_keys, self._record_class, self._needs_tree
+        return self.__projection(fields)
+
+    def _parse_context(
+        self,
+        html_data: ContextNodes,
+        definitions: Optional[Dict[str, Definition]] = None,
+        result_class: Optional[type] = None,
+        lazy: bool = False,
+    ):
+        """
+        Evaluate the fields on the context of a document, all fields if no definitions
+        are given
+        """
+        if definitions is None:
+            definitions, result_class = self.field_selectors, self._record_class
+        if lazy:
+            return LazyResult(self._evaluate, html_data, definitions or {})
+        result = defaultdict()
+        for field, definition in definitions.items():
+            result[field] = self._evaluate(html_data, definition)
+        if result_class is not None:
+            return result_class(*result.values())
         return result
 
+    def _evaluate(self, html_data: List, definition: Definition) -> Any:
+        if not definition.multiple:
+            return self._parse_field(html_data, definition)
+        return list(self._parse_field_multiple(html_data, definition))
+
+    def iter_items(
+        self,
+        source: Union[str, Path, BinaryIO],
+        field: Optional[str] = None,
+        encoding: Optional[str] = None,
+    ) -> Iterator[defaultdict]:
+        """
+        Stream the items of a multiple MAP field from a huge document.
+
+        The document is parsed without building the full tree: every item is evaluated
+        as soon as its end tag is parsed and the elements are freed right away, so memory
+        stays bounded by the size of a single item instead of the whole document.
+        The item selector has to be a location path of name tests with attribute
+        predicates (e.g. `//ul[@class="items"]/li`) and items nested in other items are
+        not yielded on their own. Items are evaluated like by `parse`, in place or parsed
+        as their own document with `reparse_items=True` or children that can't be scoped.
+
+        :param source: path of the HTML file or binary file object
+        :param field: multiple MAP field to stream, optional if there is only one
+        :param encoding: encoding of the document, detected by libxml2 if not given
+        :return: iterator of dictionaries of the parsed items
+        :raises: StreamingNotSupportedException
+        """
+        definition = self.__get_stream_definition(field)
+        matcher = compile_item_matcher(
+            definition.field, definition.selector_type, definition.css or definition.xpath
+        )
+        if isinstance(source, Path):
+            source = str(source)
+        yield from stream_items(
+            source, matcher, lambda item: self._parse_item(item, definition), encoding
+        )
+
+    def __get_stream_definition(self, field: Optional[str]) -> Definition:
+        items = [
+            definition
+            for definition in self.field_selectors.values()
+            if definition.multiple and definition.return_type == ReturnType.MAP
+        ]
+        if field is not None:
+            items = [definition for definition in items if definition.field == field]
+        if len(items) != 1:
+            raise StreamingNotSupportedException(
+                field or "", "specify one of the multiple MAP fields"
+            )
+        return items[0]
+
+    def parse_to(
+        self,
+        html_strings: Iterable[HtmlInput],
+        writer: Writer,
+        field: Optional[str] = None,
+    ) -> int:
+        """
+        Parse the pages one by one and write the results to a writer as they are parsed,
+        without keeping a list of all results. The writer is closed at the end.
+
+        :param html_strings: iterable of HTML formatted strings, bytes or binary files
+        :param writer: sink of the results, e.g. JSONLinesWriter, CSVWriter or ArrowWriter
+        :param field: write the items of this multiple MAP field as records instead of
+            the results of the pages
+        :return: number of written records
+        """
+        if field is None:
+            definitions, top_level = self.field_selectors, True
+        else:
+            definition = self.field_selectors.get(field)
+            if definition is None or definition.return_type != ReturnType.MAP:
+                raise ValueError(f"Field {field} is not a MAP field")
+            definitions, top_level = definition.children, False
+        with writer:
+            writer.open(definitions, top_level)
+            count = 0
+            for html_string in html_strings:
+                result = self.parse(html_string)
+                records = [result] if field is None else result[field] or []
+                if isinstance(records, Mapping):
+                    records = [records]
+                for record in records:
+                    writer.write(record)
+                    count += 1
+        return count
+
+    def instrument(self, *hooks: Callable[[FieldEvent], None]):
+        """
+        Call the hooks with a FieldEvent for every evaluated field.
+
+        The events have the dotted field path, the evaluation time, the index of the
+        selector alternative that matched and the number of matches. A ParseStats
+        instance aggregates them by field path. Without hooks the instrumentation is
+        removed again, a parser that is not instrumented doesn't pay anything for it.
+        The hooks are not pickled, so they don't run in `parse_many` workers.
+
+        :param hooks: callables receiving a FieldEvent, e.g. ParseStats()
+        :return: the parser
+        """
+        for name in ("_parse_field", "_parse_field_multiple", "_get_selector_data"):
+            self.__dict__.pop(name, None)
+        self._hooks = hooks
+        if hooks:
+            profiler = FieldProfiler(self._parse_field, self._parse_field_multiple, hooks)
+            self._parse_field = profiler.parse_field
+            self._parse_field_multiple = profiler.parse_field_multiple
+            self._get_selector_data = profiler.get_selector_data
+        return self
+
+    def parse_many(
+        self,
+        html_strings: Iterable[Union[str, bytes]],
+        workers: Optional[int] = None,
+        chunksize: int = 1,
+        ordered: bool = True,
+        executor: str = "processes",
+    ) -> Iterator[defaultdict]:
+        """
+        Parse many HTML strings in a pool of worker processes or threads.
+
+        Every worker compiles the definitions once and keeps them for all pages it parses.
+        The input is consumed lazily, so it can be a generator of any length.
+        lxml releases the GIL while it parses a page and evaluates a selector, so threads
+        avoid sending the pages and results between processes. Worker threads share the
+        instrumentation hooks of the parser.
+
+        :param html_strings: iterable of HTML formatted strings or bytes
+        :param workers: number of workers, defaults to the number of CPUs
+        :param chunksize: number of pages sent to a worker at once
+        :param ordered: yield the results in input order, or as soon as they are ready
+        :param executor: `processes` or `threads`
+        :return: iterator of dictionaries of the parsed data
+        """
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+        workers = workers or os.cpu_count() or 1
+        if executor == "processes":
+            pool = ProcessPoolExecutor(workers, initializer=init_worker, initargs=(self,))
+            parse = parse_chunk
+        elif executor == "threads":
+            pool = ThreadPoolExecutor(workers, initializer=init_thread_worker, initargs=(self,))
+            parse = parse_chunk_in_thread
+        else:
+            raise ValueError(f"Unknown executor {executor}, use processes or threads")
+        with pool:
+            yield from map_chunks(pool, parse, html_strings, chunksize, workers * 2, ordered)
+
+    def _thread_copy(self) -> "Parsy":
+        """
+        Copy of the parser with its own compiled selectors. A compiled lxml XPath is only
+        evaluated by one thread at a time, so threads sharing it would wait for each other.
+        """
+        clone = self.__class__(
+            self._definitions,
+            validate=False,
+            definitions=None if self._definitions else self.field_selectors,
+            **{name: getattr(self, name) for name in _OPTIONS + _THREAD_OPTIONS},
+        )
+        return clone.instrument(*self._hooks)
+
+    async def aparse(self, html_string: HtmlInput, executor: Optional["Executor"] = None):
+        """
+        Parse the html_string in an executor without blocking the running event loop
+
+        :param html_string: HTML formatted string, bytes-like object or binary file object.
+        :param executor: executor to run the parsing in, defaults to the loop's default executor
+        :return: dictionary of the parsed data
+        """
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self.parse, html_string)
+
+    async def aparse_stream(
+        self,
+        html_strings: AsyncIterable[Union[str, bytes]],
+        concurrency: int = 4,
+        executor: Optional["Executor"] = None,
+    ) -> AsyncIterator[defaultdict]:
+        """
+        Parse the pages of an async iterable in an executor and yield the results in order.
+
+        At most `concurrency` pages are parsed at the same time and the next page is only
+        taken from `html_strings` when a slot is free, so a fast page source is held back
+        by a slow consumer instead of buffering pages in memory.
+
+        :param html_strings: async iterable of HTML formatted strings or bytes
+        :param concurrency: maximum number of pages parsed at the same time
+        :param executor: executor to run the parsing in, defaults to the loop's default executor
+        :return: async iterator of dictionaries of the parsed data
+        """
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        pending = deque()
+        try:
+            async for html_string in html_strings:
+                pending.append(loop.run_in_executor(executor, self.parse, html_string))
+                if len(pending) >= concurrency:
+                    yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for future in pending:
+                future.cancel()
+
     def parse_field(
-        self, html_data: Union[Selector, SelectorList], definition: Definition
+        self, html_data: Union["Selector", "SelectorList", List], definition: Definition
     ) -> Any:
         """
         Extract field from html_data with given definition
-        :param html_data: parsel.Selector with HTML data
+        :param html_data: parsel.Selector/SelectorList or list of lxml nodes with HTML data
         :param definition: pyparsy.internal.Definition
         :return: Any
         """
+        return self._parse_field(_as_nodes(html_data), definition)
+
+    def parse_filed_multiple(
+        self, html_data: Union["Selector", "SelectorList", List], definition
+    ) -> Any:
+        return self._parse_field_multiple(_as_nodes(html_data), definition)
+
+    def _parse_field(self, html_data: List, definition: Definition, scope=None) -> Any:
+        data = self._get_selector_data(html_data, definition, scope)
         if definition.return_type != ReturnType.MAP:
-            data = self._get_selector_data(html_data, definition)
+            if definition.selector_type != SelectorType.REGEX:
+                data = serialize(data[0]) if data else None
             return self._convert_to_type(data, return_type=definition.return_type)
+        if self.records:
+            return definition.record_class(
+                *[self._parse_field(data, child, scope) for child in definition.children.values()]
+            )
         result = defaultdict()
-        data = self._get_selector_data(html_data, definition)
         for child, child_definition in definition.children.items():
-            result[child] = self.parse_field(data, child_definition)
+            result[child] = self._parse_field(data, child_definition, scope)
         return result
 
-    def parse_filed_multiple(
-        self, html_data: Union[Selector, SelectorList], definition
-    ) -> Any:
-        if definition.selector_type == SelectorType.REGEX:
-            items = self._get_selector_data(html_data, definition)
-        else:
-            items = self._get_selector_data(html_data, definition).getall()
+    def _parse_field_multiple(self, html_data: List, definition: Definition, scope=None) -> Any:
+        items = self._get_selector_data(html_data, definition, scope)
+        in_place = definition.in_place and not self.reparse_items
+        if definition.selector_type != SelectorType.REGEX and not in_place:
+            items = [serialize(item) for item in items]
         if definition.return_type == ReturnType.MAP:
             for item in items:
-                html_data = Selector(item)
-                result = defaultdict()
-                for field, field_definition in definition.children.items():
-                    result[field] = self.parse_field(html_data, field_definition)
-                yield result
+                yield self._parse_item(item, definition)
+        elif definition.return_type in (ReturnType.INTEGER, ReturnType.FLOAT):
+            if self.strip_strings:
+                items = [item.strip() if item else item for item in items]
+            if definition.return_type == ReturnType.INTEGER:
+                yield from extract_integers(items)
+            else:
+                yield from extract_floats(items)
         else:
             for item in items:
                 yield self._convert_to_type(item, definition.return_type)
 
-    def _get_selector_data(self, html_data: Selector, definition: Definition):
+    def _parse_item(self, item: Any, definition: Definition) -> defaultdict:
         """
-        Factory method to get the Selector from HTML based on the SelectorType
+        Evaluate the children of a multiple MAP field on one of its items
 
-        :param html_data: Selector - `lxml.etree` HTML content
+        :param item: matched element, evaluated in place if the definition allows it, or
+            string parsed as its own document
+        :param definition: Definition - of the multiple MAP field
+        :return: dictionary, or Record with `records=True`, of the parsed item
+        """
+        in_place = definition.in_place and not self.reparse_items
+        if in_place and isinstance(item, lxml.etree._Element):
+            html_data, item_scope = ContextNodes([item]), item
+        else:
+            html_data, item_scope = ContextNodes([create_root_node(serialize(item))]), None
+        if self.records:
+            return definition.record_class(
+                *[
+                    self._parse_field(html_data, child, item_scope)
+                    for child in definition.children.values()
+                ]
+            )
+        result = defaultdict()
+        for field, field_definition in definition.children.items():
+            result[field] = self._parse_field(html_data, field_definition, item_scope)
+        return result
+
+    def _get_selector_data(self, html_data: List, definition: Definition, scope=None):
+        """
+        Factory method to evaluate the compiled selectors of a definition based on the SelectorType
+
+        :param html_data: list of `lxml.etree` context nodes
         :param definition: Definition - of the field
-        :return: SelectorList - result of the selector query
+        :param scope: item element the field is evaluated in place on, None for the document
+        :return: list - result of the selector query
         """
-        if definition.selector_type == SelectorType.XPATH:
-            return self.__get_xpath(html_data, definition.xpath)
+        if definition.index_selectors is not None and isinstance(html_data, IndexedNodes):
+            return select_alternative(html_data, definition)[0]
         if definition.selector_type == SelectorType.REGEX:
+            selectors = timed_patterns(definition.selectors)
             if definition.multiple:
-                return self.__get_regex(html_data, definition.regex)
-            else:
-                try:
-                    return self.__get_regex(html_data, definition.regex)[0]
-                except IndexError:
-                    return None
-        if definition.selector_type == SelectorType.CSS:
-            return self.__get_css(html_data, definition.css)
+                return self.__get_regex(html_data, selectors)
+            return self.__search_regex(html_data, selectors)
+        if scope is not None:
+            return self.__get_scoped_xpath(html_data, definition.scoped_selectors, scope)
+        return self.__get_xpath(html_data, definition.selectors)
 
     @staticmethod
-    def __get_xpath(html_data: Selector, selector: Union[str, List[str]]):
-        result = None
-        if isinstance(selector, list):
-            for sel in selector:
-                result = html_data.xpath(sel)
-                if result:
-                    break
-        else:
-            result = html_data.xpath(selector)
+    def __get_scoped_xpath(html_data: List, selectors: Tuple, scope: lxml.etree._Element):
+        result = []
+        for xpath, on_scope in selectors:
+            if on_scope:
+                # Once per context node, as if each of them was in a document of the item
+                context = [scope for node in html_data if isinstance(node, lxml.etree._Element)]
+                result = evaluate_xpath(xpath, context)
+            else:
+                result = evaluate_xpath(xpath, html_data)
+            if result:
+                break
         return result
 
     @staticmethod
-    def __get_regex(html_data: Selector, selector: Union[str, List[str]]):
-        result = None
-        if isinstance(selector, list):
-            for sel in selector:
-                result = html_data.re(sel)
-                if result:
-                    break
-        else:
-            result = html_data.re(selector)
+    def __get_xpath(html_data: List, selectors: Tuple[lxml.etree.XPath, ...]):
+        result = []
+        for xpath in selectors:
+            result = evaluate_xpath(xpath, html_data)
+            if result:
+                break
         return result
 
     @staticmethod
-    def __get_css(html_data: Selector, selector: Union[str, List[str]]):
-        result = None
-        if isinstance(selector, list):
-            for sel in selector:
-                result = html_data.css(sel)
-                if result:
-                    break
-        else:
-            result = html_data.css(selector)
+    def __get_regex(html_data: List, selectors: Tuple[Pattern, ...]):
+        result = []
+        for regex in selectors:
+            result = evaluate_regex(regex, html_data)
+            if result:
+                break
         return result
 
-    def _convert_to_type(self,
-        html_data: Union[Selector, SelectorList, str], return_type: ReturnType
-    ):
+    @staticmethod
+    def __search_regex(html_data: List, selectors: Tuple[Pattern, ...]) -> Optional[str]:
+        for regex in selectors:
+            result = search_regex(regex, html_data)
+            if result is not None:
+                return result
+        return None
+
+    def _convert_to_type(self, html_data: Union[str, List[str], None], return_type: ReturnType):
         """
-        Convert the SelectorList/Selector data to a ReturnType format
-        :param html_data: Selector/SelectorList HTML data
+        Convert the extracted string to a ReturnType format
+        :param html_data: extracted string
         :param return_type: ReturnType desired return type
         :return: data in desired type or None
         """
-        try:
-            data = html_data.get()
-        except AttributeError:
-            data = html_data
+        data = html_data
         if return_type == ReturnType.STRING:
             return data.strip() if self.strip_strings and data else data
         if return_type == ReturnType.INTEGER:
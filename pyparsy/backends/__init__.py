@@ -0,0 +1,117 @@
+from typing import TYPE_CHECKING, Any, Dict, Optional, Type
+
+from pyparsy.exceptions import BackendNotSupportedException
+from pyparsy.internal import Definition
+from pyparsy.internal.tree import HtmlInput
+
+if TYPE_CHECKING:
+    from pyparsy import Parsy
+
+# Name of the built-in engine evaluating compiled XPath and regexes on lxml trees
+LXML = "lxml"
+# Backend name selecting the first available backend supporting the definition
+AUTO = "auto"
+
+
+class Backend:
+    """
+    Engine evaluating the fields of a parser on a document instead of the built-in lxml
+    engine, e.g. a native CSS engine for definitions of CSS fields only.
+
+    A backend returns the same results as the lxml engine for every definition it
+    supports. Backends are registered with `register_backend` and chosen by the
+    `backend` option of Parsy, `auto` takes the first registered automatic backend that
+    is installed and supports the definition and falls back to lxml otherwise.
+    """
+
+    name: str = ""
+    # pip package of the backend
+    requires: str = ""
+    # Chosen by `auto`, only for backends building the same trees as lxml
+    automatic: bool = True
+
+    def __init__(self, parser: "Parsy"):
+        """
+        :param parser: parser of the definition, for its options and type conversions
+        """
+        self.parser = parser
+
+    @classmethod
+    def available(cls) -> bool:
+        """
+        :return: bool - the libraries of the backend are installed
+        """
+        raise NotImplementedError
+
+    @classmethod
+    def unsupported(cls, parser: "Parsy") -> Optional[str]:
+        """
+        :param parser: parser of the definition
+        :return: reason the backend can't evaluate the definition, None if it can
+        """
+        raise NotImplementedError
+
+    def parse(
+        self,
+        html: HtmlInput,
+        encoding: Optional[str],
+        definitions: Dict[str, Definition],
+        result_class: Optional[type] = None,
+    ) -> Any:
+        """
+        :param html: HTML formatted string, bytes-like object or binary file object
+        :param encoding: encoding of binary input, detected from the document if not given
+        :param definitions: definitions of the fields to evaluate
+        :param result_class: record class of the result with `records=True`
+        :return: dictionary or record of the parsed data
+        """
+        raise NotImplementedError
+
+
+BACKENDS: Dict[str, Type[Backend]] = {}
+
+
+def register_backend(backend: Type[Backend]) -> Type[Backend]:
+    """
+    Register a backend by its name, can be used as class decorator
+
+    :param backend: Backend subclass
+    :return: the backend
+    """
+    BACKENDS[backend.name] = backend
+    return backend
+
+
+def create_backend(name: str, parser: "Parsy") -> Optional[Backend]:
+    """
+    Backend of a parser
+
+    :param name: name of a registered backend, `lxml` or `auto`
+    :param parser: parser of the definition
+    :return: Backend, None for the lxml engine
+    :raises: ValueError, BackendNotSupportedException, ImportError
+    """
+    if name == LXML or not parser.field_selectors:
+        return None
+    if name == AUTO:
+        for backend in BACKENDS.values():
+            if backend.automatic and backend.available() and backend.unsupported(parser) is None:
+                return backend(parser)
+        return None
+    backend = BACKENDS.get(name)
+    if backend is None:
+        raise ValueError(f"Unknown backend {name}, use {', '.join([LXML, AUTO, *BACKENDS])}")
+    reason = backend.unsupported(parser)
+    if reason is not None:
+        raise BackendNotSupportedException(name, reason)
+    if not backend.available():
+        raise ImportError(
+            f"The {name} backend requires {backend.requires}, "
+            f"install it with `pip install {backend.requires}`"
+        )
+    return backend(parser)
+
+
+from pyparsy.backends.lexbor import LexborBackend  # noqa: E402
+
+register_backend(LexborBackend)
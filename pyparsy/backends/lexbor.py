@@ -0,0 +1,244 @@
+import importlib.util
+import re
+from collections import defaultdict
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from pyparsy.enum_types import ReturnType, SelectorType
+from pyparsy.internal import Definition
+from pyparsy.internal.tree import HtmlInput, read_text
+from pyparsy.utils import extract_floats, extract_integers
+
+from pyparsy.backends import Backend
+
+if TYPE_CHECKING:
+    from pyparsy import Parsy
+
+# The ::text and ::attr(name) pseudo elements of parsel at the end of a selector
+_PSEUDO_ELEMENT = re.compile(r"::(?:(text)|attr\(\s*([^)\s]+)\s*\))\s*$")
+# Attribute conditions, whose values may contain any character
+_ATTRIBUTES = re.compile(r"\[[^\]]*\]")
+# Pseudo classes translated by cssselect may not match like the CSS engine of lexbor
+_PSEUDO_CLASS = re.compile(r":")
+# Combinators and selector groups can match ancestors of an item with querySelectorAll,
+# while parsel scopes the whole selector to the item
+_COMBINATOR = re.compile(r"[\s>+~,]")
+# Elements of the document wrapping an item that is parsed on its own
+_WRAPPERS = re.compile(r"^(?:\*|html|head|body)(?![\w-])", re.IGNORECASE)
+
+# Tag names of text nodes in selectolax
+_TEXT_TAGS = ("-text", "#text")
+
+# Base selector, `text`, `attr` or None for elements, and the attribute name
+CompiledSelector = Tuple[str, Optional[str], Optional[str]]
+
+
+def compile_css(css: str) -> CompiledSelector:
+    """
+    Split the parsel pseudo element from a CSS selector
+
+    :param css: CSS selector, e.g. `a.next::attr(href)`
+    :return: tuple of the base selector, the kind of the pseudo element and the attribute
+    """
+    match = _PSEUDO_ELEMENT.search(css)
+    if match is None:
+        return css.strip(), None, None
+    return css[: match.start()].strip(), "text" if match.group(1) else "attr", match.group(2)
+
+
+def _unsupported_selector(definition: Definition, css: str) -> Optional[str]:
+    base, kind, _ = compile_css(css)
+    if not base:
+        return "has no element selector"
+    plain = _ATTRIBUTES.sub("", base)
+    if _PSEUDO_CLASS.search(plain):
+        return "uses a pseudo class"
+    if definition.return_type == ReturnType.MAP:
+        if kind is not None:
+            return "is a MAP field selecting text"
+    elif kind is None and definition.return_type != ReturnType.BOOLEAN:
+        return "returns the HTML of elements"
+    if "." in definition.path and (_COMBINATOR.search(plain) or _WRAPPERS.match(plain)):
+        return "is a child with a combinator, selector group or wrapper element"
+    return None
+
+
+class LexborBackend(Backend):
+    """
+    Definitions of CSS fields only evaluated with the lexbor engine of selectolax,
+    without building an lxml tree.
+
+    Fields have to select text or attributes with the ::text and ::attr() pseudo elements,
+    only MAP and BOOLEAN fields may select elements. Selectors of children are single
+    compound selectors without combinators, which match the same elements in lexbor and
+    in the XPath translation of parsel.
+
+    Lexbor builds trees by the HTML5 algorithm and libxml2 doesn't, e.g. tables get an
+    implied tbody, content misplaced in tables is moved before them and misnested tags
+    are reopened. Fields can select other elements on such markup, so the backend is
+    only used when chosen explicitly and never by `auto`.
+    """
+
+    name = "lexbor"
+    requires = "selectolax"
+    automatic = False
+
+    def __init__(self, parser: "Parsy"):
+        super().__init__(parser)
+        self._selectors: Dict[str, CompiledSelector] = {}
+
+    @classmethod
+    def available(cls) -> bool:
+        return importlib.util.find_spec("selectolax") is not None
+
+    @classmethod
+    def unsupported(cls, parser: "Parsy") -> Optional[str]:
+        if parser.reparse_items:
+            return "reparse_items parses items with lxml"
+        stack = list(parser.field_selectors.values())
+        while stack:
+            definition = stack.pop()
+            if definition.selector_type != SelectorType.CSS:
+                return f"field {definition.path} is not a CSS field"
+            alternatives = definition.css
+            for css in [alternatives] if isinstance(alternatives, str) else alternatives:
+                reason = _unsupported_selector(definition, css)
+                if reason is not None:
+                    return f"field {definition.path} {reason}"
+            stack.extend(definition.children.values())
+        return None
+
+    def parse(
+        self,
+        html: HtmlInput,
+        encoding: Optional[str],
+        definitions: Dict[str, Definition],
+        result_class: Optional[type] = None,
+    ) -> Any:
+        from selectolax.lexbor import LexborHTMLParser
+
+        text = read_text(html, encoding)
+        if isinstance(html, str):
+            # Strings are cleaned like lxml gets them
+            text = text.strip().replace("\x00", "")
+        tree = LexborHTMLParser(text)
+        result = defaultdict()
+        for field, definition in definitions.items():
+            if definition.multiple:
+                result[field] = self.__parse_field_multiple(tree, None, definition)
+            else:
+                result[field] = self.__parse_field(tree, None, definition)
+        if result_class is not None:
+            return result_class(*result.values())
+        return result
+
+    def __parse_field(self, tree, contexts: Optional[List], definition: Definition) -> Any:
+        data = self.__select(tree, contexts, definition)
+        if definition.return_type != ReturnType.MAP:
+            return self.parser._convert_to_type(
+                data[0] if data else None, return_type=definition.return_type
+            )
+        return self.__parse_map(tree, data, definition)
+
+    def __parse_map(self, tree, contexts: List, definition: Definition) -> Any:
+        if self.parser.records:
+            return definition.record_class(
+                *[
+                    self.__parse_field(tree, contexts, child)
+                    for child in definition.children.values()
+                ]
+            )
+        result = defaultdict()
+        for child, child_definition in definition.children.items():
+            result[child] = self.__parse_field(tree, contexts, child_definition)
+        return result
+
+    def __parse_field_multiple(self, tree, contexts: Optional[List], definition: Definition):
+        items = self.__select(tree, contexts, definition)
+        if definition.return_type == ReturnType.MAP:
+            # Children of items are evaluated as single values, like by the lxml engine
+            return [self.__parse_map(tree, [item], definition) for item in items]
+        if definition.return_type in (ReturnType.INTEGER, ReturnType.FLOAT):
+            if self.parser.strip_strings:
+                items = [item.strip() if item else item for item in items]
+            if definition.return_type == ReturnType.INTEGER:
+                return list(extract_integers(items))
+            return list(extract_floats(items))
+        return [self.parser._convert_to_type(item, definition.return_type) for item in items]
+
+    def __select(self, tree, contexts: Optional[List], definition: Definition) -> List:
+        """
+        Values of the first selector alternative with matches
+
+        :param tree: LexborHTMLParser of the document
+        :param contexts: elements the selectors are scoped to, the document if None
+        :param definition: Definition - of the field
+        :return: list of texts, attribute values or elements
+        """
+        alternatives = definition.css
+        result = []
+        for css in [alternatives] if isinstance(alternatives, str) else alternatives:
+            compiled = self._selectors.get(css)
+            if compiled is None:
+                compiled = self._selectors[css] = compile_css(css)
+            base, kind, attribute = compiled
+            result = _values(_match(tree, contexts, base), kind, attribute)
+            if result:
+                break
+        return result
+
+
+_css_includes_self: Optional[bool] = None
+
+
+def _includes_self() -> bool:
+    """
+    Whether `Node.css` matches the node itself, which depends on the selectolax version.
+    `Node.css_matches` can't tell, it is true if any descendant matches.
+    """
+    global _css_includes_self
+    if _css_includes_self is None:
+        from selectolax.lexbor import LexborHTMLParser
+
+        node = LexborHTMLParser("<p></p>").css_first("p")
+        _css_includes_self = any(match.mem_id == node.mem_id for match in node.css("p"))
+    return _css_includes_self
+
+
+def _match(tree, contexts: Optional[List], selector: str) -> List:
+    """
+    Elements matching the selector in document order, on context elements including the
+    elements themselves like the `descendant-or-self::` translation of parsel
+    """
+    if contexts is None:
+        return tree.css(selector)
+    if _includes_self():
+        return [match for node in contexts for match in node.css(selector)]
+    result = []
+    for node in contexts:
+        parent = node.parent
+        if parent is not None and any(
+            match.mem_id == node.mem_id for match in parent.css(selector)
+        ):
+            result.append(node)
+        result.extend(node.css(selector))
+    return result
+
+
+def _values(nodes: List, kind: Optional[str], attribute: Optional[str]) -> List:
+    if kind is None:
+        return nodes
+    if kind == "text":
+        # Every text node of the elements on its own, like `text()`
+        return [
+            child.text()
+            for node in nodes
+            for child in node.iter(include_text=True)
+            if child.tag in _TEXT_TAGS
+        ]
+    values = []
+    for node in nodes:
+        attributes = node.attributes
+        if attribute in attributes:
+            value = attributes[attribute]
+            values.append("" if value is None else value)
+    return values
@@ -0,0 +1,256 @@
+import functools
+import threading
+import time
+import warnings
+from re import Pattern
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from pyparsy.exceptions import BudgetExceededException
+from pyparsy.internal.tree import HtmlInput
+
+# Reasons of skipped fields
+INPUT_SIZE = "input_size"
+FIELD_TIMEOUT = "field_timeout"
+PAGE_TIMEOUT = "page_timeout"
+
+# Deadline of the field evaluated by the current thread and whether a timer interrupts it
+_state = threading.local()
+
+
+def check_deadline():
+    """
+    Stop the evaluation of a field once its deadline has passed, called between the items
+    of multiple MAP fields where no timer signal can interrupt it
+
+    :raises: BudgetExceededException
+    """
+    deadline = getattr(_state, "deadline", None)
+    if deadline is not None and time.perf_counter() > deadline:
+        raise BudgetExceededException(reason="deadline passed")
+
+
+def timed_patterns(patterns: Tuple[Pattern, ...]) -> Tuple[Any, ...]:
+    """
+    Patterns of a REGEX field that stop at the deadline of the field evaluated by the
+    current thread when no timer signal can interrupt them, e.g. in the threads of
+    `parse_many` and `aparse`. They need the regex package, without it a warning is issued
+    and the patterns run to completion.
+
+    :param patterns: compiled `re` patterns
+    :return: the patterns, or patterns of the regex package raising BudgetExceededException
+        at the deadline
+    """
+    deadline = getattr(_state, "deadline", None)
+    if deadline is None or getattr(_state, "alarm", False):
+        return patterns
+    try:
+        import regex  # noqa: F401
+    except ImportError:
+        warnings.warn(
+            "REGEX fields can't be interrupted without a timer signal, e.g. outside the main "
+            "thread, install regex with `pip install pyparsy[regex]` to stop them at the deadline",
+            RuntimeWarning,
+            stacklevel=2,
+        )
+        return patterns
+    timed = []
+    for pattern in patterns:
+        compiled = _compile(pattern)
+        timed.append(pattern if compiled is None else _TimedPattern(compiled, deadline))
+    return tuple(timed)
+
+
+@functools.lru_cache(maxsize=None)
+def _compile(pattern: Pattern) -> Any:
+    import regex
+
+    try:
+        return regex.compile(pattern.pattern)
+    except regex.error:
+        # Syntax the regex package rejects keeps the `re` pattern
+        return None
+
+
+class _TimedPattern:
+    """
+    Pattern of the regex package standing in for a compiled `re` pattern, every search
+    gets the time left until the deadline
+    """
+
+    def __init__(self, pattern: Any, deadline: float):
+        self.pattern = pattern
+        self.deadline = deadline
+        self.groups = pattern.groups
+        self.groupindex = pattern.groupindex
+
+    def search(self, text: str):
+        return self.__match("search", text)
+
+    def findall(self, text: str) -> list:
+        return self.__match("findall", text)
+
+    def __match(self, method: str, text: str):
+        remaining = self.deadline - time.perf_counter()
+        if remaining <= 0:
+            raise BudgetExceededException(reason="deadline passed")
+        try:
+            return getattr(self.pattern, method)(text, timeout=remaining)
+        except TimeoutError:
+            raise BudgetExceededException(reason="regex timed out")
+
+
+def _alarm(signum, frame):
+    raise BudgetExceededException(reason="timer expired")
+
+
+def _can_use_signals() -> bool:
+    import signal
+
+    return (
+        hasattr(signal, "setitimer")
+        and threading.current_thread() is threading.main_thread()
+        # A timer of the application is left alone
+        and signal.getitimer(signal.ITIMER_REAL) == (0.0, 0.0)
+    )
+
+
+class Diagnostics:
+    """
+    Fields of a parse that returned None because a budget ran out, filled by
+    `Parsy.parse(html, diagnostics=Diagnostics())`
+    """
+
+    def __init__(self):
+        # Size of input rejected for being larger than max_input_size
+        self.input_size: Optional[int] = None
+        # Reason by field name, `input_size`, `field_timeout` or `page_timeout`
+        self.skipped: Dict[str, str] = {}
+        # Seconds the parse took
+        self.elapsed: float = 0.0
+
+    @property
+    def exceeded(self) -> bool:
+        return bool(self.skipped) or self.input_size is not None
+
+    def record(self, field: str, reason: str):
+        self.skipped[field] = reason
+
+    def __repr__(self) -> str:
+        return (
+            f"Diagnostics(input_size={self.input_size!r}, skipped={self.skipped!r}, "
+            f"elapsed={self.elapsed:.3f})"
+        )
+
+
+class Budget:
+    """
+    Size and time limits of a parse, so that pathological pages can't stall a worker.
+
+    Input larger than `max_input_size` isn't parsed at all. Every top level field gets
+    at most `field_timeout` seconds and the whole page, including building its tree, at
+    most `page_timeout` seconds. Fields running out of time return None and are recorded
+    in the Diagnostics of the parse.
+
+    In the main thread of a process a timer signal (SIGALRM) interrupts a field, e.g. a
+    regex with catastrophic backtracking. Other threads check the deadline between the
+    items of multiple MAP fields and run REGEX fields on the regex package, which stops at
+    the deadline, see `timed_patterns`. A single lxml call can't be interrupted, its result
+    is dropped when it returns too late.
+    """
+
+    def __init__(
+        self,
+        max_input_size: Optional[int] = None,
+        field_timeout: Optional[float] = None,
+        page_timeout: Optional[float] = None,
+        signals: bool = True,
+    ):
+        """
+        :param max_input_size: maximum number of characters of str input and bytes of
+            binary input
+        :param field_timeout: seconds a top level field may take
+        :param page_timeout: seconds a page may take
+        :param signals: bool - interrupt fields with SIGALRM in the main thread
+        """
+        self.max_input_size = max_input_size
+        self.field_timeout = field_timeout
+        self.page_timeout = page_timeout
+        self.signals = signals
+
+    def __repr__(self) -> str:
+        return (
+            f"Budget(max_input_size={self.max_input_size!r}, "
+            f"field_timeout={self.field_timeout!r}, page_timeout={self.page_timeout!r})"
+        )
+
+    def limit_input(self, html: HtmlInput) -> Tuple[Optional[HtmlInput], Optional[int]]:
+        """
+        :param html: HTML formatted string, bytes-like object or binary file object
+        :return: tuple of the input, read if it was a file, or None and its size if it
+            is too large
+        """
+        limit = self.max_input_size
+        if limit is None:
+            return html, None
+        if hasattr(html, "read"):
+            html = html.read(limit + 1)
+        if isinstance(html, str):
+            size = len(html)
+        else:
+            with memoryview(html) as view:
+                size = view.nbytes
+        if size > limit:
+            return None, size
+        return html, None
+
+    def field_deadline(self, page_deadline: Optional[float]) -> Tuple[Optional[float], str]:
+        """
+        :param page_deadline: perf_counter time the page has to be finished by
+        :return: tuple of the deadline of the next field and the reason when it's missed
+        """
+        if self.field_timeout is None:
+            return page_deadline, PAGE_TIMEOUT
+        deadline = time.perf_counter() + self.field_timeout
+        if page_deadline is not None and page_deadline < deadline:
+            return page_deadline, PAGE_TIMEOUT
+        return deadline, FIELD_TIMEOUT
+
+    def run(self, function: Callable[[], Any], deadline: Optional[float]) -> Any:
+        """
+        Call the function, interrupting it at the deadline
+
+        :param function: evaluation of a field
+        :param deadline: perf_counter time, no limit if None
+        :return: the result of the function
+        :raises: BudgetExceededException
+        """
+        if deadline is None:
+            return function()
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            raise BudgetExceededException(reason="no time left")
+        previous = getattr(_state, "deadline", None), getattr(_state, "alarm", False)
+        alarm = self.signals and _can_use_signals()
+        _state.deadline, _state.alarm = deadline, alarm
+        if alarm:
+            import signal
+
+            handler = signal.signal(signal.SIGALRM, _alarm)
+            signal.setitimer(signal.ITIMER_REAL, remaining)
+        try:
+            result = function()
+        finally:
+            # The timer can expire after the function returned and before it's stopped, the
+            # handler then raises here and the previous state is still restored
+            try:
+                if alarm:
+                    signal.setitimer(signal.ITIMER_REAL, 0)
+            finally:
+                if alarm:
+                    # Handlers installed from C are returned as None
+                    signal.signal(signal.SIGALRM, signal.SIG_DFL if handler is None else handler)
+                _state.deadline, _state.alarm = previous
+        if time.perf_counter() > deadline:
+            # Finished too late inside code the timer couldn't interrupt
+            raise BudgetExceededException(reason="finished after the deadline")
+        return result
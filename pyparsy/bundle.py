@@ -0,0 +1,90 @@
+from typing import TYPE_CHECKING, Any, Dict, Iterator, Optional
+
+from pyparsy.internal.index import DocumentIndex, IndexedNodes
+from pyparsy.internal.tree import ContextNodes, HtmlInput, create_root_node, read_text
+
+if TYPE_CHECKING:
+    from pyparsy import Parsy
+
+
+class ParsyBundle:
+    """
+    Several parsers applied to the same page, e.g. product details, reviews and SEO
+    metadata, parsing the HTML only once.
+
+    The document tree is built once and shared by all parsers, as well as the serialized
+    text for their REGEX fields and one index with the keys of all parsers using a
+    document index. Only the nodes all parsers prune are removed from the shared tree, so
+    parsers pruning a list of names may get the text of nodes they prune on their own,
+    results of parsers with `prune=True` are the same. The results are keyed by the names
+    of the parsers:
+
+        bundle = ParsyBundle({"product": product_parser, "reviews": reviews_parser})
+        results = bundle.parse(html)
+        results["reviews"]
+
+    Result caches of the parsers aren't used.
+    """
+
+    def __init__(self, parsers: Dict[str, "Parsy"]):
+        """
+        :param parsers: parsers by name
+        """
+        self.parsers = dict(parsers)
+        self._needs_tree = any(parser._needs_tree for parser in self.parsers.values())
+        self._raw_regex = any(parser.raw_regex for parser in self.parsers.values())
+        keys: Dict = {}
+        for parser in self.parsers.values():
+            keys.update(dict.fromkeys(parser._index_keys))
+        self._index_keys = tuple(keys)
+        tree_parsers = [parser for parser in self.parsers.values() if parser._needs_tree]
+        self._pruned = tuple(
+            name
+            for name in (tree_parsers[0]._pruned if tree_parsers else ())
+            if all(name in parser._pruned for parser in tree_parsers)
+        )
+
+    def parse(self, html_string: HtmlInput, encoding: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Parse the html_string with all parsers
+
+        :param html_string: HTML formatted string, bytes-like object or binary file object.
+        :param encoding: encoding of binary input, see `Parsy.parse`
+        :return: dictionary of the results by parser name
+        """
+        texts = None
+        if self._raw_regex:
+            if hasattr(html_string, "read"):
+                html_string = html_string.read()
+            texts = [read_text(html_string, encoding)]
+        root = index = None
+        if self._needs_tree:
+            root = create_root_node(html_string, encoding, self._pruned)
+            if self._index_keys:
+                index = DocumentIndex(root, self._index_keys)
+        # Parsers with the same kind of context share it, and so its serialized text
+        contexts: Dict[tuple, ContextNodes] = {}
+        results = {}
+        for name, parser in self.parsers.items():
+            kind = (parser._needs_tree, bool(parser._index_keys), parser.raw_regex)
+            html_data = contexts.get(kind)
+            if html_data is None:
+                context_texts = texts if parser.raw_regex else None
+                if not parser._needs_tree:
+                    html_data = ContextNodes((), context_texts)
+                elif parser._index_keys:
+                    html_data = IndexedNodes([root], index, context_texts)
+                else:
+                    html_data = ContextNodes([root], context_texts)
+                contexts[kind] = html_data
+            results[name] = parser._parse_context(html_data)
+        return results
+
+    def __getitem__(self, name: str) -> "Parsy":
+        return self.parsers[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.parsers)
+
+    def __len__(self) -> int:
+        return len(self.parsers)
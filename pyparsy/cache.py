@@ -0,0 +1,399 @@
+import json
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+
+from pyparsy.internal import Definition
+from pyparsy.internal.compiler import add_css_translations, css_to_xpath
+from pyparsy.utils import load_yaml
+from pyparsy.validator import Validator
+
+
+# Version of the definition files, files of other versions are replaced
+_FILE_FORMAT = 2
+
+
+def _css_selectors(yaml_def: dict) -> Iterator[str]:
+    for definition in yaml_def.values():
+        if definition.get("selector_type") == "CSS":
+            selector = definition.get("selector")
+            yield from selector if isinstance(selector, list) else [selector]
+        yield from _css_selectors(definition.get("children", {}))
+
+
+class DefinitionCache:
+    """
+    Cache of loaded YAML definitions keyed by the SHA-256 hash of the YAML bytes.
+
+    The in-memory layer keeps the compiled definitions of the `maxsize` most recently
+    used YAML files, so parsers built from the same file share them and skip YAML
+    parsing, validation and compilation. With a `directory` the validated definitions
+    are also stored on disk as JSON together with the XPath translations of their CSS
+    selectors, so a restarted process only has to compile them, without importing
+    parsel and cssselect. A changed file has a different hash and is loaded again.
+    """
+
+    def __init__(self, maxsize: int = 128, directory: Optional[Union[str, Path]] = None):
+        """
+        :param maxsize: maximum number of definitions kept in memory
+        :param directory: directory of the on-disk layer, disabled if not given
+        """
+        self.maxsize = maxsize
+        self.directory = Path(directory) if directory is not None else None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(yaml_bytes: bytes) -> str:
+        import hashlib
+
+        return hashlib.sha256(yaml_bytes).hexdigest()
+
+    def load(self, yaml_bytes: bytes, validate: bool = True) -> Tuple[dict, Dict[str, Definition]]:
+        """
+        Load the YAML definition from the cache, or parse, validate and compile it
+
+        :param yaml_bytes: content of the YAML definition
+        :param validate: validate the definition unless it has been validated before
+        :return: tuple of the parsed YAML definition and the compiled field definitions
+        """
+        key = self.key(yaml_bytes)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if entry is None:
+            entry = self.__load_file(key)
+            if entry is None:
+                self.misses += 1
+                entry = [load_yaml(yaml_bytes), False, None]
+        yaml_def, validated, definitions = entry
+        store = validate and not validated
+        if store:
+            Validator(yaml_def)
+            entry[1] = True
+        if definitions is None and yaml_def:
+            entry[2] = definitions = {
+                field: Definition(field, _definitions) for field, _definitions in yaml_def.items()
+            }
+        if store:
+            self.__store_file(key, yaml_def)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return yaml_def, definitions
+
+    def clear(self):
+        """
+        Remove all definitions from the in-memory layer
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def __load_file(self, key: str) -> Optional[list]:
+        if self.directory is None:
+            return None
+        try:
+            content = json.loads((self.directory / f"{key}.json").read_text())
+        except (OSError, ValueError):
+            return None
+        # Files of older versions are loaded again and replaced
+        if not isinstance(content, dict) or content.get("format") != _FILE_FORMAT:
+            return None
+        yaml_def = content["definition"]
+        add_css_translations(content["xpath"])
+        self.disk_hits += 1
+        # Only validated definitions are written to disk
+        return [yaml_def, True, None]
+
+    def __store_file(self, key: str, yaml_def: dict):
+        if self.directory is None:
+            return
+        # The CSS selectors were translated while compiling the definitions
+        translations = {css: css_to_xpath(css) for css in _css_selectors(yaml_def)}
+        content = {"format": _FILE_FORMAT, "definition": yaml_def, "xpath": translations}
+        try:
+            content = json.dumps(content)
+        except (TypeError, ValueError):
+            return
+        # Definitions JSON can't represent (e.g. integer field names) are only kept in memory
+        if json.loads(content)["definition"] != yaml_def:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        import tempfile
+
+        fd, path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as file:
+            file.write(content)
+        os.replace(path, self.directory / f"{key}.json")
+
+
+# Hash function of content_hash, chosen once when the module is imported
+try:
+    from xxhash import xxh3_128 as _hasher
+except ImportError:
+    import hashlib
+
+    def _hasher():
+        return hashlib.blake2b(digest_size=16)
+
+
+def content_hash(*parts: Union[bytes, str]) -> str:
+    """
+    Fast non-cryptographic hash of the parts, XXH3 if xxhash is installed and BLAKE2b
+    otherwise
+
+    :param parts: strings are hashed as UTF-8
+    :return: hex digest
+    """
+    digest = _hasher()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8", "surrogatepass")
+        # The length separates the parts, ("ab", "c") and ("a", "bc") differ
+        digest.update(len(part).to_bytes(8, "little"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class ResultCacheBackend:
+    """
+    Storage of a ResultCache, maps keys to the pickled results. Backends for other stores,
+    e.g. a shared key-value server, implement `get`, `set` and `clear`.
+    """
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class MemoryBackend(ResultCacheBackend):
+    """
+    Least recently used results of the current process
+    """
+
+    def __init__(
+        self, maxsize: int = 1024, ttl: Optional[float] = None, max_bytes: Optional[int] = None
+    ):
+        """
+        :param maxsize: maximum number of results
+        :param ttl: seconds a result is kept, forever if not given
+        :param max_bytes: maximum total size of the pickled results
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.size = 0
+        # key -> (expiry time, pickled result)
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires is not None and expires < time.monotonic():
+                del self._entries[key]
+                self.size -= len(value)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes):
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous[1])
+            self._entries[key] = (expires, value)
+            self.size += len(value)
+            while len(self._entries) > self.maxsize or (
+                self.max_bytes is not None and self.size > self.max_bytes and self._entries
+            ):
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskBackend(ResultCacheBackend):
+    """
+    Results stored as files of a local directory, shared by processes and kept across
+    restarts. Reading a result updates the modification time of its file, the least
+    recently used files are removed when there are more than `maxsize`.
+    """
+
+    SUFFIX = ".result"
+
+    def __init__(
+        self, directory: Union[str, Path], maxsize: int = 100_000, ttl: Optional[float] = None
+    ):
+        """
+        :param directory: directory of the result files, created if missing
+        :param maxsize: maximum number of result files
+        :param ttl: seconds a result is kept after it has been stored, forever if not given
+        """
+        self.directory = Path(directory)
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._count: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def __path(self, key: str) -> Path:
+        return self.directory / f"{key}{self.SUFFIX}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self.__path(key)
+        try:
+            with open(path, "rb") as file:
+                content = file.read()
+        except OSError:
+            return None
+        # The first 8 bytes are the time the result was stored
+        stored = int.from_bytes(content[:8], "little")
+        if self.ttl is not None and stored + self.ttl < time.time():
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return content[8:]
+
+    def set(self, key: str, value: bytes):
+        import tempfile
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.__path(key)
+        exists = path.exists()
+        fd, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as file:
+            file.write(int(time.time()).to_bytes(8, "little"))
+            file.write(value)
+        os.replace(temporary, path)
+        with self._lock:
+            if self._count is None:
+                self._count = sum(1 for _ in self.directory.glob(f"*{self.SUFFIX}"))
+            elif not exists:
+                self._count += 1
+            if self._count > self.maxsize:
+                self.__evict()
+
+    def __evict(self):
+        files = []
+        for path in self.directory.glob(f"*{self.SUFFIX}"):
+            try:
+                files.append((path.stat().st_mtime, path))
+            except OSError:
+                pass
+        files.sort()
+        # Evict a tenth more than needed so that not every store scans the directory
+        remove = len(files) - self.maxsize + self.maxsize // 10
+        for _, path in files[: max(remove, 0)]:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+        self._count = len(files) - max(remove, 0)
+
+    def clear(self):
+        with self._lock:
+            for path in self.directory.glob(f"*{self.SUFFIX}"):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            self._count = 0
+
+
+class ResultCache:
+    """
+    Cache of parse results keyed by the hash of the definition and the parser options
+    together with the hash of the HTML content.
+
+    Unchanged pages are answered without parsing them again. A changed definition has a
+    different hash, so it never gets results of the previous one. Results are stored
+    pickled, every hit returns a new copy the caller may modify.
+
+        cache = ResultCache(MemoryBackend(maxsize=10_000, ttl=3600))
+        parser = Parsy.from_file(path, result_cache=cache)
+    """
+
+    def __init__(self, backend: Optional[ResultCacheBackend] = None):
+        """
+        :param backend: storage of the results, a MemoryBackend with default limits if
+            not given
+        """
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(definition_hash: str, html: Union[bytes, str], encoding: Optional[str] = None) -> str:
+        """
+        :param definition_hash: hash of the definition and options of the parser
+        :param html: content of the page
+        :param encoding: encoding the content is parsed with
+        :return: key of the result
+        """
+        # Bytes are decoded by lxml, e.g. by their meta charset, so they may give another
+        # result than the same text given as str
+        kind = "str" if isinstance(html, str) else encoding or "bytes"
+        return content_hash(definition_hash, kind, html)
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        :param key: key of the result
+        :return: the cached result or None
+        """
+        value = self.backend.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if value is None:
+            return None
+        return pickle.loads(value)
+
+    def set(self, key: str, result: Any):
+        """
+        :param key: key of the result
+        :param result: parse result
+        """
+        self.backend.set(key, pickle.dumps(result, pickle.HIGHEST_PROTOCOL))
+
+    def clear(self):
+        """
+        Remove all results and reset the counters
+        """
+        self.backend.clear()
+        with self._lock:
+            self.hits = self.misses = 0
@@ -14,3 +14,46 @@ class RegexValidationException(Exception):
     def __init__(self, field: str = ""):
         self.message = f"Invalid regex expression for field: {field}"
         super().__init__(self.message)
+
+
+class CSSValidationException(Exception):
+    def __init__(self, field: str = ""):
+        self.message = f"Invalid css expression for field: {field}"
+        super().__init__(self.message)
+
+
+class StreamingNotSupportedException(Exception):
+    def __init__(self, field: str = "", reason: str = ""):
+        self.message = f"Field {field} can't be streamed: {reason}"
+        super().__init__(self.message)
+
+
+class BackendNotSupportedException(Exception):
+    def __init__(self, backend: str = "", reason: str = ""):
+        self.message = f"Backend {backend} can't parse the definition: {reason}"
+        super().__init__(self.message)
+
+
+class BudgetExceededException(Exception):
+    def __init__(self, field: str = "", reason: str = ""):
+        self.message = f"Budget of field {field} exceeded: {reason}"
+        super().__init__(self.message)
+
+
+class FieldNotFoundException(Exception):
+    def __init__(self, field: str = "", reason: str = "not found in the definition"):
+        self.message = f"Field {field} {reason}"
+        super().__init__(self.message)
+
+
+class DefinitionValidationException(Exception):
+    def __init__(self, errors: dict = None):
+        # Error messages by definition name and field path
+        self.errors = errors or {}
+        lines = [
+            f"{name}: {field}: {message}" if field else f"{name}: {message}"
+            for name, fields in self.errors.items()
+            for field, message in fields
+        ]
+        self.message = f"{len(lines)} invalid definition fields:\n" + "\n".join(lines)
+        super().__init__(self.message)
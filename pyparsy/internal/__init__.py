@@ -1,36 +1,191 @@
-from typing import Dict
+import copy
+import re
+from typing import Dict, Iterable, Iterator, Optional, Tuple
 
 from pyparsy.enum_types import SelectorType, ReturnType
+from pyparsy.records import class_name, record_class
+from pyparsy.internal.compiler import (
+    compile_index_selectors,
+    compile_scoped_selectors,
+    compile_selectors,
+    reads_content,
+)
+from pyparsy.internal.tree import COMMENT
+
+# Nodes pruned by default, rarely selected but a large part of modern pages
+PRUNED_NODES = ("script", "style", COMMENT)
 
 
 class Definition:
 
     __slots__ = (
         "field",
+        "path",
         "selector_type",
         "return_type",
         "multiple",
         "xpath",
         "regex",
         "css",
+        "selectors",
+        "scoped_selectors",
+        "index_selectors",
         "children",
+        "in_place",
+        "record_class",
     )
 
-    def __init__(self, field: str, definition: dict):
+    def __init__(
+        self,
+        field: str,
+        definition: dict,
+        scoped: bool = False,
+        parent: str = "",
+        on_item: bool = False,
+    ):
         self.field: str = field
+        # Dotted path of the field from the top level, e.g. `products.title`
+        self.path: str = f"{parent}.{field}" if parent else field
         self.selector_type: SelectorType = SelectorType[definition.get("selector_type")]
         self.return_type: ReturnType = ReturnType[definition.get("return_type")]
         self.multiple: bool = definition.get("multiple", False)
         self.xpath = None
         self.css = None
         self.regex = None
-        if self.selector_type.XPATH:
+        if self.selector_type == SelectorType.XPATH:
             self.xpath = definition.get("selector")
-        if self.selector_type.REGEX:
+        if self.selector_type == SelectorType.REGEX:
             self.regex = definition.get("selector")
-        if self.selector_type.CSS:
+        if self.selector_type == SelectorType.CSS:
             self.css = definition.get("selector")
+        self.selectors: Tuple = compile_selectors(
+            field, self.selector_type, definition.get("selector")
+        )
+        # Fields below a multiple MAP are also compiled for in place evaluation on the items
+        self.scoped_selectors: Optional[Tuple] = None
+        if scoped:
+            self.scoped_selectors = compile_scoped_selectors(
+                field, self.selector_type, definition.get("selector"), on_item
+            )
+        # Top level fields are evaluated on the document root and can use its index
+        self.index_selectors: Optional[Tuple] = None
+        if not scoped and not parent:
+            self.index_selectors = compile_index_selectors(
+                field, self.selector_type, definition.get("selector")
+            )
+        is_item = self.multiple and self.return_type == ReturnType.MAP
+        # Only top level fields are parsed as multiple, nested ones return a single value
+        on_item = is_item and not parent
         self.children: Dict[str, Definition] = {
-            _field: self.__class__(_field, _definitions)
+            _field: self.__class__(
+                _field, _definitions, scoped=scoped or is_item, parent=self.path, on_item=on_item
+            )
             for _field, _definitions in definition.get("children", {}).items()
         }
+        # Items of a multiple MAP are evaluated in place, unless a child selector
+        # can't be scoped to the item and the items have to be parsed on their own
+        self.in_place: bool = is_item and all(
+            child._is_scoped() for child in self.children.values()
+        )
+        # Compact result class of MAP fields for parsers with `records=True`
+        self.record_class: Optional[type] = None
+        if self.return_type == ReturnType.MAP:
+            self.record_class = record_class(class_name(self.path), tuple(self.children))
+
+    def as_dict(self) -> dict:
+        """
+        Definition of the field as compiled, with the defaults filled in
+
+        :return: dict in the YAML structure
+        """
+        selectors = {
+            SelectorType.XPATH: self.xpath,
+            SelectorType.CSS: self.css,
+            SelectorType.REGEX: self.regex,
+        }
+        result = {
+            "selector": selectors[self.selector_type],
+            "selector_type": self.selector_type.name,
+            "return_type": self.return_type.name,
+            "multiple": self.multiple,
+        }
+        if self.children:
+            result["children"] = {
+                field: child.as_dict() for field, child in self.children.items()
+            }
+        return result
+
+    def project(self, children: Dict[str, "Definition"]) -> "Definition":
+        """
+        Copy of a MAP definition evaluating only some of its children
+
+        :param children: subset of the children, in definition order
+        :return: Definition
+        """
+        projected = copy.copy(self)
+        projected.children = children
+        projected.in_place = (
+            self.multiple
+            and self.return_type == ReturnType.MAP
+            and all(child._is_scoped() for child in children.values())
+        )
+        projected.record_class = record_class(class_name(self.path), tuple(children))
+        return projected
+
+    def _is_scoped(self) -> bool:
+        if self.scoped_selectors is None:
+            return False
+        return all(child._is_scoped() for child in self.children.values())
+
+
+def _walk(definitions: Iterable[Definition]) -> Iterator[Definition]:
+    for definition in definitions:
+        yield definition
+        yield from _walk(definition.children.values())
+
+
+def pruned_nodes(
+    definitions: Dict[str, Definition],
+    candidates: Iterable[str] = PRUNED_NODES,
+    raw_regex: bool = False,
+    keep_content: bool = True,
+) -> Tuple[str, ...]:
+    """
+    Nodes of the candidates no field can select and so can be removed from the tree.
+
+    A node is kept if a selector mentions it, e.g. `//script[@type="application/ld+json"]`
+    or `comment()` for comments. REGEX fields can match anywhere in the serialized tree,
+    so nothing is pruned for definitions evaluating them on the tree. With keep_content
+    nothing is pruned either if a field can return the content of a pruned node inside
+    the nodes it selects, e.g. the HTML or `string()` of an element, `//text()`, or `*`,
+    which matches pruned elements without mentioning them.
+
+    :param definitions: field definitions
+    :param candidates: names of the nodes to prune, `#comment` for comments
+    :param raw_regex: top level REGEX fields are evaluated on the input text
+    :param keep_content: prune only if the results stay the same
+    :return: tuple of the node names
+    """
+    selectors = []
+    for definition in _walk(definitions.values()):
+        if definition.selector_type == SelectorType.REGEX:
+            if not raw_regex or "." in definition.path or definition.return_type == ReturnType.MAP:
+                return ()
+            continue
+        elements = definition.return_type not in (ReturnType.MAP, ReturnType.BOOLEAN)
+        if keep_content and any(
+            reads_content(selector.path, elements) for selector in definition.selectors
+        ):
+            return ()
+        selector = definition.xpath or definition.css
+        selectors.extend([selector] if isinstance(selector, str) else selector)
+    text = "\n".join(selectors)
+    pruned = []
+    for name in candidates:
+        if name == COMMENT:
+            mentioned = "comment()" in text
+        else:
+            mentioned = re.search(rf"\b{re.escape(name)}\b", text, re.IGNORECASE) is not None
+        if not mentioned:
+            pruned.append(name)
+    return tuple(pruned)
@@ -0,0 +1,543 @@
+import re
+from typing import Dict, List, Optional, Tuple, Union
+
+import lxml.etree
+
+from pyparsy.enum_types import SelectorType
+from pyparsy.exceptions import (
+    CSSValidationException,
+    RegexValidationException,
+    StreamingNotSupportedException,
+    XPathValidationException,
+)
+
+# Same prefixes parsel registers on every Selector
+XPATH_NAMESPACES = {
+    "re": "http://exslt.org/regular-expressions",
+    "set": "http://exslt.org/sets",
+}
+
+_NAMESPACE_PREFIX = re.compile(r"\b(re|set):")
+
+# Translator of the CSS selectors, created for the first CSS selector
+_css_translator = None
+# XPath translations of the CSS selectors, also of definitions loaded from a cache
+_css_translations: Dict[str, str] = {}
+
+
+def compile_xpath(xpath: str, field: str = "") -> lxml.etree.XPath:
+    """
+    Compile an XPath expression once, so evaluating it skips the expression parsing
+
+    :param xpath: XPath expression
+    :param field: field name used in the error message
+    :return: lxml.etree.XPath
+    :raises: XPathValidationException
+    """
+    # Expressions with namespaces keep their results alive as long as the document is,
+    # which matters for documents streamed with iterparse
+    namespaces = XPATH_NAMESPACES if _NAMESPACE_PREFIX.search(xpath) else None
+    try:
+        return lxml.etree.XPath(xpath, namespaces=namespaces, smart_strings=False)
+    except lxml.etree.XPathSyntaxError:
+        raise XPathValidationException(field)
+
+
+def css_to_xpath(css: str, field: str = "") -> str:
+    """
+    Translate a CSS selector (including the ::text and ::attr() pseudo elements) to XPath
+
+    :param css: CSS selector
+    :param field: field name used in the error message
+    :return: str
+    :raises: CSSValidationException
+    """
+    global _css_translator
+    xpath = _css_translations.get(css)
+    if xpath is not None:
+        return xpath
+    # cssselect and parsel are only imported by definitions with CSS selectors
+    from cssselect import SelectorError
+
+    if _css_translator is None:
+        from parsel.csstranslator import HTMLTranslator
+
+        _css_translator = HTMLTranslator()
+    try:
+        xpath = _css_translator.css_to_xpath(css)
+    except SelectorError:
+        raise CSSValidationException(field)
+    _css_translations[css] = xpath
+    return xpath
+
+
+def add_css_translations(translations: Dict[str, str]):
+    """
+    Use XPath translations of CSS selectors made before, e.g. by another process, so
+    translating them doesn't import parsel and cssselect
+
+    :param translations: XPath expressions by CSS selector
+    """
+    _css_translations.update(translations)
+
+
+def compile_regex(regex: str, field: str = "") -> re.Pattern:
+    """
+    Compile a regex expression
+
+    :param regex: Regex expression
+    :param field: field name used in the error message
+    :return: re.Pattern
+    :raises: RegexValidationException
+    """
+    try:
+        return re.compile(regex)
+    except re.error:
+        raise RegexValidationException(field)
+
+
+def _split_xpath(xpath: str, separator: str) -> List[str]:
+    """
+    Split an XPath expression on a separator that is outside quotes, brackets and parentheses
+    """
+    parts, depth, quote, start = [], 0, None, 0
+    for index, char in enumerate(xpath):
+        if quote:
+            if char == quote:
+                quote = None
+        elif char in "'\"":
+            quote = char
+        elif char in "[(":
+            depth += 1
+        elif char in "])":
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(xpath[start:index])
+            start = index + 1
+    parts.append(xpath[start:])
+    return parts
+
+
+def _has_absolute_subpath(xpath: str) -> bool:
+    """
+    Check for location paths starting at the document root anywhere in the expression,
+    e.g. `//a` inside a predicate or a function call
+    """
+    quote, previous = None, ""
+    for index, char in enumerate(xpath):
+        if quote:
+            if char == quote:
+                quote = None
+            continue
+        if char in "'\"":
+            quote = char
+        elif char == "/" and previous != "/":
+            before = xpath[:index].rstrip()
+            if not before or before[-1] in "[(,|=<>!+":
+                return True
+            if before != xpath[:index] and before.split()[-1] in ("and", "or", "mod"):
+                return True
+        previous = char
+    return False
+
+
+# Axes leaving the subtree of the context node, whose nodes differ between an item in the
+# page and the item parsed as its own document
+_ESCAPING_AXES = frozenset(
+    (
+        "parent",
+        "ancestor",
+        "ancestor-or-self",
+        "following",
+        "following-sibling",
+        "preceding",
+        "preceding-sibling",
+    )
+)
+# Functions looking at the whole document or at the ancestors of the context node
+_ESCAPING_FUNCTIONS = frozenset(("id", "lang"))
+# Elements libxml2 wraps an item parsed as its own document in
+_WRAPPERS = frozenset(("html", "head", "body"))
+# Node tests matching the wrappers of the item document
+_WILDCARDS = (".", "*", "node()")
+# Relative expressions with the same value on the item and on its document root
+_STRING_VALUE = re.compile(r"(?:string|normalize-space)\(\s*\.?\s*\)")
+# Relative paths selecting the same nodes on the item and on its document root
+_DESCENDANT_AXES = ("descendant-or-self::", "descendant::", ".//")
+
+
+def _stays_in_item(xpath: str) -> bool:
+    """
+    Check that an expression can't look at nodes outside the item or at the wrapper
+    elements of the item document, which differ between both ways of evaluating items
+    """
+    tokens = _tokenize_xpath(xpath)
+    if tokens is None:
+        return False
+    for index, (kind, text) in enumerate(tokens):
+        following = tokens[index + 1][1] if index + 1 < len(tokens) else ""
+        if text == "..":
+            return False
+        if kind != "name":
+            continue
+        if following == "::":
+            if text in _ESCAPING_AXES:
+                return False
+        elif following == "(":
+            if text in _ESCAPING_FUNCTIONS:
+                return False
+        elif text.lower() in _WRAPPERS:
+            return False
+    return True
+
+
+def _node_test(step: str) -> str:
+    return step.split("[", 1)[0].split("::")[-1].strip()
+
+
+def scope_xpath(xpath: str, on_item: bool = True) -> Optional[Tuple[str, bool]]:
+    """
+    Rewrite an XPath expression so it can be evaluated on a multiple item in place.
+
+    Children of `multiple` MAP fields are written as if every item was its own document,
+    so `//x` has to match the item itself and its descendants instead of the whole page.
+    Such expressions are rewritten to `(self::x | descendant-or-self::node()/x)` and
+    evaluated with the item as context node. Relative expressions of fields on the item
+    run on the root element of the item document, only descendant paths and the string
+    value select the same there and on the item. Expressions that could return anything
+    else in place aren't scoped.
+
+    :param xpath: XPath expression
+    :param on_item: the field is evaluated on the item, not on an element selected in it
+    :return: tuple of the scoped expression and whether it is evaluated on the item
+        root, or None if the expression cannot be scoped
+    """
+    if not _stays_in_item(xpath):
+        return None
+    branches = [branch.strip() for branch in _split_xpath(xpath, "|")]
+    absolute = [branch.startswith("/") for branch in branches]
+    if any(absolute) and not all(absolute):
+        return None
+    if not any(absolute):
+        if _has_absolute_subpath(xpath):
+            return None
+        if not on_item or _STRING_VALUE.fullmatch(xpath.strip()):
+            return xpath, False
+        if all(
+            branch.startswith("descendant-or-self::")
+            and _node_test(_split_xpath(branch, "/")[0]) not in _WILDCARDS
+            for branch in branches
+        ):
+            return xpath, False
+        relative = []
+        for branch in branches:
+            prefix = next((axis for axis in _DESCENDANT_AXES if branch.startswith(axis)), None)
+            if prefix is None:
+                return None
+            relative.append("//" + branch[len(prefix):])
+        branches = relative
+    scoped = []
+    for branch in branches:
+        if not branch.startswith("//") or _has_absolute_subpath(branch[2:]):
+            return None
+        step, *rest = _split_xpath(branch[2:], "/")
+        if _node_test(step) in _WILDCARDS:
+            return None
+        rest = "".join("/" + part for part in rest)
+        if step.startswith((".", "@")) or "::" in step.split("[", 1)[0]:
+            scoped.append(f"descendant-or-self::node()/{step}{rest}")
+        else:
+            scoped.append(f"(self::{step} | descendant-or-self::node()/{step}){rest}")
+    return " | ".join(scoped), True
+
+
+_XPATH_TOKEN = re.compile(
+    r"""\s*(?:(?P<literal>'[^']*'|"[^"]*")|(?P<number>\d+(?:\.\d*)?|\.\d+)"""
+    r"|(?P<attribute>@[\w.:*-]+)|(?P<name>[A-Za-z_][\w.-]*(?::[A-Za-z_][\w.-]*)?)"
+    r"|(?P<operator>!=|<=|>=|::|\.\.|[()\[\],=<>|+*/.-]))"
+)
+# Functions without arguments that don't read the content of the context element
+_NO_CONTENT_FUNCTIONS = ("name", "local-name", "true", "false")
+
+
+def _tokenize_xpath(xpath: str) -> Optional[List[Tuple[str, str]]]:
+    tokens, position = [], 0
+    xpath = xpath.rstrip()
+    while position < len(xpath):
+        match = _XPATH_TOKEN.match(xpath, position)
+        if not match:
+            return None
+        tokens.append((match.lastgroup, match.group(match.lastgroup)))
+        position = match.end()
+    return tokens
+
+
+def _is_attribute_test(step: str) -> bool:
+    """
+    Check that a location step only looks at the element name and its own attributes,
+    which are known as soon as the start tag has been parsed
+    """
+    tokens = _tokenize_xpath(step)
+    if not tokens or tokens[0][0] != "name" and tokens[0][1] != "*":
+        return False
+    tokens.append(("end", ""))
+    depth = 0
+    for index, (kind, text) in enumerate(tokens[1:-1], 1):
+        following = tokens[index + 1][1]
+        if text == "[":
+            depth += 1
+            # Positional predicate
+            if tokens[index + 1][0] == "number" and tokens[index + 2][1] == "]":
+                return False
+        elif text == "]":
+            depth -= 1
+        elif depth == 0:
+            return False
+        elif kind == "name" and following == "(":
+            if text in ("position", "last"):
+                return False
+            if tokens[index + 2][1] == ")" and text not in _NO_CONTENT_FUNCTIONS:
+                return False
+        elif kind == "name" and text not in ("and", "or", "div", "mod"):
+            return False
+        elif text in (".", "..", "/", "::", "*"):
+            return False
+    return depth == 0
+
+
+# Functions and node tests reading the text of all descendants or selecting any node
+_CONTENT_FUNCTIONS = frozenset(("string", "normalize-space", "node"))
+# Last steps of location paths selecting attributes or the text and comments of elements
+_VALUE_STEPS = re.compile(r"(?:@|attribute::)[\w.:*-]+|(?:child::)?(?:text|comment)\(\s*\)")
+_FUNCTION_CALL = re.compile(r"[A-Za-z_][\w.:-]*\s*\(.*\)", re.DOTALL)
+
+
+def reads_content(xpath: str, elements: bool = True) -> bool:
+    """
+    Check if the result of an expression can contain the text of any element below the
+    selected nodes, e.g. of a script inside them, instead of attributes or text nodes of
+    named elements only
+
+    :param xpath: XPath expression
+    :param elements: selected elements are returned as their HTML or text, False for
+        fields using them as they are, like MAP and BOOLEAN fields
+    :return: bool
+    """
+    tokens = _tokenize_xpath(xpath)
+    if tokens is None:
+        return True
+    tokens.append(("end", ""))
+    for index, (kind, text) in enumerate(tokens[:-1]):
+        following = tokens[index + 1][1]
+        if text == "*":
+            return True
+        if text == "." and following != "/":
+            return True
+        if kind == "name" and following == "(":
+            # The string value of an attribute is its value, e.g. in translated CSS classes
+            argument = [kind for kind, _ in tokens[index + 2 : index + 4]]
+            attribute = argument == ["attribute", "operator"] and tokens[index + 3][1] == ")"
+            if text in _CONTENT_FUNCTIONS and not attribute:
+                return True
+            if text == "text" and index >= 2:
+                previous = tokens[index - 2][1], tokens[index - 1][1]
+                # `//text()` and `descendant::text()` select the text of all descendants
+                if previous == ("/", "/") or previous[1] == "::" and previous[0] != "child":
+                    return True
+    if not elements:
+        return False
+    for branch in _split_xpath(xpath, "|"):
+        last = _split_xpath(branch.strip(), "/")[-1].split("[", 1)[0].strip()
+        if _VALUE_STEPS.fullmatch(last):
+            continue
+        if _FUNCTION_CALL.fullmatch(branch.strip()):
+            continue
+        return True
+    return False
+
+
+def compile_item_matcher(
+    field: str, selector_type: SelectorType, selector: Union[str, List[str]]
+) -> lxml.etree.XPath:
+    """
+    Compile the selector of a multiple field to a test of a single element, so items can
+    be recognized on the start tag while streaming a document.
+
+    `//ul[@class="items"]/li` is compiled to `self::li[parent::ul[@class="items"]]`. Only
+    paths of name tests with attribute predicates are supported, positions or
+    predicates on the content aren't known on the start tag.
+
+    :param field: field name
+    :param selector_type: SelectorType of the selector
+    :param selector: XPath or CSS selector of the items
+    :return: lxml.etree.XPath evaluating to True for item elements
+    :raises: StreamingNotSupportedException
+    """
+    if selector_type == SelectorType.REGEX or isinstance(selector, list):
+        raise StreamingNotSupportedException(field, "only a single XPath or CSS selector")
+    xpath = css_to_xpath(selector, field) if selector_type == SelectorType.CSS else selector
+    xpath = xpath.strip()
+    if xpath.startswith("descendant-or-self::"):
+        xpath = "//" + xpath[len("descendant-or-self::"):]
+    if not xpath.startswith("/") or len(_split_xpath(xpath, "|")) > 1:
+        raise StreamingNotSupportedException(field, "only absolute location paths")
+    condition, separator = None, "/"
+    for part in _split_xpath(xpath[1:], "/"):
+        if not part:
+            separator = "//"
+            continue
+        if not _is_attribute_test(part):
+            raise StreamingNotSupportedException(field, f"unsupported step {part}")
+        if condition is None:
+            condition = part if separator == "//" else f"{part}[not(parent::*)]"
+        else:
+            axis = "parent" if separator == "/" else "ancestor"
+            condition = f"{part}[{axis}::{condition}]"
+        separator = "/"
+    if condition is None:
+        raise StreamingNotSupportedException(field, "empty location path")
+    return compile_xpath(f"boolean(self::{condition})", field)
+
+
+# First steps of the location paths answered from the document index
+_INDEX_NAME = r"(?P<tag>[A-Za-z][\w-]*|\*)"
+_INDEX_LITERAL = r"""(?P<quote>['"])(?P<value>[^'"]*)(?P=quote)"""
+_INDEX_STEPS = (
+    ("attr", re.compile(rf"{_INDEX_NAME}\[\s*@(?P<attr>[\w-]+)\s*=\s*{_INDEX_LITERAL}\s*\]")),
+    (
+        "contains",
+        re.compile(
+            rf"{_INDEX_NAME}\[\s*contains\(\s*@(?P<attr>[\w-]+)\s*,\s*{_INDEX_LITERAL}\s*\)\s*\]"
+        ),
+    ),
+    # Class selector as translated from CSS
+    (
+        "class",
+        re.compile(
+            rf"{_INDEX_NAME}\[@class and contains\(@class, '(?P<value>[^'\s]+)'\) and "
+            r"contains\(concat\(' ', normalize-space\(@class\), ' '\), ' (?P=value) '\)\]"
+        ),
+    ),
+    ("tag", re.compile(r"(?P<tag>[A-Za-z][\w-]*)")),
+)
+# Axes of the steps after the first one that stay in the subtree of the indexed element
+_INDEX_AXES = ("child", "descendant", "descendant-or-self", "attribute", "self")
+
+
+def _index_key(step: str) -> Optional[Tuple]:
+    for kind, pattern in _INDEX_STEPS:
+        match = pattern.fullmatch(step)
+        if match is None:
+            continue
+        groups = match.groupdict()
+        tag = None if groups["tag"] == "*" else groups["tag"]
+        if kind == "tag":
+            return kind, tag
+        if kind == "class":
+            return kind, tag, groups["value"]
+        if kind == "contains" and not groups["value"]:
+            return None
+        return kind, tag, groups["attr"], groups["value"]
+    return None
+
+
+def index_selector(xpath: str, field: str = "") -> Optional[Tuple]:
+    """
+    Split a location path like `//div[@id="main"]/span/text()` into the lookup of the
+    first step in the document index and the remaining path evaluated on its elements.
+
+    Supported first steps are a tag name, optionally with an attribute equality, a
+    `contains()` of an attribute or a CSS class test. The rest of the path may only use
+    axes that stay in the subtree of the indexed element.
+
+    :param xpath: XPath expression
+    :param field: field name used in the error message
+    :return: tuple of the index key and the compiled rest of the path or None, or None if
+        the expression can't be answered from the index
+    """
+    xpath = xpath.strip()
+    if xpath.startswith("descendant-or-self::"):
+        xpath = "//" + xpath[len("descendant-or-self::"):]
+    if not xpath.startswith("//") or len(_split_xpath(xpath, "|")) > 1:
+        return None
+    step, *rest = _split_xpath(xpath[2:], "/")
+    key = _index_key(step.strip())
+    if key is None:
+        return None
+    for part in rest:
+        head = part.split("[", 1)[0].strip()
+        if head.startswith("..") or "::" in head and head.split("::")[0] not in _INDEX_AXES:
+            return None
+    if not rest:
+        return key, None
+    return key, compile_xpath("." + "".join("/" + part for part in rest), field)
+
+
+def compile_index_selectors(
+    field: str, selector_type: SelectorType, selector: Union[str, List[str]]
+) -> Optional[Tuple]:
+    """
+    Split the selector alternatives of a top level field for the document index
+
+    :param field: field name
+    :param selector_type: SelectorType of the selector
+    :param selector: single selector or list of fallback selectors
+    :return: tuple with the result of `index_selector` for every alternative, or None if
+        no alternative can be answered from the index
+    """
+    if selector_type == SelectorType.REGEX:
+        return None
+    selectors = selector if isinstance(selector, list) else [selector]
+    if selector_type == SelectorType.CSS:
+        selectors = [css_to_xpath(sel, field) for sel in selectors]
+    result = tuple(index_selector(sel, field) for sel in selectors)
+    return result if any(result) else None
+
+
+def compile_scoped_selectors(
+    field: str,
+    selector_type: SelectorType,
+    selector: Union[str, List[str]],
+    on_item: bool = True,
+) -> Optional[Tuple]:
+    """
+    Compile the selector alternatives of a field evaluated in place on multiple items
+
+    :param field: field name
+    :param selector_type: SelectorType of the selector
+    :param selector: single selector or list of fallback selectors
+    :param on_item: the field is evaluated on the item, not on an element selected in it
+    :return: tuple of (compiled selector, evaluated on item root) pairs, or None if a
+        selector cannot be scoped to the item
+    """
+    selectors = selector if isinstance(selector, list) else [selector]
+    if selector_type == SelectorType.REGEX:
+        return tuple((compile_regex(sel, field), False) for sel in selectors)
+    if selector_type == SelectorType.CSS:
+        selectors = [css_to_xpath(sel, field) for sel in selectors]
+    result = []
+    for sel in selectors:
+        scoped = scope_xpath(sel, on_item)
+        if scoped is None:
+            return None
+        result.append((compile_xpath(scoped[0], field), scoped[1]))
+    return tuple(result)
+
+
+def compile_selectors(
+    field: str, selector_type: SelectorType, selector: Union[str, List[str]]
+) -> Tuple:
+    """
+    Compile the selector alternatives of a field definition in YAML order
+
+    :param field: field name
+    :param selector_type: SelectorType of the selector
+    :param selector: single selector or list of fallback selectors
+    :return: tuple of lxml.etree.XPath or re.Pattern objects
+    """
+    selectors = selector if isinstance(selector, list) else [selector]
+    if selector_type == SelectorType.REGEX:
+        return tuple(compile_regex(sel, field) for sel in selectors)
+    if selector_type == SelectorType.CSS:
+        return tuple(compile_xpath(css_to_xpath(sel, field), field) for sel in selectors)
+    return tuple(compile_xpath(sel, field) for sel in selectors)
@@ -0,0 +1,121 @@
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import lxml.etree
+
+from pyparsy.internal.tree import ContextNodes
+
+_XML_WHITESPACE = re.compile(r"[ \t\r\n]+")
+# Attribute nodes keep a reference to their element with smart strings
+_attribute_xpaths: Dict[str, lxml.etree.XPath] = {}
+
+
+def _attribute_xpath(attribute: str) -> lxml.etree.XPath:
+    xpath = _attribute_xpaths.get(attribute)
+    if xpath is None:
+        xpath = _attribute_xpaths[attribute] = lxml.etree.XPath(f"//@{attribute}")
+    return xpath
+
+
+class IndexedNodes(ContextNodes):
+    """
+    Context nodes of the document root, carrying the index of the document
+    """
+
+    __slots__ = ("index",)
+
+    def __init__(self, nodes: Iterable, index: "DocumentIndex", texts: Optional[List[str]] = None):
+        super().__init__(nodes, texts)
+        self.index = index
+
+
+class DocumentIndex:
+    """
+    Elements of a document matching the first steps of simple selectors, like
+    `//div[@id="main"]` or `.price`, collected at once for all fields.
+
+    Every attribute used by the selectors is read from the document with a single XPath
+    and every tag name with a single iteration, instead of walking the whole document
+    for every field.
+    """
+
+    __slots__ = ("root", "elements")
+
+    def __init__(self, root: lxml.etree._Element, keys: Iterable[Tuple]):
+        """
+        :param root: root element of the document
+        :param keys: index keys from `compiler.index_selector`
+        """
+        self.root = root
+        self.elements: Dict[Tuple, List[lxml.etree._Element]] = {}
+        by_attribute: Dict[str, List[Tuple]] = {}
+        tags = set()
+        for key in keys:
+            self.elements[key] = []
+            if key[0] == "tag":
+                tags.add(key[1])
+            else:
+                by_attribute.setdefault("class" if key[0] == "class" else key[2], []).append(key)
+        if tags:
+            for element in root.iter(*tags):
+                self.elements[("tag", element.tag)].append(element)
+        for attribute, attribute_keys in by_attribute.items():
+            self.__index_attribute(attribute, attribute_keys)
+
+    def __index_attribute(self, attribute: str, keys: List[Tuple]):
+        equal: Dict[str, List[Tuple]] = {}
+        other = []
+        for key in keys:
+            if key[0] == "attr":
+                equal.setdefault(key[3], []).append(key)
+            else:
+                other.append(key)
+        for value in _attribute_xpath(attribute)(self.root):
+            element = None
+            for key in equal.get(value, ()):
+                element = element if element is not None else value.getparent()
+                if key[1] is None or key[1] == element.tag:
+                    self.elements[key].append(element)
+            tokens = None
+            for key in other:
+                if key[-1] not in value:
+                    continue
+                if key[0] == "class":
+                    # Same as `contains(concat(' ', normalize-space(@class), ' '), ' x ')`
+                    tokens = tokens if tokens is not None else _XML_WHITESPACE.split(value)
+                    if key[2] not in tokens:
+                        continue
+                element = element if element is not None else value.getparent()
+                if key[1] is None or key[1] == element.tag:
+                    self.elements[key].append(element)
+
+    def select(self, key: Tuple, rest: Optional[lxml.etree.XPath]) -> Optional[List]:
+        """
+        Evaluate an indexed selector
+
+        :param key: index key of the first step
+        :param rest: compiled rest of the path evaluated on the indexed elements
+        :return: list - same result as the whole selector on the document, or None if
+            the indexed elements are nested and the selector has to be evaluated normally
+        """
+        elements = self.elements[key]
+        if rest is None:
+            return list(elements)
+        if len(elements) > 1 and _has_nested(elements):
+            # Results of nested elements would be out of document order or duplicated
+            return None
+        result = []
+        for element in elements:
+            result.extend(rest(element))
+        return result
+
+
+def _has_nested(elements: List[lxml.etree._Element]) -> bool:
+    members = set(elements)
+    for element in elements:
+        parent = element.getparent()
+        while parent is not None:
+            if parent in members:
+                return True
+            parent = parent.getparent()
+    return False
@@ -0,0 +1,102 @@
+import threading
+from collections import deque
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, List
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+# Parser of the current worker process, set once by the pool initializer
+_worker_parser = None
+# Parser of the current thread of a thread pool
+_thread_local = threading.local()
+
+
+def init_worker(parser) -> None:
+    """
+    Pool initializer keeping the unpickled (and compiled) parser in the worker process
+    """
+    global _worker_parser
+    _worker_parser = parser
+
+
+def parse_chunk(html_strings: List[str]) -> List[Any]:
+    """
+    Parse a chunk of pages with the parser of the worker process
+    """
+    return [_worker_parser.parse(html_string) for html_string in html_strings]
+
+
+def init_thread_worker(parser) -> None:
+    """
+    Thread pool initializer giving the worker thread its own compiled copy of the parser
+    """
+    _thread_local.parser = parser._thread_copy()
+
+
+def parse_chunk_in_thread(html_strings: List[str]) -> List[Any]:
+    """
+    Parse a chunk of pages with the parser of the worker thread
+    """
+    parser = _thread_local.parser
+    return [parser.parse(html_string) for html_string in html_strings]
+
+
+def _chunks(iterable: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _pop_done(pending: deque, ordered: bool) -> List[Any]:
+    """
+    Wait for the oldest chunk, or any chunk when unordered, and return its results
+    """
+    if ordered:
+        return pending.popleft().result()
+    from concurrent.futures import FIRST_COMPLETED, wait
+
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    result = []
+    for future in done:
+        pending.remove(future)
+        result.extend(future.result())
+    return result
+
+
+def map_chunks(
+    executor: "Executor",
+    function: Callable[[List], List],
+    iterable: Iterable,
+    chunksize: int,
+    max_pending: int,
+    ordered: bool = True,
+) -> Iterator[Any]:
+    """
+    Lazily submit chunks of `iterable` to the executor and stream back the results.
+
+    Unlike `Executor.map`, at most `max_pending` chunks are in flight, so the input is
+    consumed only as fast as the results are, and the results can be yielded as completed.
+
+    :param executor: executor running the chunks
+    :param function: function applied to every chunk, returning a list of results
+    :param iterable: input items
+    :param chunksize: number of items sent to a worker at once
+    :param max_pending: maximum number of submitted and not yet yielded chunks
+    :param ordered: yield the results in input order, or as soon as a chunk is done
+    :return: iterator of results
+    """
+    pending = deque()
+    try:
+        for chunk in _chunks(iterable, chunksize):
+            pending.append(executor.submit(function, chunk))
+            if len(pending) >= max_pending:
+                yield from _pop_done(pending, ordered)
+        while pending:
+            yield from _pop_done(pending, ordered)
+    finally:
+        for future in pending:
+            future.cancel()
@@ -0,0 +1,63 @@
+from typing import Any, List, Optional, Tuple
+
+import lxml.etree
+
+from pyparsy.budget import timed_patterns
+from pyparsy.enum_types import SelectorType
+from pyparsy.internal import Definition
+from pyparsy.internal.index import IndexedNodes
+from pyparsy.internal.tree import evaluate_regex, evaluate_xpath
+
+
+def evaluate_alternative(
+    html_data: List, definition: Definition, scope: Optional[lxml.etree._Element], index: int
+) -> List[Any]:
+    """
+    Evaluate a single selector alternative of a definition
+
+    :param html_data: list of `lxml.etree` context nodes
+    :param definition: Definition - of the field
+    :param scope: item element the field is evaluated in place on, None for the document
+    :param index: index of the alternative in YAML order
+    :return: list - result of the selector query
+    """
+    if definition.selector_type == SelectorType.REGEX:
+        return evaluate_regex(timed_patterns(definition.selectors[index : index + 1])[0], html_data)
+    if isinstance(html_data, IndexedNodes) and definition.index_selectors is not None:
+        indexed = definition.index_selectors[index]
+        if indexed is not None:
+            result = html_data.index.select(*indexed)
+            if result is not None:
+                return result
+    if scope is not None:
+        xpath, on_scope = definition.scoped_selectors[index]
+        if on_scope:
+            context = [scope for node in html_data if isinstance(node, lxml.etree._Element)]
+            return evaluate_xpath(xpath, context)
+        return evaluate_xpath(xpath, html_data)
+    return evaluate_xpath(definition.selectors[index], html_data)
+
+
+def select_alternative(
+    html_data: List,
+    definition: Definition,
+    scope: Optional[lxml.etree._Element] = None,
+) -> Tuple[Any, Optional[int]]:
+    """
+    Evaluate the selectors of a definition like `Parsy._get_selector_data` and also
+    return the index of the alternative that matched
+
+    :param html_data: list of `lxml.etree` context nodes
+    :param definition: Definition - of the field
+    :param scope: item element the field is evaluated in place on, None for the document
+    :return: tuple of the selector result and the index of the matched alternative
+    """
+    result, matched = [], None
+    for index in range(len(definition.selectors)):
+        result = evaluate_alternative(html_data, definition, scope, index)
+        if result:
+            matched = index
+            break
+    if definition.selector_type == SelectorType.REGEX and not definition.multiple:
+        return (result[0] if result else None), matched
+    return result, matched
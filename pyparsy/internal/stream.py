@@ -0,0 +1,178 @@
+import queue
+import re
+import threading
+from typing import Any, BinaryIO, Callable, Iterator, Optional, Union
+
+import lxml.etree
+
+_DONE = object()
+_INVALID_NAME_CHARACTERS = re.compile(r"[^\w.-]")
+
+
+class _StopStreaming(Exception):
+    pass
+
+
+class _Failure:
+    __slots__ = ("exception",)
+
+    def __init__(self, exception: BaseException):
+        self.exception = exception
+
+
+def _make_element(parent: Optional[lxml.etree._Element], tag: str, attrib: dict):
+    try:
+        if parent is None:
+            return lxml.etree.Element(tag, attrib)
+        return lxml.etree.SubElement(parent, tag, attrib)
+    except ValueError:
+        # libxml2 keeps names like `xlink:href` or `@click` that lxml refuses to create,
+        # they can't be selected with XPath either
+        valid = {}
+        for name, value in attrib.items():
+            try:
+                lxml.etree.Element("a").set(name, value)
+                valid[name] = value
+            except ValueError:
+                continue
+        try:
+            lxml.etree.Element(tag)
+        except ValueError:
+            tag = _INVALID_NAME_CHARACTERS.sub("_", tag) or "_"
+        return _make_element(parent, tag, valid)
+
+
+class ItemTreeTarget:
+    """
+    Parser target building only the parts of the tree that are still needed.
+
+    Items are recognized on the start tag with the compiled item matcher, built in full
+    and handed to `on_item` as soon as their end tag is parsed. Outside of items only the
+    chain of open ancestors is kept: finished elements are removed from their parent
+    right away and text and comments are skipped.
+    """
+
+    def __init__(
+        self,
+        matcher: lxml.etree.XPath,
+        on_item: Callable[[lxml.etree._Element], None],
+        stop: threading.Event,
+    ):
+        self._matcher = matcher
+        self._on_item = on_item
+        self._stop = stop
+        self._item = None
+        self._stack = []
+        # Element receiving the pending text, as text or as tail
+        self._last = None
+        self._tail = False
+        self._data = []
+
+    def _flush(self):
+        if not self._data:
+            return
+        text = "".join(self._data)
+        self._data = []
+        if self._tail:
+            self._last.tail = (self._last.tail or "") + text
+        else:
+            self._last.text = (self._last.text or "") + text
+
+    def start(self, tag, attrib):
+        if self._stop.is_set():
+            raise _StopStreaming()
+        self._flush()
+        element = _make_element(self._stack[-1] if self._stack else None, tag, attrib)
+        self._stack.append(element)
+        self._last, self._tail = element, False
+        if self._item is None and self._matcher(element):
+            self._item = element
+
+    def end(self, tag):
+        self._flush()
+        element = self._stack.pop()
+        self._last, self._tail = element, True
+        if element is self._item:
+            self._on_item(element)
+            self._item = None
+        if self._item is None and self._stack:
+            self._stack[-1].remove(element)
+
+    def data(self, data):
+        if self._item is not None:
+            self._data.append(data)
+
+    def comment(self, text):
+        if self._item is not None:
+            self._flush()
+            comment = lxml.etree.Comment(text)
+            self._stack[-1].append(comment)
+            self._last, self._tail = comment, True
+
+    def close(self):
+        return None
+
+
+def stream_items(
+    source: Union[str, BinaryIO],
+    matcher: lxml.etree.XPath,
+    parse_item: Callable[[lxml.etree._Element], Any],
+    encoding: Optional[str] = None,
+    buffer_size: int = 64,
+) -> Iterator[Any]:
+    """
+    Parse the items of a document in a reader thread and yield them as they are done.
+
+    libxml2 only frees the consumed input in pull mode, so the document is parsed with
+    a single `lxml.etree.parse` call in a thread and the parsed items are passed back
+    through a bounded queue. The reader is held back while `buffer_size` items wait to
+    be consumed and is stopped when the returned iterator is closed.
+
+    :param source: path or binary file object of the HTML document
+    :param matcher: compiled test recognizing item elements on their start tag
+    :param parse_item: called in the reader thread with every finished item element
+    :param encoding: encoding of the document, detected by libxml2 if not given
+    :param buffer_size: maximum number of parsed items waiting to be consumed
+    :return: iterator of the `parse_item` results
+    """
+    results = queue.Queue(buffer_size)
+    stop = threading.Event()
+
+    def put(value):
+        while not stop.is_set():
+            try:
+                results.put(value, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+        raise _StopStreaming()
+
+    def read():
+        try:
+            target = ItemTreeTarget(matcher, lambda item: put(parse_item(item)), stop)
+            parser = lxml.etree.HTMLParser(
+                target=target, recover=True, huge_tree=True, encoding=encoding
+            )
+            lxml.etree.parse(source, parser)
+            put(_DONE)
+        except _StopStreaming:
+            pass
+        except BaseException as e:
+            try:
+                put(_Failure(e))
+            except _StopStreaming:
+                pass
+
+    reader = threading.Thread(target=read, name="pyparsy-stream", daemon=True)
+    reader.start()
+    try:
+        while True:
+            value = results.get()
+            if value is _DONE:
+                return
+            if isinstance(value, _Failure):
+                raise value.exception
+            yield value
+    finally:
+        stop.set()
+        reader.join()
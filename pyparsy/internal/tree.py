@@ -0,0 +1,253 @@
+import codecs
+import mmap
+import re
+from typing import Any, BinaryIO, Iterable, List, Optional, Tuple, Union
+
+import lxml.etree
+import lxml.html
+
+HtmlInput = Union[str, bytes, bytearray, memoryview, mmap.mmap, BinaryIO]
+
+# Number of bytes searched for a byte order mark or a meta charset, as in the HTML standard
+SNIFF_SIZE = 1024
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+_META_CHARSET = re.compile(rb"""<meta[^>]+?charset\s*=\s*["']?\s*([\w.:-]+)""", re.IGNORECASE)
+# Name of comment nodes in the names of pruned nodes
+COMMENT = "#comment"
+
+
+def sniff_encoding(head: bytes, default: str = "utf-8") -> str:
+    """
+    Detect the encoding of an HTML document from its first bytes
+
+    :param head: first bytes of the document
+    :param default: encoding used without a byte order mark or a known meta charset
+    :return: name of the encoding
+    """
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding
+    match = _META_CHARSET.search(head)
+    if match:
+        try:
+            return codecs.lookup(match.group(1).decode("ascii")).name
+        except LookupError:
+            pass
+    return default
+
+
+class _PrefixedReader:
+    """
+    File object reading the already sniffed head before the rest of the file
+    """
+
+    def __init__(self, head: bytes, file: BinaryIO):
+        self._head = head
+        self._file = file
+
+    def read(self, size: int = -1) -> bytes:
+        if self._head:
+            head, self._head = self._head, b""
+            return head
+        return self._file.read(size)
+
+
+def _html_parser(encoding: str) -> lxml.html.HTMLParser:
+    return lxml.html.HTMLParser(recover=True, encoding=encoding, huge_tree=True)
+
+
+def create_root_node(
+    html: HtmlInput, encoding: Optional[str] = None, prune: Tuple[str, ...] = ()
+) -> lxml.etree._Element:
+    """
+    Build the lxml tree of an HTML document.
+
+    Strings are parsed the same way `parsel.Selector` does. Bytes, memoryviews and mmaps
+    are handed to libxml2 as they are and binary files are read by the parser in chunks,
+    so the document is never decoded to a `str` first. NUL bytes aren't removed from
+    binary input but replaced by libxml2 like other invalid characters.
+
+    :param html: HTML formatted string, bytes-like object or binary file object
+    :param encoding: encoding of binary input, detected from the document if not given
+    :param prune: names of the elements removed with their content but without their
+        tail text, `#comment` for comments
+    :return: root element of the document
+    """
+    if isinstance(html, str):
+        body = html.strip().replace("\x00", "").encode("utf8") or b"<html/>"
+        parser = _html_parser("utf8")
+        root = lxml.etree.fromstring(body, parser=parser)
+    elif hasattr(html, "read"):
+        head = html.read(SNIFF_SIZE)
+        parser = _html_parser(encoding or sniff_encoding(head))
+        try:
+            root = lxml.etree.parse(_PrefixedReader(head, html), parser).getroot()
+        except lxml.etree.XMLSyntaxError:
+            root = None
+    else:
+        with memoryview(html) as view:
+            parser = _html_parser(encoding or sniff_encoding(bytes(view[:SNIFF_SIZE])))
+            root = lxml.etree.fromstring(view, parser=parser) if view.nbytes else None
+    if root is None:
+        root = lxml.etree.fromstring(b"<html/>", parser=parser)
+    if prune:
+        # libxml2 has no option to skip elements, a parser target or pull parser dropping
+        # them while parsing is slower than removing them from the finished tree. Comments
+        # are removed the same way, as the remove_comments option of libxml2 joins the text
+        # before and after a comment into one text node.
+        tags = [lxml.etree.Comment if tag == COMMENT else tag for tag in prune]
+        lxml.etree.strip_elements(root, *tags, with_tail=False)
+    return root
+
+
+def read_text(html: HtmlInput, encoding: Optional[str] = None) -> str:
+    """
+    Text of an HTML document as it is, without building its tree
+
+    :param html: HTML formatted string, bytes-like object or binary file object
+    :param encoding: encoding of binary input, detected from the document if not given
+    :return: str
+    """
+    if isinstance(html, str):
+        return html
+    if hasattr(html, "read"):
+        html = html.read()
+    with memoryview(html) as view:
+        data = view.tobytes()
+    return data.decode(encoding or sniff_encoding(data[:SNIFF_SIZE]), errors="replace")
+
+
+class ContextNodes(list):
+    """
+    Context nodes of the fields of a document or item, keeping their serialized text
+    once a REGEX field needed it, so the other REGEX fields don't serialize them again
+    """
+
+    __slots__ = ("_texts",)
+
+    def __init__(self, nodes: Iterable = (), texts: Optional[List[str]] = None):
+        """
+        :param nodes: context nodes
+        :param texts: text the REGEX fields are evaluated on, serialized nodes if not given
+        """
+        super().__init__(nodes)
+        self._texts = texts
+
+    def texts(self) -> List[str]:
+        if self._texts is None:
+            self._texts = [serialize(node) for node in self]
+        return self._texts
+
+
+def _texts(nodes: List[Any]) -> List[str]:
+    if isinstance(nodes, ContextNodes):
+        return nodes.texts()
+    return [serialize(node) for node in nodes]
+
+
+def serialize(node: Any) -> str:
+    """
+    Serialize a single XPath result like `parsel.Selector.get()`
+
+    :param node: element, string, number or boolean XPath result
+    :return: str
+    """
+    if isinstance(node, str):
+        return node
+    try:
+        return lxml.etree.tostring(node, method="html", encoding="unicode", with_tail=False)
+    except (AttributeError, TypeError):
+        if node is True:
+            return "1"
+        if node is False:
+            return "0"
+        return str(node)
+
+
+def evaluate_xpath(xpath: lxml.etree.XPath, nodes: List[Any]) -> List[Any]:
+    """
+    Evaluate a compiled XPath on every context node and flatten the results
+
+    :param xpath: compiled XPath expression
+    :param nodes: context nodes
+    :return: list of XPath results
+    """
+    result = []
+    for node in nodes:
+        if isinstance(node, lxml.etree._Element):
+            value = xpath(node)
+            if isinstance(value, list):
+                result.extend(value)
+            else:
+                result.append(value)
+        elif isinstance(node, str) and xpath.path.strip() == ".":
+            result.append(node)
+    return result
+
+
+def evaluate_regex(regex, nodes: List[Any]) -> List[str]:
+    """
+    Apply a compiled regex to the serialized context nodes like `parsel.SelectorList.re()`
+
+    :param regex: compiled regex
+    :param nodes: context nodes
+    :return: list of matched strings
+    """
+    result = []
+    for text in _texts(nodes):
+        result.extend(extract_regex(regex, text))
+    return result
+
+
+def _replace_entities(text: str) -> str:
+    from w3lib.html import replace_entities
+
+    return replace_entities(text, keep=["lt", "amp"])
+
+
+def extract_regex(regex, text: str) -> List[str]:
+    """
+    Strings matched by a compiled regex like `parsel.utils.extract_regex`: the named group
+    `extract` of the first match, all numbered groups of all matches or the whole matches
+
+    :param regex: compiled regex
+    :param text: searched text
+    :return: list of matched strings with resolved character entities
+    """
+    if "extract" in regex.groupindex:
+        match = regex.search(text)
+        value = match.group("extract") if match is not None else None
+        strings = [value] if value is not None else []
+    elif regex.groups > 1:
+        strings = [group for match in regex.findall(text) for group in match]
+    else:
+        strings = regex.findall(text)
+    return [_replace_entities(string) for string in strings]
+
+
+def search_regex(regex, nodes: List[Any]) -> Optional[str]:
+    """
+    First string `evaluate_regex` would return, found with `search` on the texts of the
+    context nodes instead of collecting all matches
+
+    :param regex: compiled regex
+    :param nodes: context nodes
+    :return: matched string, None if the regex doesn't match
+    """
+    for text in _texts(nodes):
+        match = regex.search(text)
+        if match is None:
+            continue
+        if "extract" in regex.groupindex:
+            value = match.group("extract")
+            if value is None:
+                continue
+        else:
+            # `findall` returns the first group, or the whole match without groups
+            value = match.group(1 if regex.groups else 0) or ""
+        return _replace_entities(value)
+    return None
@@ -0,0 +1,83 @@
+import threading
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from pyparsy.internal import Definition
+
+
+class LazyResult(Mapping):
+    """
+    Parse result evaluating the selectors of a field when it is read for the first time.
+
+    The value of every field is memoized, so reading it again costs nothing, and fields
+    that are never read are never evaluated. The result keeps the parsed document alive
+    until all fields have been read, `to_dict()` evaluates the remaining fields at once.
+
+        result = parser.parse(html, lazy=True)
+        if result["available"]:
+            price = result["price"]
+    """
+
+    __slots__ = ("_evaluate", "_html_data", "_definitions", "_values", "_lock")
+
+    def __init__(
+        self,
+        evaluate: Callable[[List, Definition], Any],
+        html_data: List,
+        definitions: Dict[str, Definition],
+    ):
+        """
+        :param evaluate: evaluates a top level field on the document
+        :param html_data: context nodes of the document root
+        :param definitions: top level field definitions of the result
+        """
+        self._evaluate = evaluate
+        self._html_data: Optional[List] = html_data
+        self._definitions = definitions
+        self._values: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, field: str) -> Any:
+        try:
+            return self._values[field]
+        except KeyError:
+            pass
+        definition = self._definitions[field]
+        with self._lock:
+            if field not in self._values:
+                self._values[field] = self._evaluate(self._html_data, definition)
+                if len(self._values) == len(self._definitions):
+                    # All fields are known, the document can be freed
+                    self._html_data = None
+            return self._values[field]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._definitions)
+
+    def __len__(self) -> int:
+        return len(self._definitions)
+
+    def __contains__(self, field: object) -> bool:
+        return field in self._definitions
+
+    def __repr__(self) -> str:
+        values = ", ".join(
+            f"{field!r}: {self._values[field]!r}" if field in self._values else f"{field!r}: ..."
+            for field in self._definitions
+        )
+        return f"{self.__class__.__name__}({{{values}}})"
+
+    @property
+    def evaluated(self) -> List[str]:
+        """
+        Fields that have been evaluated so far
+        """
+        return [field for field in self._definitions if field in self._values]
+
+    def to_dict(self) -> dict:
+        """
+        Evaluate all remaining fields
+
+        :return: dict
+        """
+        return {field: self[field] for field in self._definitions}
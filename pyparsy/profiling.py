@@ -0,0 +1,162 @@
+import threading
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from pyparsy.internal import Definition
+from pyparsy.internal.select import select_alternative
+
+
+class FieldEvent(NamedTuple):
+    """
+    Evaluation of a single field, passed to the instrumentation hooks
+    """
+
+    # Dotted path of the field, e.g. `products.title`
+    path: str
+    # Seconds spent on the field, including its children
+    elapsed: float
+    # Index of the selector alternative that matched, None if none did
+    alternative: Optional[int]
+    # Number of matched nodes or strings
+    matches: int
+
+
+class FieldStats:
+    """
+    Aggregated events of one field path
+    """
+
+    __slots__ = ("calls", "time", "matches", "misses", "alternatives")
+
+    def __init__(self):
+        self.calls = 0
+        self.time = 0.0
+        self.matches = 0
+        self.misses = 0
+        self.alternatives: Dict[int, int] = {}
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "time": self.time,
+            "matches": self.matches,
+            "misses": self.misses,
+            "alternatives": dict(self.alternatives),
+        }
+
+
+class ParseStats:
+    """
+    Instrumentation hook aggregating the field events by field path.
+
+        stats = ParseStats()
+        parser.instrument(stats)
+        parser.parse(html)
+        print(stats.report())
+    """
+
+    def __init__(self):
+        self.fields: Dict[str, FieldStats] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event: FieldEvent):
+        with self._lock:
+            stats = self.fields.get(event.path)
+            if stats is None:
+                stats = self.fields[event.path] = FieldStats()
+            stats.calls += 1
+            stats.time += event.elapsed
+            stats.matches += event.matches
+            if event.alternative is None:
+                stats.misses += 1
+            else:
+                stats.alternatives[event.alternative] = (
+                    stats.alternatives.get(event.alternative, 0) + 1
+                )
+
+    def reset(self):
+        with self._lock:
+            self.fields.clear()
+
+    def as_dict(self) -> Dict[str, dict]:
+        with self._lock:
+            return {path: stats.as_dict() for path, stats in self.fields.items()}
+
+    def report(self) -> str:
+        """
+        Table of the field paths, slowest first
+
+        :return: str
+        """
+        lines = [f"{'field':<40} {'calls':>8} {'ms':>10} {'matches':>8} {'misses':>8}  alternatives"]
+        for path, stats in sorted(self.as_dict().items(), key=lambda item: -item[1]["time"]):
+            alternatives = " ".join(f"{k}:{v}" for k, v in sorted(stats["alternatives"].items()))
+            lines.append(
+                f"{path:<40} {stats['calls']:>8} {stats['time'] * 1000:>10.3f} "
+                f"{stats['matches']:>8} {stats['misses']:>8}  {alternatives}"
+            )
+        return "\n".join(lines)
+
+
+class FieldProfiler:
+    """
+    Timed replacements of the field evaluation methods of a parser.
+
+    They are only installed on parsers with instrumentation hooks, so parsers without
+    hooks run the plain methods and pay nothing for the instrumentation.
+    """
+
+    def __init__(self, parse_field, parse_field_multiple, hooks: Tuple[Callable, ...]):
+        """
+        :param parse_field: plain bound `_parse_field` of the parser
+        :param parse_field_multiple: plain bound `_parse_field_multiple` of the parser
+        :param hooks: callables receiving a FieldEvent for every evaluated field
+        """
+        self._parse_field = parse_field
+        self._parse_field_multiple = parse_field_multiple
+        self._hooks = hooks
+        # Stack of the fields being evaluated in the current thread
+        self._local = threading.local()
+
+    def __frames(self) -> list:
+        try:
+            return self._local.frames
+        except AttributeError:
+            self._local.frames = []
+            return self._local.frames
+
+    def __timed(self, evaluate, html_data: List, definition: Definition, scope):
+        frames = self.__frames()
+        frames.append(None)
+        start = time.perf_counter()
+        try:
+            result = evaluate(html_data, definition, scope)
+            elapsed = time.perf_counter() - start
+        finally:
+            frame = frames.pop()
+        alternative, matches = frame or (None, 0)
+        event = FieldEvent(definition.path, elapsed, alternative, matches)
+        for hook in self._hooks:
+            hook(event)
+        return result
+
+    def parse_field(self, html_data: List, definition: Definition, scope=None) -> Any:
+        return self.__timed(self._parse_field, html_data, definition, scope)
+
+    def parse_field_multiple(self, html_data: List, definition: Definition, scope=None) -> Any:
+        def evaluate(*args):
+            return list(self._parse_field_multiple(*args))
+
+        return iter(self.__timed(evaluate, html_data, definition, scope))
+
+    def get_selector_data(self, html_data: List, definition: Definition, scope=None) -> Any:
+        data, alternative = select_alternative(html_data, definition, scope)
+        frames = self.__frames()
+        # Only the first selection of a field is its own, later ones belong to children
+        if frames and frames[-1] is None:
+            if data is None:
+                matches = 0
+            else:
+                matches = 1 if isinstance(data, str) else len(data)
+            frames[-1] = (alternative, matches)
+        return data
@@ -0,0 +1,116 @@
+import keyword
+import re
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Any, Iterator, Tuple
+
+_INVALID_IDENTIFIER_CHARACTERS = re.compile(r"\W")
+
+
+class Record(Mapping):
+    """
+    Base class of the compact results generated for MAP definitions.
+
+    The values are stored in `__slots__` instead of a dictionary per record, they can be
+    read as attributes or like from the dictionary results, e.g. `record["title"]` or
+    `record.get("title")`, and records compare equal to dictionaries with the same items.
+    Fields that are no valid identifiers are stored in mangled attribute names.
+    """
+
+    __slots__ = ()
+    # Field names in definition order and the attribute of every field
+    _fields: Tuple[str, ...] = ()
+    _attributes: dict = {}
+
+    def __getitem__(self, field: str) -> Any:
+        try:
+            return getattr(self, self._attributes[field])
+        except KeyError:
+            raise KeyError(field) from None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._fields)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{field}={self[field]!r}" for field in self._fields)
+        return f"{self.__class__.__name__}({values})"
+
+    def __reduce__(self):
+        # The generated classes can't be imported by name, they are generated again
+        return _rebuild_record, (self.__class__.__name__, self._fields, self._values())
+
+    def _values(self) -> tuple:
+        return tuple(getattr(self, attribute) for attribute in self.__slots__)
+
+    def to_dict(self) -> dict:
+        """
+        Convert the record and the records nested in it to dictionaries
+
+        :return: dict
+        """
+        return {field: _to_dict(self[field]) for field in self._fields}
+
+
+def _to_dict(value: Any) -> Any:
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_to_dict(item) for item in value]
+    return value
+
+
+def _attribute_names(fields: Tuple[str, ...]) -> Tuple[str, ...]:
+    names = []
+    for field in fields:
+        name = _INVALID_IDENTIFIER_CHARACTERS.sub("_", str(field))
+        if not name.isidentifier() or keyword.iskeyword(name) or name.startswith("_"):
+            name = f"f_{name}"
+        while name in names or hasattr(Record, name):
+            name = f"{name}_"
+        names.append(name)
+    return tuple(names)
+
+
+@lru_cache(maxsize=None)
+def record_class(name: str, fields: Tuple[str, ...]) -> type:
+    """
+    Generate the record class of a MAP definition, the same class is returned for the
+    same name and fields
+
+    :param name: class name
+    :param fields: field names in definition order
+    :return: subclass of Record
+    """
+    attributes = _attribute_names(fields)
+    arguments = ", ".join(attributes)
+    body = "".join(f"    self.{attribute} = {attribute}\n" for attribute in attributes)
+    namespace = {}
+    exec(f"def __init__(self, {arguments}):\n{body or '    pass'}\n", namespace)
+    return type(
+        name,
+        (Record,),
+        {
+            "__slots__": attributes,
+            "__init__": namespace["__init__"],
+            "_fields": fields,
+            "_attributes": dict(zip(fields, attributes)),
+        },
+    )
+
+
+def class_name(path: str) -> str:
+    """
+    Record class name of a field path, e.g. `ProductsRecord` for `products`
+
+    :param path: dotted field path, empty for the top level result
+    :return: str
+    """
+    parts = [part for part in _INVALID_IDENTIFIER_CHARACTERS.split(path) if part]
+    return "".join(part[:1].upper() + part[1:] for part in parts) + "Record"
+
+
+def _rebuild_record(name: str, fields: Tuple[str, ...], values: tuple) -> Record:
+    return record_class(name, fields)(*values)
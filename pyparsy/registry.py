@@ -0,0 +1,165 @@
+import os
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple, Union
+
+from pyparsy.exceptions import DefinitionValidationException
+from pyparsy.utils import load_yaml
+from pyparsy.validator import Validator
+
+if TYPE_CHECKING:
+    from pyparsy import Parsy
+    from pyparsy.bundle import ParsyBundle
+
+
+def load_definition(
+    path: str, validate: bool = True
+) -> Tuple[Optional[dict], List[Tuple[str, str]]]:
+    """
+    Load and validate a YAML definition, run in the worker processes of the registry
+
+    :param path: path of the YAML file
+    :param validate: bool - validate all fields of the definition
+    :return: tuple of the definition and the (field path, message) pairs of all errors
+    """
+    import yaml
+
+    try:
+        with open(path, "rb") as file:
+            yaml_def = load_yaml(file)
+    except (OSError, yaml.YAMLError) as e:
+        return None, [("", f"{e.__class__.__name__}: {e}")]
+    if not isinstance(yaml_def, dict) or not yaml_def:
+        return None, [("", "the definition has no fields")]
+    if not validate:
+        return yaml_def, []
+    validator = Validator(yaml_def, collect_errors=True)
+    return yaml_def, [
+        (field, f"{error.__class__.__name__}: {error}") for field, error in validator.errors
+    ]
+
+
+class ParsyRegistry:
+    """
+    Parsers of a set of YAML definitions by name, e.g. one definition per site and page type.
+
+    `from_directory` loads and validates all definitions of a directory in a pool of worker
+    processes and reports the errors of all definitions at once. The selectors of a
+    definition are compiled when its parser is requested for the first time.
+
+        registry = ParsyRegistry.from_directory("definitions", strip_strings=True)
+        result = registry["amazon/search"].parse(html)
+    """
+
+    def __init__(self, definitions: Dict[str, dict], **parser_options):
+        """
+        :param definitions: validated YAML definitions by name
+        :param parser_options: keyword arguments of the parsers, e.g. strip_strings
+        """
+        self.definitions = definitions
+        self.parser_options = parser_options
+        self._parsers: Dict[str, "Parsy"] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_directory(
+        cls,
+        directory: Union[str, Path],
+        pattern: str = "*.yaml",
+        workers: Optional[int] = None,
+        validate: bool = True,
+        **parser_options,
+    ) -> "ParsyRegistry":
+        """
+        Load all definitions of a directory, named by their path relative to the directory
+        without the suffix, e.g. `amazon/search` for `amazon/search.yaml`
+
+        :param directory: directory of the YAML files
+        :param pattern: glob pattern of the YAML files, e.g. `**/*.yaml` for subdirectories
+        :param workers: number of worker processes, defaults to the number of CPUs, with 1
+            the definitions are loaded in the current process
+        :param validate: bool - validate all fields of every definition
+        :param parser_options: keyword arguments of the parsers, e.g. strip_strings
+        :return: ParsyRegistry
+        :raises: DefinitionValidationException
+        """
+        directory = Path(directory)
+        paths = sorted(path for path in directory.glob(pattern) if path.is_file())
+        workers = min(workers or os.cpu_count() or 1, len(paths))
+        arguments = ([str(path) for path in paths], [validate] * len(paths))
+        if workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+
+            chunksize = max(1, len(paths) // (workers * 4))
+            with ProcessPoolExecutor(workers) as executor:
+                loaded = list(executor.map(load_definition, *arguments, chunksize=chunksize))
+        else:
+            loaded = list(map(load_definition, *arguments))
+        definitions, errors = {}, {}
+        for path, (yaml_def, definition_errors) in zip(paths, loaded):
+            name = path.relative_to(directory).with_suffix("").as_posix()
+            if definition_errors:
+                errors[name] = definition_errors
+            else:
+                definitions[name] = yaml_def
+        if errors:
+            raise DefinitionValidationException(errors)
+        return cls(definitions, **parser_options)
+
+    def get(self, name: str) -> "Parsy":
+        """
+        Parser of a definition, created on the first request
+
+        :param name: name of the definition
+        :return: Parsy
+        :raises: KeyError
+        """
+        parser = self._parsers.get(name)
+        if parser is None:
+            yaml_def = self.definitions[name]
+            with self._lock:
+                parser = self._parsers.get(name)
+                if parser is None:
+                    from pyparsy import Parsy
+
+                    parser = Parsy(yaml_def, validate=False, **self.parser_options)
+                    self._parsers[name] = parser
+        return parser
+
+    def __getitem__(self, name: str) -> "Parsy":
+        return self.get(name)
+
+    def bundle(self, *names: str) -> "ParsyBundle":
+        """
+        Bundle of the parsers of several definitions, parsing every page only once
+
+        :param names: names of the definitions, all definitions if none are given
+        :return: ParsyBundle keyed by the definition names
+        :raises: KeyError
+        """
+        from pyparsy.bundle import ParsyBundle
+
+        return ParsyBundle({name: self.get(name) for name in names or self.definitions})
+
+    def compile(self) -> "ParsyRegistry":
+        """
+        Create the parsers of all definitions now instead of on their first request
+
+        :return: the registry
+        """
+        for name in self.definitions:
+            self.get(name)
+        return self
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.definitions)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.definitions
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.definitions)
+
+    def __len__(self) -> int:
+        return len(self.definitions)
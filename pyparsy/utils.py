@@ -1,7 +1,14 @@
 import re
 from decimal import Decimal
 
-from typing import Optional
+from typing import IO, Any, Iterable, List, Optional, Union
+
+# Runs of characters are removed with a single replacement
+_NOT_NUMBER = re.compile(r"[^(\d,.)]+")
+_NOT_DIGIT = re.compile(r"\D+")
+# Same as above, but keeping the line breaks that separate the strings of a batch
+_NOT_NUMBER_LINES = re.compile(r"[^(\d,.)\n]+")
+_NOT_DIGIT_LINES = re.compile(r"[^\d\n]+")
 
 
 def __clean_string_number(given_string: str) -> str:
@@ -11,7 +18,13 @@ def __clean_string_number(given_string: str) -> str:
     :param given_string: string containing floating point number
     :return: str
     """
-    number = re.sub(r"[^(\d,.)]", "", given_string)
+    return __normalize_separators(_NOT_NUMBER.sub("", given_string))
+
+
+def __normalize_separators(number: str) -> str:
+    """
+    Use the last of comma and dot as decimal separator and remove the other one
+    """
     dot_position = number.find(".")
     comma_position = number.find(",")
     if comma_position > dot_position:
@@ -55,4 +68,75 @@ def extract_integer(integer_string: str) -> Optional[int]:
     """
     if not integer_string:
         return None
-    return int(re.sub(r"\D", "", integer_string))
+    return int(_NOT_DIGIT.sub("", integer_string))
+
+
+def __remove_in_batch(strings: List[str], pattern: re.Pattern, batch_pattern: re.Pattern):
+    """
+    Remove the characters matched by pattern from all strings with a single regex call
+    """
+    joined = "\n".join(strings)
+    if joined.count("\n") != len(strings) - 1:
+        # Line breaks inside of the strings, they are removed anyway
+        return [pattern.sub("", string) for string in strings]
+    return batch_pattern.sub("", joined).split("\n")
+
+
+def __to_array(values: List, dtype: str):
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("as_array=True requires numpy, install it with `pip install numpy`")
+    if None in values:
+        return numpy.array([numpy.nan if v is None else v for v in values], dtype="float64")
+    return numpy.array(values, dtype=dtype)
+
+
+def extract_floats(float_strings: Iterable[Optional[str]], as_array: bool = False):
+    """
+    Extract floating point numbers from many strings at once, like `extract_float`
+
+    :param float_strings: strings containing floating point numbers or None
+    :param as_array: return a numpy float64 array with NaN for missing numbers
+    :return: list of float or None, or numpy.ndarray
+    """
+    values = list(float_strings)
+    present = [index for index, value in enumerate(values) if value]
+    numbers = __remove_in_batch(
+        [values[index] for index in present], _NOT_NUMBER, _NOT_NUMBER_LINES
+    )
+    result: List[Optional[float]] = [None] * len(values)
+    for index, number in zip(present, numbers):
+        result[index] = float(__normalize_separators(number))
+    return __to_array(result, "float64") if as_array else result
+
+
+def extract_integers(integer_strings: Iterable[Optional[str]], as_array: bool = False):
+    """
+    Extract integers from many strings at once, like `extract_integer`
+
+    :param integer_strings: strings containing integers or None
+    :param as_array: return a numpy int64 array, or float64 with NaN for missing numbers
+    :return: list of int or None, or numpy.ndarray
+    """
+    values = list(integer_strings)
+    present = [index for index, value in enumerate(values) if value]
+    numbers = __remove_in_batch(
+        [values[index] for index in present], _NOT_DIGIT, _NOT_DIGIT_LINES
+    )
+    result: List[Optional[int]] = [None] * len(values)
+    for index, number in zip(present, numbers):
+        result[index] = int(number)
+    return __to_array(result, "int64") if as_array else result
+
+
+def load_yaml(stream: Union[str, bytes, IO]) -> Any:
+    """
+    Load a YAML document safely, with the libyaml based loader if PyYAML was built with it
+
+    :param stream: YAML string, bytes or file object
+    :return: the loaded document
+    """
+    import yaml
+
+    return yaml.load(stream, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
@@ -1,32 +1,90 @@
 import re
-from typing import Dict, Union
+from functools import lru_cache
+from typing import Dict, List, Tuple, Union
 
 import lxml.etree
-from schema import Schema, And, Use, Optional, Or
-
-from pyparsy.enum_types import SelectorType
-from pyparsy.exceptions import XPathValidationException, RegexValidationException
-
-DEFINITION_SCHEMA = Schema(
-    {
-        And("selector"): Or(str, list[str]),
-        And("selector_type"): And(
-            str, Use(str.upper), lambda s: s in ("XPATH", "REGEX", "CSS")
-        ),
-        Optional("multiple"): And(bool),
-        And("return_type"): And(
-            str,
-            Use(str.upper),
-            lambda s: s in ("INTEGER", "STRING", "FLOAT", "DOUBLE", "MAP"),
-        ),
-        Optional("children"): Or(dict, list),
-    }
+
+from pyparsy.enum_types import ReturnType, SelectorType
+from pyparsy.exceptions import (
+    XPathValidationException,
+    RegexValidationException,
 )
 
 
+@lru_cache(maxsize=None)
+def definition_schema():
+    """
+    Schema of a field definition, built on the first validation so parsers that don't
+    validate never import schema
+    """
+    from schema import Schema, And, Use, Optional, Or
+
+    return Schema(
+        {
+            And("selector"): Or(str, list[str]),
+            And("selector_type"): And(
+                str, Use(str.upper), lambda s: s in ("XPATH", "REGEX", "CSS")
+            ),
+            Optional("multiple"): And(bool),
+            And("return_type"): And(
+                str,
+                Use(str.upper),
+                lambda s: s in ReturnType.__members__,
+            ),
+            Optional("children"): Or(dict, list),
+        }
+    )
+
+
+_REQUIRED_KEYS = {"selector", "selector_type", "return_type"}
+_KEYS = _REQUIRED_KEYS | {"multiple", "children"}
+
+
+def _is_valid_definition(definitions) -> bool:
+    """
+    Check of the common field definitions without the schema library, which takes about a
+    millisecond per field. True only for definitions the schema accepts, everything else
+    is validated by the schema, so the errors are the same.
+    """
+    if type(definitions) is not dict:
+        return False
+    if not _REQUIRED_KEYS <= definitions.keys() <= _KEYS:
+        return False
+    selector = definitions["selector"]
+    if type(selector) is list:
+        if not selector or any(type(part) is not str for part in selector):
+            return False
+    elif type(selector) is not str:
+        return False
+    selector_type, return_type = definitions["selector_type"], definitions["return_type"]
+    if type(selector_type) is not str or selector_type.upper() not in SelectorType.__members__:
+        return False
+    if type(return_type) is not str or return_type.upper() not in ReturnType.__members__:
+        return False
+    if "multiple" in definitions and type(definitions["multiple"]) is not bool:
+        return False
+    if "children" in definitions and type(definitions["children"]) not in (dict, list):
+        return False
+    return True
+
+
+def __getattr__(name: str):
+    if name == "DEFINITION_SCHEMA":
+        return definition_schema()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 class Validator:
-    def __init__(self, yaml_def: Dict):
+    def __init__(self, yaml_def: Dict, collect_errors: bool = False):
+        """
+        :param yaml_def: Yaml definition.
+        :param collect_errors: bool - validate all fields and keep the errors in `errors`
+            instead of raising the first one
+        """
         self.yaml_def = yaml_def
+        self.collect_errors = collect_errors
+        # Dotted path of the field and the error, for every invalid field
+        self.errors: List[Tuple[str, Exception]] = []
         self.__validate_all()
 
     def __validate_all(self):
@@ -35,12 +93,31 @@ class Validator:
 
         :raises: SchemaError / XPathValidationException / RegexValidationException / CSSValidationException
         """
-        for field, definitions in self.yaml_def.items():
-            self.validate_schema(definitions)
-            if SelectorType[definitions.get("selector_type")] == SelectorType.XPATH:
-                self.validate_xpath(definitions.get("selector"), field)
-            if SelectorType[definitions.get("selector_type")] == SelectorType.REGEX:
-                self.validate_regex(definitions.get("selector"), field)
+        self.__validate_fields(self.yaml_def, "")
+
+    def __validate_fields(self, fields: Dict, parent: str):
+        for field, definitions in fields.items():
+            path = f"{parent}.{field}" if parent else str(field)
+            try:
+                self.__validate_field(definitions, path)
+            except Exception as e:
+                if not self.collect_errors:
+                    raise e
+                self.errors.append((path, e))
+                continue
+            children = definitions.get("children")
+            if isinstance(children, dict):
+                self.__validate_fields(children, path)
+
+    def __validate_field(self, definitions: Dict, path: str):
+        self.validate_schema(definitions)
+        selector_type = SelectorType[definitions.get("selector_type")]
+        if selector_type == SelectorType.XPATH:
+            self.validate_xpath(definitions.get("selector"), path)
+        if selector_type == SelectorType.REGEX:
+            self.validate_regex(definitions.get("selector"), path)
+        if selector_type == SelectorType.CSS:
+            self.validate_css(definitions.get("selector"), path)
 
     def validate_schema(self, definitions: Dict):
         """
@@ -50,8 +127,10 @@ class Validator:
         :return:
         :raises: SchemaError
         """
+        if _is_valid_definition(definitions):
+            return
         try:
-            DEFINITION_SCHEMA.validate(definitions)
+            definition_schema().validate(definitions)
         except Exception as e:
             raise e
 
@@ -88,3 +167,16 @@ class Validator:
                     re.compile(reg)
         except Exception:
             raise RegexValidationException(field)
+
+    def validate_css(self, css: Union[str, list[str]], field: str):
+        """
+        Validates the css selector in definition
+
+        :param css: CSS selector
+        :param field: field
+        :raises: CSSValidationException
+        """
+        from pyparsy.internal.compiler import css_to_xpath
+
+        for selector in [css] if isinstance(css, str) else css:
+            css_to_xpath(selector, field)
@@ -0,0 +1,262 @@
+import csv
+import json
+from collections.abc import Mapping
+from pathlib import Path
+from typing import IO, Any, Dict, List, Optional, Sequence, Union
+
+from pyparsy.enum_types import ReturnType, SelectorType
+from pyparsy.internal import Definition
+
+Destination = Union[str, Path, IO]
+
+BUFFER_SIZE = 1 << 16
+
+
+def _is_list(definition: Definition, top_level: bool) -> bool:
+    """
+    Whether the values of a field are lists: multiple top level fields, and multiple
+    REGEX fields below a MAP, other `multiple` children return a single value
+    """
+    return definition.multiple and (top_level or definition.selector_type == SelectorType.REGEX)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f"Object of type {value.__class__.__name__} is not JSON serializable")
+
+
+class Writer:
+    """
+    Base class of the sinks `Parsy.parse_to` writes the parse results to.
+
+    A writer writes one record at a time to a path or an open file object, file objects
+    are flushed but not closed by the writer. Writers are context managers and can also
+    be used without `parse_to`:
+
+        with JSONLinesWriter("products.jsonl") as writer:
+            for html in pages:
+                writer.write(parser.parse(html))
+    """
+
+    binary = False
+    newline: Optional[str] = None
+
+    def __init__(self, destination: Destination, buffer_size: int = BUFFER_SIZE):
+        """
+        :param destination: path of the output file or open file object
+        :param buffer_size: size of the write buffer of files opened by the writer
+        """
+        self.destination = destination
+        self.buffer_size = buffer_size
+        self.count = 0
+        self._file: Optional[IO] = None
+        self._owns_file = False
+
+    def open(self, definitions: Dict[str, Definition], top_level: bool = True):
+        """
+        Prepare the writer for the records of the given field definitions, called by
+        `Parsy.parse_to` before the first record
+
+        :param definitions: field definitions of the written records
+        :param top_level: whether the records are whole parse results or items of a field
+        """
+
+    def write(self, record: Mapping):
+        """
+        Write a single parse result or item
+
+        :param record: dictionary or Record
+        """
+        raise NotImplementedError
+
+    def close(self):
+        if self._file is None:
+            return
+        if self._owns_file:
+            self._file.close()
+        else:
+            self._file.flush()
+        self._file = None
+
+    def _output(self) -> IO:
+        if self._file is None:
+            if hasattr(self.destination, "write"):
+                self._file = self.destination
+            else:
+                mode = "wb" if self.binary else "w"
+                kwargs = {} if self.binary else {"encoding": "utf-8", "newline": self.newline}
+                self._file = open(self.destination, mode, buffering=self.buffer_size, **kwargs)
+                self._owns_file = True
+        return self._file
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class JSONLinesWriter(Writer):
+    """
+    Write every record as a JSON object on its own line
+    """
+
+    def __init__(
+        self, destination: Destination, ensure_ascii: bool = False, buffer_size: int = BUFFER_SIZE
+    ):
+        """
+        :param destination: path of the output file or open text file object
+        :param ensure_ascii: escape all non-ASCII characters
+        :param buffer_size: size of the write buffer of files opened by the writer
+        """
+        super().__init__(destination, buffer_size)
+        self._encode = json.JSONEncoder(ensure_ascii=ensure_ascii, default=_json_default).encode
+
+    def write(self, record: Mapping):
+        self._output().write(self._encode(record) + "\n")
+        self.count += 1
+
+
+class CSVWriter(Writer):
+    """
+    Write flat records as CSV rows with a header row.
+
+    Only definitions without MAP and list fields can be written, missing values are
+    written as empty cells.
+    """
+
+    newline = ""
+
+    def __init__(
+        self,
+        destination: Destination,
+        fields: Optional[Sequence[str]] = None,
+        buffer_size: int = BUFFER_SIZE,
+        **fmtparams,
+    ):
+        """
+        :param destination: path of the output file or open text file object
+        :param fields: columns in order, defaults to the fields of the definition or the
+            keys of the first record
+        :param buffer_size: size of the write buffer of files opened by the writer
+        :param fmtparams: formatting parameters of `csv.writer`, e.g. delimiter
+        """
+        super().__init__(destination, buffer_size)
+        self.fields: Optional[List[str]] = list(fields) if fields is not None else None
+        self._fmtparams = fmtparams
+        self._writer = None
+
+    def open(self, definitions: Dict[str, Definition], top_level: bool = True):
+        for field, definition in definitions.items():
+            if definition.return_type == ReturnType.MAP or _is_list(definition, top_level):
+                raise ValueError(f"Field {field} can't be written to CSV, it isn't a single value")
+        if self.fields is None:
+            self.fields = list(definitions)
+
+    def write(self, record: Mapping):
+        if self._writer is None:
+            if self.fields is None:
+                self.fields = list(record)
+            self._writer = csv.writer(self._output(), **self._fmtparams)
+            self._writer.writerow(self.fields)
+        row = [record.get(field) for field in self.fields]
+        for value in row:
+            if isinstance(value, (list, Mapping)):
+                raise ValueError("Only flat records can be written to CSV")
+        self._writer.writerow(row)
+        self.count += 1
+
+    def close(self):
+        self._writer = None
+        super().close()
+
+
+class ArrowWriter(Writer):
+    """
+    Write flat records to a Parquet or Arrow IPC file in record batches, requires pyarrow.
+
+    The schema is taken from the definition (lists of values are supported, MAP fields
+    are not) or inferred from the first batch when the writer is used on its own.
+    """
+
+    binary = True
+
+    def __init__(
+        self,
+        destination: Destination,
+        format: str = "parquet",
+        batch_size: int = 10000,
+        buffer_size: int = BUFFER_SIZE,
+    ):
+        """
+        :param destination: path of the output file or open binary file object
+        :param format: `parquet` or `ipc` (Arrow IPC file format)
+        :param batch_size: number of records kept in memory before they are written
+        :param buffer_size: size of the write buffer of files opened by the writer
+        """
+        try:
+            import pyarrow
+        except ImportError:
+            raise ImportError("ArrowWriter requires pyarrow, install it with `pip install pyarrow`")
+        if format not in ("parquet", "ipc"):
+            raise ValueError(f"Unknown format {format}, use parquet or ipc")
+        super().__init__(destination, buffer_size)
+        self.format = format
+        self.batch_size = batch_size
+        self.schema = None
+        self._pyarrow = pyarrow
+        self._rows: List[dict] = []
+        self._writer = None
+
+    def open(self, definitions: Dict[str, Definition], top_level: bool = True):
+        pa = self._pyarrow
+        types = {
+            ReturnType.STRING: pa.string(),
+            ReturnType.INTEGER: pa.int64(),
+            ReturnType.FLOAT: pa.float64(),
+            ReturnType.BOOLEAN: pa.bool_(),
+        }
+        fields = []
+        for field, definition in definitions.items():
+            if definition.return_type == ReturnType.MAP:
+                raise ValueError(f"Field {field} can't be written to Arrow, it is a MAP")
+            value_type = types[definition.return_type]
+            if _is_list(definition, top_level):
+                value_type = pa.list_(value_type)
+            fields.append(pa.field(field, value_type))
+        self.schema = pa.schema(fields)
+
+    def write(self, record: Mapping):
+        self._rows.append(dict(record))
+        self.count += 1
+        if len(self._rows) >= self.batch_size:
+            self.__flush()
+
+    def __flush(self):
+        if not self._rows:
+            return
+        batch = self._pyarrow.RecordBatch.from_pylist(self._rows, schema=self.schema)
+        self._rows = []
+        if self._writer is None:
+            self.schema = batch.schema
+            self.__open_writer()
+        self._writer.write_batch(batch)
+
+    def __open_writer(self):
+        if self.format == "parquet":
+            import pyarrow.parquet
+
+            self._writer = pyarrow.parquet.ParquetWriter(self._output(), self.schema)
+        else:
+            self._writer = self._pyarrow.ipc.new_file(self._output(), self.schema)
+
+    def close(self):
+        self.__flush()
+        if self._writer is None and self.schema is not None:
+            # File with the schema only
+            self.__open_writer()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        super().close()
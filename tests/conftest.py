@@ -0,0 +1,93 @@
+from functools import cached_property
+from pathlib import Path
+from typing import Dict, Optional
+
+import pytest
+
+from pyparsy import Parsy
+
+ASSETS = Path(__file__).parent / "assets"
+
+
+class Page:
+    """
+    Fixture page in tests/assets with its definitions, parsed with the options they need
+    """
+
+    def __init__(self, name: str, items: Optional[str] = None, **options):
+        """
+        :param name: name of the HTML and YAML files
+        :param items: top level multiple MAP field, None if the definitions have none
+        :param options: options of every parser of the page
+        """
+        self.name = name
+        self.items = items
+        self.options = options
+        self.html_file = ASSETS / f"{name}.html"
+        self.yaml = ASSETS / f"{name}.yaml"
+        # The same definitions with CSS selectors only, if there are any
+        self.css_yaml = ASSETS / "css" / f"{name}.yaml"
+
+    @cached_property
+    def html(self) -> str:
+        return self.html_file.read_text()
+
+    def parser(self, css: bool = False, **options) -> Parsy:
+        """
+        :param css: use the definitions with CSS selectors
+        :param options: options of the parser in addition to those of the page
+        :return: parser of the page definitions
+        """
+        return Parsy.from_file(self.css_yaml if css else self.yaml, **{**self.options, **options})
+
+    def expected(self, css: bool = False, **options):
+        """
+        :return: result of the page parsed by the lxml engine, the reference other
+            parsers of the page are compared with
+        """
+        return self.parser(css, **options).parse(self.html)
+
+
+PAGES = [
+    Page("amazon_bestseller_de", items="products"),
+    Page("amazon_com", items="products"),
+    Page("amazon_de_search", items="products", strip_strings=True),
+    Page("ebay_de", items="products"),
+    Page("google_com", items="results"),
+    Page("base_test"),
+]
+
+
+def _name(page: Page) -> str:
+    return page.name
+
+
+@pytest.fixture(params=PAGES, ids=_name)
+def page(request) -> Page:
+    return request.param
+
+
+@pytest.fixture(params=[page for page in PAGES if page.css_yaml.exists()], ids=_name)
+def css_page(request) -> Page:
+    return request.param
+
+
+@pytest.fixture(params=[page for page in PAGES if page.items], ids=_name)
+def items_page(request) -> Page:
+    return request.param
+
+
+@pytest.fixture
+def pages() -> Dict[str, Page]:
+    return {page.name: page for page in PAGES}
+
+
+@pytest.fixture(
+    params=[{}, {"strip_strings": True}, {"document_index": True}, {"records": True}],
+    ids=["default", "strip_strings", "document_index", "records"],
+)
+def options(request) -> dict:
+    """
+    Options of both the parser under test and the parser it is compared with
+    """
+    return request.param
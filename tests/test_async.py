@@ -0,0 +1,77 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+
+class FakePageSource:
+    """
+    Async page source serving the local fixtures and recording how far it was read
+    """
+
+    def __init__(self, pages, repeat=1):
+        self.pages = [page.html for page in pages.values()] * repeat
+        self.served = 0
+
+    def __aiter__(self):
+        return self._serve()
+
+    async def _serve(self):
+        for page in self.pages:
+            await asyncio.sleep(0)
+            self.served += 1
+            yield page
+
+
+def test_aparse(page):
+    assert asyncio.run(page.parser().aparse(page.html)) == page.expected()
+
+
+def test_aparse_keeps_loop_responsive(pages):
+    page = pages["amazon_de_search"]
+    parser, html = page.parser(), page.html
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        task = asyncio.create_task(ticker())
+        result = await parser.aparse(html)
+        task.cancel()
+        return result, ticks
+
+    result, ticks = asyncio.run(main())
+    assert len(result.get("products")) == 60
+    assert ticks > 1
+
+
+def test_aparse_stream_in_order_with_executor(pages):
+    parser = pages["google_com"].parser()
+    source = FakePageSource(pages, repeat=3)
+    expected = [parser.parse(page) for page in source.pages]
+
+    async def main():
+        with ThreadPoolExecutor(2) as executor:
+            return [result async for result in parser.aparse_stream(source, 2, executor)]
+
+    assert asyncio.run(main()) == expected
+
+
+def test_aparse_stream_backpressure(pages):
+    parser = pages["google_com"].parser()
+    source = FakePageSource(pages, repeat=4)
+
+    async def main():
+        read_ahead = []
+        received = 0
+        async for _ in parser.aparse_stream(source, concurrency=3):
+            received += 1
+            read_ahead.append(source.served - received)
+        return read_ahead, received
+
+    read_ahead, received = asyncio.run(main())
+    assert received == len(source.pages)
+    assert max(read_ahead) <= 2
@@ -0,0 +1,215 @@
+import pickle
+
+import pytest
+
+from pyparsy import Backend, Parsy, ParseStats
+from pyparsy.backends import BACKENDS, LexborBackend
+from pyparsy.backends import lexbor as lexbor_module
+from pyparsy.exceptions import BackendNotSupportedException
+from pyparsy.internal.tree import create_root_node
+
+CSS = {
+    "title": {"selector": "h1::text", "selector_type": "CSS", "return_type": "STRING"},
+    "items": {
+        "selector": "li",
+        "selector_type": "CSS",
+        "return_type": "MAP",
+        "multiple": True,
+        "children": {
+            "name": {
+                "selector": "span.name::text",
+                "selector_type": "CSS",
+                "return_type": "STRING",
+            },
+        },
+    },
+}
+HTML = "<html><body><h1>Title</h1><ul><li><span class='name'>a</span></li></ul></body></html>"
+
+
+class CopyBackend(Backend):
+    """
+    Backend evaluating the fields with a parser of the built-in lxml engine
+    """
+
+    name = "copy"
+    requires = "copy"
+    parsed = 0
+
+    @classmethod
+    def available(cls) -> bool:
+        return True
+
+    @classmethod
+    def unsupported(cls, parser):
+        return None if "title" in parser.field_selectors else "has no title"
+
+    def parse(self, html, encoding, definitions, result_class=None):
+        CopyBackend.parsed += 1
+        parser = Parsy(self.parser._definitions, validate=False, records=self.parser.records)
+        return parser.parse_tree(create_root_node(html, encoding), fields=list(definitions))
+
+
+@pytest.fixture
+def copy_backend(monkeypatch):
+    monkeypatch.setitem(BACKENDS, CopyBackend.name, CopyBackend)
+    CopyBackend.parsed = 0
+    return CopyBackend
+
+
+@pytest.mark.parametrize("backend", sorted(BACKENDS))
+def test_backend_conformance(backend, css_page, options):
+    if not BACKENDS[backend].available():
+        pytest.skip(f"{BACKENDS[backend].requires} is not installed")
+    parser = css_page.parser(css=True, backend=backend, **options)
+    assert parser._backend is not None
+    expected = css_page.expected(css=True, **options)
+    assert parser.parse(css_page.html) == expected
+    assert parser.parse(css_page.html.encode()) == expected
+
+
+lexbor = pytest.mark.skipif(not LexborBackend.available(), reason="selectolax is not installed")
+
+
+@lexbor
+@pytest.mark.parametrize(
+    "html",
+    [
+        # Items matching the child selectors through descendants only
+        "<ul><li class='item'><span class='name'>a</span><span class='name'>b</span></li>"
+        "<li class='name'><span class='name'> </span></li><li><b>c</b></li></ul>",
+        "<ul>\n <li class='name'>\n <span class='name'>x</span>\n</li>\n <li> </li>\n</ul>",
+        "<div><h1> </h1><h1>Title</h1><ul><li><span class='name'>1<br> 2</span></li></ul></div>",
+        "<p>a<!-- comment -->b</p><ul><li><span class='name'>a &amp; b</span></li></ul>",
+    ],
+)
+@pytest.mark.parametrize("includes_self", [True, False])
+def test_lexbor_conformance_beyond_fixtures(html, includes_self, monkeypatch):
+    # Node.css matches the node itself depending on the selectolax version
+    monkeypatch.setattr(lexbor_module, "_css_includes_self", includes_self)
+    definition = {
+        **CSS,
+        "texts": {
+            "selector": "li::text",
+            "selector_type": "CSS",
+            "return_type": "STRING",
+            "multiple": True,
+        },
+        "classes": {
+            "selector": "li::attr(class)",
+            "selector_type": "CSS",
+            "return_type": "STRING",
+            "multiple": True,
+        },
+    }
+    definition["items"] = {
+        **CSS["items"],
+        "children": {
+            **CSS["items"]["children"],
+            "names": {**CSS["items"]["children"]["name"], "multiple": True},
+            "class": {
+                "selector": "[class]::attr(class)",
+                "selector_type": "CSS",
+                "return_type": "STRING",
+            },
+            "bold": {"selector": "b", "selector_type": "CSS", "return_type": "BOOLEAN"},
+        },
+    }
+    for options in ({}, {"strip_strings": True}):
+        expected = Parsy(definition, **options).parse(html)
+        assert Parsy(definition, backend="lexbor", **options).parse(html) == expected
+
+
+@lexbor
+def test_lexbor_is_never_chosen_automatically():
+    assert Parsy(CSS, backend="auto")._backend is None
+    # libxml2 doesn't add the tbody the HTML5 algorithm implies
+    definition = {"cell": {**CSS["title"], "selector": "table > tr > td::text"}}
+    html = "<table><tr><td>cell</td></tr></table>"
+    assert Parsy(definition).parse(html) == {"cell": "cell"}
+    assert Parsy(definition, backend="lexbor").parse(html) == {"cell": None}
+
+
+def test_explicit_backend(copy_backend):
+    parser = Parsy(CSS, backend="copy")
+    assert isinstance(parser._backend, CopyBackend)
+    assert parser.parse(HTML) == Parsy(CSS).parse(HTML)
+    assert parser.parse(HTML, fields=["title"]) == {"title": "Title"}
+    assert copy_backend.parsed == 2
+    with pytest.raises(BackendNotSupportedException):
+        Parsy({"name": CSS["title"]}, backend="copy")
+    with pytest.raises(ValueError):
+        Parsy(CSS, backend="missing")
+
+
+def test_auto_backend(copy_backend, monkeypatch):
+    assert isinstance(Parsy(CSS, backend="auto")._backend, CopyBackend)
+    monkeypatch.setattr(CopyBackend, "automatic", False)
+    assert Parsy(CSS, backend="auto")._backend is None
+    monkeypatch.setattr(CopyBackend, "automatic", True)
+    # Falls back to the lxml engine
+    assert Parsy({"name": CSS["title"]}, backend="auto")._backend is None
+    assert Parsy(CSS)._backend is None
+
+
+def test_lazy_and_instrumented_parses_use_lxml(copy_backend):
+    parser = Parsy(CSS, backend="copy")
+    assert parser.parse(HTML, lazy=True)["title"] == "Title"
+    stats = ParseStats()
+    parser.instrument(stats)
+    assert parser.parse(HTML)["title"] == "Title"
+    assert copy_backend.parsed == 0
+
+
+def test_pickled_parser_keeps_backend(copy_backend):
+    parser = pickle.loads(pickle.dumps(Parsy(CSS, backend="copy")))
+    assert isinstance(parser._backend, CopyBackend)
+
+
+def test_missing_backend_library(monkeypatch):
+    monkeypatch.setattr(LexborBackend, "available", classmethod(lambda cls: False))
+    with pytest.raises(ImportError, match="pip install selectolax"):
+        Parsy(CSS, backend="lexbor")
+
+
+def test_lexbor_supports_css_fixtures(css_page):
+    assert LexborBackend.unsupported(css_page.parser(css=True)) is None
+    assert "is not a CSS field" in LexborBackend.unsupported(css_page.parser())
+
+
+@pytest.mark.parametrize(
+    "selector, return_type, reason",
+    [
+        ("h1", "STRING", "returns the HTML of elements"),
+        ("h1", "BOOLEAN", None),
+        ("::text", "STRING", "has no element selector"),
+        ("li:first-child::text", "STRING", "uses a pseudo class"),
+        ("a[href='a:b']::attr(href)", "STRING", None),
+        ("h1::text", "MAP", "is a MAP field selecting text"),
+    ],
+)
+def test_lexbor_unsupported_fields(selector, return_type, reason):
+    definition = {
+        "field": {"selector": selector, "selector_type": "CSS", "return_type": return_type}
+    }
+    if return_type == "MAP":
+        definition["field"]["children"] = {"title": CSS["title"]}
+    unsupported = LexborBackend.unsupported(Parsy(definition, validate=False))
+    assert unsupported == (reason and f"field field {reason}")
+
+
+@pytest.mark.parametrize(
+    "selector, reason",
+    [
+        ("ul span::text", "is a child with a combinator, selector group or wrapper element"),
+        ("div > span::text", "is a child with a combinator, selector group or wrapper element"),
+        ("body::text", "is a child with a combinator, selector group or wrapper element"),
+        ("a::text, b::text", "uses a pseudo class"),
+        ("span.name[title='a b']::text", None),
+    ],
+)
+def test_lexbor_children_without_combinators(selector, reason):
+    child = {**CSS["title"], "selector": selector}
+    definition = {"items": {**CSS["items"], "children": {"name": child}}}
+    unsupported = LexborBackend.unsupported(Parsy(definition))
+    assert unsupported == (reason and f"field items.name {reason}")
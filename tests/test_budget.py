@@ -0,0 +1,259 @@
+import importlib.util
+import io
+import pickle
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pyparsy import Budget, Diagnostics, Parsy, ResultCache
+from pyparsy.budget import FIELD_TIMEOUT, INPUT_SIZE, PAGE_TIMEOUT
+
+signals = pytest.mark.skipif(not hasattr(signal, "setitimer"), reason="needs signal.setitimer")
+timed_regex = pytest.mark.skipif(
+    importlib.util.find_spec("regex") is None, reason="needs the regex package"
+)
+
+# Backtracks for seconds on a run of `a` followed by another character
+BACKTRACKING = {"selector": r"(a+)+$", "selector_type": "REGEX", "return_type": "STRING"}
+TITLE = {"selector": "//h1/text()", "selector_type": "XPATH", "return_type": "STRING"}
+ITEMS = {
+    "selector": "//li",
+    "selector_type": "XPATH",
+    "return_type": "MAP",
+    "multiple": True,
+    "children": {
+        "name": {"selector": "./span/text()", "selector_type": "XPATH", "return_type": "STRING"},
+    },
+}
+# Also backtracks for seconds in the regex package
+EXPONENTIAL = {"selector": r"(a|aa)+$", "selector_type": "REGEX", "return_type": "STRING"}
+ADVERSARIAL = f"<html><body><h1>Title</h1><p>{'a' * 26}b</p></body></html>"
+HTML = "<html><body><h1>Title</h1><p>text</p></body></html>"
+
+
+@signals
+def test_backtracking_field_is_interrupted():
+    parser = Parsy({"title": TITLE, "slow": BACKTRACKING}, budget=Budget(field_timeout=0.2))
+    diagnostics = Diagnostics()
+    start = time.perf_counter()
+    result = parser.parse(ADVERSARIAL, diagnostics=diagnostics)
+    assert time.perf_counter() - start < 2
+    assert result == {"title": "Title", "slow": None}
+    assert diagnostics.skipped == {"slow": FIELD_TIMEOUT}
+    assert diagnostics.exceeded
+
+
+@signals
+def test_page_timeout_skips_remaining_fields():
+    definition = {"first": BACKTRACKING, "second": BACKTRACKING, "title": TITLE}
+    parser = Parsy(definition, budget=Budget(field_timeout=5, page_timeout=0.3))
+    diagnostics = Diagnostics()
+    start = time.perf_counter()
+    result = parser.parse(ADVERSARIAL, diagnostics=diagnostics)
+    assert time.perf_counter() - start < 2
+    assert result == {"first": None, "second": None, "title": None}
+    assert diagnostics.skipped == dict.fromkeys(definition, PAGE_TIMEOUT)
+
+
+@signals
+def test_deeply_nested_page_within_a_tiny_budget():
+    html = "<div>" * 2000 + "<span>cell</span>" * 4000 + "</div>" * 2000
+    definition = {
+        "title": TITLE,
+        "blocks": {
+            "selector": "//div",
+            "selector_type": "XPATH",
+            "return_type": "MAP",
+            "multiple": True,
+            "children": {
+                "text": {
+                    "selector": "normalize-space(.)",
+                    "selector_type": "XPATH",
+                    "return_type": "STRING",
+                }
+            },
+        },
+    }
+    parser = Parsy(definition, budget=Budget(page_timeout=0.02))
+    diagnostics = Diagnostics()
+    start = time.perf_counter()
+    assert parser.parse(html, diagnostics=diagnostics) == {"title": None, "blocks": None}
+    assert time.perf_counter() - start < 0.2
+    assert diagnostics.skipped["blocks"] == PAGE_TIMEOUT
+
+
+@signals
+def test_alarm_handler_and_timer_are_restored():
+    def handler(signum, frame):
+        pass
+
+    previous = signal.signal(signal.SIGALRM, handler)
+    try:
+        parser = Parsy({"title": TITLE, "slow": BACKTRACKING}, budget=Budget(field_timeout=0.1))
+        parser.parse(ADVERSARIAL)
+        assert signal.getsignal(signal.SIGALRM) is handler
+        assert signal.getitimer(signal.ITIMER_REAL) == (0.0, 0.0)
+    finally:
+        signal.signal(signal.SIGALRM, previous)
+
+
+@signals
+def test_alarm_after_the_field_restores_the_handler(monkeypatch):
+    setitimer = signal.setitimer
+
+    def late_setitimer(which, seconds, *interval):
+        result = setitimer(which, seconds, *interval)
+        if seconds == 0:
+            # The timer expired after the field returned, before it was stopped
+            signal.raise_signal(signal.SIGALRM)
+        return result
+
+    monkeypatch.setattr(signal, "setitimer", late_setitimer)
+    previous = signal.getsignal(signal.SIGALRM)
+    diagnostics = Diagnostics()
+    parser = Parsy({"title": TITLE}, budget=Budget(field_timeout=5))
+    assert parser.parse(HTML, diagnostics=diagnostics) == {"title": None}
+    assert diagnostics.skipped == {"title": FIELD_TIMEOUT}
+    assert signal.getsignal(signal.SIGALRM) is previous
+    assert signal.getitimer(signal.ITIMER_REAL) == (0.0, 0.0)
+    monkeypatch.undo()
+    assert Parsy({"title": TITLE}, budget=Budget(field_timeout=5)).parse(HTML) == {"title": "Title"}
+
+
+def test_items_stop_at_the_deadline_in_threads():
+    html = "<ul>" + "<li><span>item</span></li>" * 20000 + "</ul>"
+    parser = Parsy({"items": ITEMS, "title": TITLE}, budget=Budget(field_timeout=0.01))
+    diagnostics = Diagnostics()
+    with ThreadPoolExecutor(1) as executor:
+        result = executor.submit(parser.parse, html, diagnostics=diagnostics).result()
+    # The title may miss its deadline as well on a busy machine
+    assert result["items"] is None
+    assert diagnostics.skipped["items"] == FIELD_TIMEOUT
+
+
+@timed_regex
+@pytest.mark.parametrize("signals", [True, False])
+def test_backtracking_field_is_interrupted_in_threads(signals):
+    parser = Parsy(
+        {"title": TITLE, "slow": EXPONENTIAL}, budget=Budget(field_timeout=0.2, signals=signals)
+    )
+    html = f"<html><body><h1>Title</h1><p>{'a' * 40}b</p></body></html>"
+    diagnostics = Diagnostics()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(1) as executor:
+        result = executor.submit(parser.parse, html, diagnostics=diagnostics).result()
+    assert time.perf_counter() - start < 2
+    assert result == {"title": "Title", "slow": None}
+    assert diagnostics.skipped == {"slow": FIELD_TIMEOUT}
+
+
+@timed_regex
+def test_regex_fields_in_threads_match_like_re():
+    definition = {
+        "first": {"selector": r"<p>(\w+)", "selector_type": "REGEX", "return_type": "STRING"},
+        "named": {
+            "selector": r"id=\"(?P<extract>\d+)\"",
+            "selector_type": "REGEX",
+            "return_type": "INTEGER",
+        },
+        "all": {
+            "selector": r"<(\w)>(\w+)",
+            "selector_type": "REGEX",
+            "return_type": "STRING",
+            "multiple": True,
+        },
+    }
+    html = '<html><body><p>one</p><b>two</b><i id="7">three</i></body></html>'
+    expected = {"first": "one", "named": 7, "all": ["p", "one", "b", "two"]}
+    assert Parsy(definition).parse(html) == expected
+    parser = Parsy(definition, budget=Budget(field_timeout=10, signals=False))
+    assert parser.parse(html) == expected
+
+
+def test_warning_without_the_regex_package(monkeypatch):
+    monkeypatch.setitem(sys.modules, "regex", None)
+    parser = Parsy({"slow": BACKTRACKING}, budget=Budget(field_timeout=10))
+    with pytest.warns(RuntimeWarning, match="pip install pyparsy\\[regex\\]"):
+        with ThreadPoolExecutor(1) as executor:
+            assert executor.submit(parser.parse, HTML).result() == {"slow": None}
+
+
+def test_timer_is_not_used_outside_the_main_thread():
+    parser = Parsy({"title": TITLE}, budget=Budget(field_timeout=1))
+    handlers = []
+    thread = threading.Thread(
+        target=lambda: handlers.append((parser.parse(HTML), signal.getsignal(signal.SIGALRM)))
+    )
+    thread.start()
+    thread.join()
+    assert handlers == [({"title": "Title"}, signal.getsignal(signal.SIGALRM))]
+
+
+@pytest.mark.parametrize(
+    "html",
+    [
+        HTML + " " * 100,
+        (HTML + " " * 100).encode(),
+        memoryview((HTML + " " * 100).encode()),
+        io.BytesIO((HTML + " " * 100).encode()),
+    ],
+)
+def test_oversize_input_is_not_parsed(html):
+    parser = Parsy({"title": TITLE, "items": ITEMS}, budget=Budget(max_input_size=len(HTML)))
+    diagnostics = Diagnostics()
+    assert parser.parse(html, diagnostics=diagnostics) == {"title": None, "items": None}
+    assert diagnostics.skipped == {"title": INPUT_SIZE, "items": INPUT_SIZE}
+    assert diagnostics.input_size == len(HTML) + (1 if isinstance(html, io.BytesIO) else 100)
+
+
+def test_input_within_the_size_limit():
+    parser = Parsy({"title": TITLE}, budget=Budget(max_input_size=len(HTML)), records=True)
+    diagnostics = Diagnostics()
+    assert parser.parse(io.BytesIO(HTML.encode()), diagnostics=diagnostics).title == "Title"
+    assert not diagnostics.exceeded
+    assert parser.parse(HTML + " ", fields=["title"]).title is None
+
+
+def test_oversize_records():
+    parser = Parsy({"title": TITLE}, budget=Budget(max_input_size=1), records=True)
+    assert parser.parse(HTML).title is None
+
+
+def test_fixtures_within_budget_are_unchanged(page, options):
+    budget = Budget(max_input_size=len(page.html), field_timeout=10, page_timeout=30)
+    parser = page.parser(budget=budget, **options)
+    diagnostics = Diagnostics()
+    assert parser.parse(page.html, diagnostics=diagnostics) == page.expected(**options)
+    assert not diagnostics.exceeded
+    assert diagnostics.elapsed > 0
+
+
+@signals
+def test_exceeded_results_are_not_cached():
+    cache = ResultCache()
+    parser = Parsy(
+        {"title": TITLE, "slow": BACKTRACKING},
+        budget=Budget(field_timeout=0.1),
+        result_cache=cache,
+    )
+    assert parser.parse(ADVERSARIAL)["slow"] is None
+    assert parser.parse(ADVERSARIAL)["slow"] is None
+    assert (cache.hits, cache.misses) == (0, 2)
+    parser.parse(HTML)
+    parser.parse(HTML)
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_lazy_parses_have_no_budget():
+    parser = Parsy({"title": TITLE}, budget=Budget(max_input_size=1))
+    assert parser.parse(HTML, lazy=True)["title"] == "Title"
+
+
+def test_pickled_parser_keeps_budget():
+    parser = pickle.loads(pickle.dumps(Parsy({"title": TITLE}, budget=Budget(max_input_size=1))))
+    assert parser.budget.max_input_size == 1
+    assert parser.parse(HTML) == {"title": None}
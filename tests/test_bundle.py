@@ -0,0 +1,87 @@
+import io
+from pathlib import Path
+
+import lxml.html
+from parsel import Selector
+
+import pyparsy.bundle
+from pyparsy import Parsy, ParsyBundle, ParsyRegistry
+
+ASSETS = Path(__file__).parent / "assets"
+HTML = (ASSETS / "amazon_de_search.html").read_text()
+FIELDS = """
+title:
+  selector: //title/text()
+  selector_type: XPATH
+  return_type: STRING
+links:
+  selector: a
+  selector_type: CSS
+  return_type: STRING
+  multiple: true
+"""
+REGEX = """
+ids:
+  selector: data-asin="([^"]+)"
+  selector_type: REGEX
+  return_type: STRING
+  multiple: true
+"""
+
+
+def _parsers():
+    definition = ASSETS / "amazon_de_search.yaml"
+    return {
+        "search": Parsy.from_file(definition),
+        "indexed": Parsy.from_file(definition, document_index=True),
+        "fields": Parsy.from_string(FIELDS, document_index=True),
+        "regex": Parsy.from_string(REGEX),
+        "raw": Parsy.from_string(REGEX, raw_regex=True),
+    }
+
+
+def test_bundle_results_match_single_parsers():
+    parsers = _parsers()
+    results = ParsyBundle(parsers).parse(HTML)
+    assert list(results) == list(parsers)
+    for name, parser in parsers.items():
+        assert results[name] == parser.parse(HTML), name
+
+
+def test_bundle_builds_tree_once(monkeypatch):
+    calls = []
+
+    def create_root_node(*args):
+        calls.append(args)
+        return lxml.html.document_fromstring(HTML)
+
+    monkeypatch.setattr(pyparsy.bundle, "create_root_node", create_root_node)
+    ParsyBundle(_parsers()).parse(io.BytesIO(HTML.encode()))
+    assert len(calls) == 1
+
+
+def test_bundle_without_tree():
+    bundle = ParsyBundle({"raw": Parsy.from_string(REGEX, raw_regex=True)})
+    assert not bundle._needs_tree
+    assert bundle.parse(HTML)["raw"]["ids"]
+
+
+def test_parse_tree():
+    parser = Parsy.from_file(ASSETS / "amazon_de_search.yaml", document_index=True)
+    expected = parser.parse(HTML)
+    assert parser.parse_tree(lxml.html.document_fromstring(HTML)) == expected
+    assert parser.parse_tree(Selector(HTML)) == expected
+    assert dict(parser.parse_tree(Selector(HTML), lazy=True)) == expected
+    assert parser.parse_tree(Selector(HTML), fields=["products.title"]) == parser.parse(
+        HTML, fields=["products.title"]
+    )
+
+
+def test_registry_bundle(tmp_path):
+    (tmp_path / "fields.yaml").write_text(FIELDS)
+    (tmp_path / "regex.yaml").write_text(REGEX)
+    registry = ParsyRegistry.from_directory(tmp_path, workers=1)
+    bundle = registry.bundle()
+    assert list(bundle) == ["fields", "regex"]
+    assert bundle["fields"] is registry["fields"]
+    assert list(registry.bundle("regex").parse(HTML)) == ["regex"]
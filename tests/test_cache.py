@@ -0,0 +1,91 @@
+import json
+
+import pytest
+import yaml
+from schema import SchemaError
+
+from pyparsy import DefinitionCache, Parsy
+from pyparsy.exceptions import XPathValidationException
+
+YAML = """
+title:
+  selector: //h1/text()
+  selector_type: XPATH
+  return_type: STRING
+"""
+HTML = "<html><body><h1>Title</h1><h2>Subtitle</h2></body></html>"
+
+
+def test_memory_cache_shares_definitions():
+    cache = DefinitionCache()
+    first = Parsy.from_string(YAML, cache=cache)
+    second = Parsy.from_string(YAML, cache=cache, strip_strings=True)
+    assert second.field_selectors is first.field_selectors
+    assert second.strip_strings
+    assert (cache.misses, cache.hits) == (1, 1)
+    assert second.parse(HTML) == Parsy.from_string(YAML).parse(HTML)
+
+
+def test_disk_cache_survives_restart(tmp_path):
+    Parsy.from_string(YAML, cache=DefinitionCache(directory=tmp_path))
+    assert len(list(tmp_path.glob("*.json"))) == 1
+    cache = DefinitionCache(directory=tmp_path)
+    parser = Parsy.from_string(YAML, cache=cache)
+    assert (cache.misses, cache.disk_hits) == (0, 1)
+    assert parser.parse(HTML).get("title") == "Title"
+
+
+def test_files_of_older_versions_are_replaced(tmp_path):
+    cache = DefinitionCache(directory=tmp_path)
+    key = cache.key(YAML.encode())
+    (tmp_path / f"{key}.json").write_text(json.dumps(yaml.safe_load(YAML)))
+    assert Parsy.from_string(YAML, cache=cache).parse(HTML).get("title") == "Title"
+    assert (cache.misses, cache.disk_hits) == (1, 0)
+    cache = DefinitionCache(directory=tmp_path)
+    Parsy.from_string(YAML, cache=cache)
+    assert (cache.misses, cache.disk_hits) == (0, 1)
+
+
+def test_changed_file_invalidates_entry(tmp_path):
+    cache = DefinitionCache(directory=tmp_path / "cache")
+    yaml_file = tmp_path / "definition.yaml"
+    yaml_file.write_text(YAML)
+    assert Parsy.from_file(yaml_file, cache=cache).parse(HTML).get("title") == "Title"
+    yaml_file.write_text(YAML.replace("//h1", "//h2"))
+    assert Parsy.from_file(yaml_file, cache=cache).parse(HTML).get("title") == "Subtitle"
+    assert (cache.misses, cache.hits) == (2, 0)
+    assert Parsy.from_file(yaml_file, cache=cache).parse(HTML).get("title") == "Subtitle"
+    assert cache.hits == 1
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = DefinitionCache(maxsize=2)
+    other = YAML.replace("//h1", "//h2")
+    third = YAML.replace("//h1", "//h3")
+    for yaml_string in (YAML, other, YAML, third, YAML, other):
+        Parsy.from_string(yaml_string, cache=cache)
+    # `other` was evicted by `third`, `YAML` was used more recently
+    assert (cache.misses, cache.hits) == (4, 2)
+
+
+def test_unvalidated_entry_is_validated_on_use(tmp_path):
+    cache = DefinitionCache(directory=tmp_path)
+    invalid = YAML + "  unknown: true\n"
+    Parsy.from_string(invalid, cache=cache, validate=False)
+    assert not list(tmp_path.glob("*.json"))
+    with pytest.raises(SchemaError):
+        Parsy.from_string(invalid, cache=cache)
+
+
+def test_invalid_selector_raises(tmp_path):
+    with pytest.raises(XPathValidationException):
+        Parsy.from_string(YAML.replace("//h1/text()", "//h1["), cache=DefinitionCache())
+
+
+def test_invalid_definition_is_not_stored(tmp_path):
+    cache = DefinitionCache(directory=tmp_path)
+    yaml_string = YAML.replace("return_type: STRING", "return_type: UNKNOWN")
+    with pytest.raises(SchemaError):
+        Parsy.from_string(yaml_string, cache=cache)
+    assert not list(tmp_path.glob("*.json"))
+    assert cache.load(YAML.encode())[1]["title"].xpath == "//h1/text()"
@@ -0,0 +1,64 @@
+import subprocess
+import sys
+
+import pytest
+
+HEAVY = ("yaml", "schema", "parsel", "cssselect", "w3lib", "asyncio")
+
+
+def _loaded_modules(code: str):
+    code += f"\nimport sys\nprint(' '.join(m for m in {HEAVY!r} if m in sys.modules))"
+    process = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return process.stdout.split()
+
+
+def test_import_loads_no_heavy_dependencies():
+    assert _loaded_modules("import pyparsy") == []
+
+
+def test_parse_dict_definition_without_heavy_dependencies():
+    code = """
+import pyparsy
+definition = {
+    "title": {"selector": "//h1/text()", "selector_type": "XPATH", "return_type": "STRING"},
+    "id": {"selector": "id=(\\\\d+)", "selector_type": "REGEX", "return_type": "INTEGER"},
+}
+result = pyparsy.Parsy(definition, validate=False).parse("<h1>Title</h1><p>id=7</p>")
+assert result == {"title": "Title", "id": 7}, result
+"""
+    # Only the character entities in regex matches are resolved with w3lib
+    assert _loaded_modules(code) == ["w3lib"]
+
+
+@pytest.mark.parametrize(
+    "code, expected",
+    [
+        ("pyparsy.Parsy.from_string(YAML, validate=False)", ["yaml"]),
+        # Common valid definitions are validated without the schema library
+        ("pyparsy.Parsy(yaml.safe_load(YAML))", ["yaml"]),
+        ("try:\n    pyparsy.Parsy({'title': {'selector': 1}})\nexcept Exception:\n    pass",
+         ["schema"]),
+        ("pyparsy.Parsy(yaml.safe_load(YAML.replace('XPATH', 'CSS')), validate=False)",
+         ["yaml", "parsel", "cssselect", "w3lib"]),
+    ],
+)
+def test_dependencies_are_imported_when_needed(code, expected):
+    yaml = "title:\n  selector: h1\n  selector_type: XPATH\n  return_type: STRING\n"
+    setup = f"import pyparsy\nYAML = {yaml!r}\n"
+    if "yaml." in code:
+        setup += "import yaml\n"
+    assert _loaded_modules(setup + code) == expected
+
+
+def test_css_definitions_from_the_disk_cache_skip_parsel(tmp_path):
+    yaml = "title:\n  selector: h1::text\n  selector_type: CSS\n  return_type: STRING\n"
+    code = f"""
+import pyparsy
+cache = pyparsy.DefinitionCache(directory={str(tmp_path)!r})
+parser = pyparsy.Parsy.from_string({yaml!r}, cache=cache)
+assert parser.parse("<h1>Title</h1>") == {{"title": "Title"}}
+"""
+    assert "parsel" in _loaded_modules(code)
+    assert _loaded_modules(code + "assert cache.disk_hits == 1") == []
@@ -0,0 +1,95 @@
+
+import pytest
+
+from pyparsy import Parsy
+from pyparsy.internal.compiler import css_to_xpath, index_selector
+
+HTML = """<html><head><title>Index</title></head><body>
+<div id="main" class="box  wide"><span>one</span><div class="box"><span>nested</span></div></div>
+<p class="note&#9;hint">first <b>bold</b></p><p class="notes">second</p>
+<ul><li data-id="1"><a href="/1">A</a></li><li data-id="2"><a href="/2">B</a></li></ul>
+</body></html>"""
+
+YAML = """
+title:
+  selector: //title/text()
+  selector_type: XPATH
+  return_type: STRING
+main_text:
+  selector: //*[@id="main"]/span/text()
+  selector_type: XPATH
+  return_type: STRING
+nested_boxes:
+  selector: .box span::text
+  selector_type: CSS
+  multiple: true
+  return_type: STRING
+notes:
+  selector: //p[contains(@class, "note")]//text()
+  selector_type: XPATH
+  multiple: true
+  return_type: STRING
+hint:
+  selector: p.hint::text
+  selector_type: CSS
+  return_type: STRING
+links:
+  selector:
+    - //li[@data-id="3"]/a/@href
+    - //li/a/@href
+  selector_type: XPATH
+  multiple: true
+  return_type: STRING
+second:
+  selector: //li[@data-id="2"]
+  selector_type: XPATH
+  return_type: MAP
+  children:
+    link:
+      selector: //a/@href
+      selector_type: XPATH
+      return_type: STRING
+"""
+
+
+@pytest.mark.parametrize("xpath,key,rest", [
+    ('//div[@id="main"]/span/text()', ("attr", "div", "id", "main"), "./span/text()"),
+    ("//h1/text()", ("tag", "h1"), "./text()"),
+    ('//*[@data-asin="x"]', ("attr", None, "data-asin", "x"), None),
+    ("//span[contains(@class, 'price')]//text()", ("contains", "span", "class", "price"), ".//text()"),
+    (css_to_xpath(".price span::text"), ("class", None, "price"), "./descendant::span/text()"),
+    (css_to_xpath("a::attr(href)"), ("tag", "a"), "./@href"),
+])
+def test_index_selector(xpath, key, rest):
+    result = index_selector(xpath)
+    assert result[0] == key
+    assert (result[1] and result[1].path) == rest
+
+
+@pytest.mark.parametrize("xpath", [
+    '//div[@id="x"]/../a',
+    '//div[@id="x"][1]',
+    '//div[@id="x"]/following-sibling::a',
+    "//*",
+    "//a | //b",
+    "/html/body",
+    "div",
+    '//div[@id="x" or @id="y"]',
+])
+def test_index_selector_unsupported(xpath):
+    assert index_selector(xpath) is None
+
+
+def test_document_index_matches_xpath():
+    expected = Parsy.from_string(YAML).parse(HTML)
+    parser = Parsy.from_string(YAML, document_index=True)
+    assert len(parser._index_keys) == 8
+    assert parser.parse(HTML) == expected
+    # Nested .box elements are evaluated with the normal XPath
+    assert expected.get("nested_boxes") == ["one", "nested"]
+    assert expected.get("notes") == ["first ", "bold", "second"]
+    assert expected.get("hint") == "first "
+
+
+def test_document_index_fixtures(page):
+    assert page.expected(document_index=True) == page.expected()
@@ -0,0 +1,49 @@
+import io
+import mmap
+
+import pytest
+
+from pyparsy import Parsy
+
+TITLE_YAML = """
+title:
+  selector: //p/text()
+  selector_type: XPATH
+  return_type: STRING
+"""
+
+
+def test_binary_input_matches_str(page):
+    parser = page.parser()
+    html_file = page.html_file
+    expected = page.expected()
+    data = html_file.read_bytes()
+    assert parser.parse(data) == expected
+    assert parser.parse(memoryview(data)) == expected
+    assert parser.parse(io.BytesIO(data)) == expected
+    with html_file.open("rb") as file:
+        assert parser.parse(file) == expected
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            assert parser.parse(mapped) == expected
+
+
+@pytest.mark.parametrize("data,encoding", [
+    ("<p>Grüße</p>".encode("utf-8"), None),
+    ("<p>Grüße</p>".encode("utf-16"), None),
+    ('<meta charset="windows-1252"><p>Grüße</p>'.encode("windows-1252"), None),
+    (
+        '<meta http-equiv="Content-Type" content="text/html; charset=iso-8859-1">'
+        "<p>Grüße</p>".encode("iso-8859-1"),
+        None,
+    ),
+    ("<p>Grüße</p>".encode("iso-8859-1"), "iso-8859-1"),
+])
+def test_binary_input_encoding(data, encoding):
+    parser = Parsy.from_string(TITLE_YAML)
+    assert parser.parse(data, encoding=encoding).get("title") == "Grüße"
+    assert parser.parse(io.BytesIO(data), encoding=encoding).get("title") == "Grüße"
+
+
+@pytest.mark.parametrize("data", [b"", b"  \n", io.BytesIO(b"")])
+def test_empty_binary_input(data):
+    assert Parsy.from_string(TITLE_YAML).parse(data).get("title") is None
@@ -1,4 +1,10 @@
+import re
+
+import lxml.etree
+import pytest
+
 from pyparsy import Definition, ReturnType, SelectorType
+from pyparsy.internal.compiler import scope_xpath
 
 
 def test_definition_initialization():
@@ -35,3 +41,66 @@ def test_definition_with_children():
     assert child_def.selector_type == SelectorType.REGEX
     assert child_def.return_type == ReturnType.INTEGER
     assert child_def.multiple
+
+
+def test_definition_compiles_selectors():
+    definition = Definition("test", {
+        "selector": ["//h1/text()", "//h2/text()"],
+        "selector_type": "XPATH",
+        "return_type": "STRING",
+        "children": {
+            "css_child": {
+                "selector": "h3.test::text",
+                "selector_type": "CSS",
+                "return_type": "STRING"
+            },
+            "regex_child": {
+                "selector": "let foo = \"(.*)\"",
+                "selector_type": "REGEX",
+                "return_type": "STRING"
+            }
+        }
+    })
+    assert len(definition.selectors) == 2
+    assert all(isinstance(xpath, lxml.etree.XPath) for xpath in definition.selectors)
+    css_child = definition.children.get("css_child")
+    assert isinstance(css_child.selectors[0], lxml.etree.XPath)
+    assert css_child.selectors[0].path.startswith("descendant-or-self::h3")
+    regex_child = definition.children.get("regex_child")
+    assert isinstance(regex_child.selectors[0], re.Pattern)
+
+
+@pytest.mark.parametrize("xpath,expected", [
+    ("//h3/text()", ("(self::h3 | descendant-or-self::node()/h3)/text()", True)),
+    ("//@href", ("descendant-or-self::node()/@href", True)),
+    (".//a/@href", ("(self::a | descendant-or-self::node()/a)/@href", True)),
+    ("descendant::a", ("(self::a | descendant-or-self::node()/a)", True)),
+    ("descendant-or-self::h3/text()", ("descendant-or-self::h3/text()", False)),
+    ("normalize-space(.)", ("normalize-space(.)", False)),
+    ("span/text()", None),
+    ("@href", None),
+    ("descendant-or-self::*/text()", None),
+    ("//*", None),
+    ("//body/a", None),
+    ("//a/../@href", None),
+    ("//a[following-sibling::b]", None),
+    ("//a[@class=\"x/y\"] | //b", (
+        "(self::a[@class=\"x/y\"] | descendant-or-self::node()/a[@class=\"x/y\"])"
+        " | (self::b | descendant-or-self::node()/b)", True)),
+    ("/html/body/div", None),
+    ("//a[//b]", None),
+    ("count(//a)", None),
+    ("//a | b", None),
+])
+def test_scope_xpath(xpath, expected):
+    assert scope_xpath(xpath) == expected
+
+
+@pytest.mark.parametrize("xpath,expected", [
+    ("span/text()", ("span/text()", False)),
+    ("@href", ("@href", False)),
+    ("//a/@href", ("(self::a | descendant-or-self::node()/a)/@href", True)),
+    ("../@href", None),
+])
+def test_scope_xpath_below_the_item(xpath, expected):
+    assert scope_xpath(xpath, on_item=False) == expected
@@ -0,0 +1,137 @@
+
+import pytest
+
+from pyparsy import Parsy
+
+ITEMS_YAML = """
+items:
+  selector: //ul[@class="items"]/li
+  selector_type: XPATH
+  multiple: true
+  return_type: MAP
+  children:
+    name:
+      selector: //span[@class="name"]/text()
+      selector_type: XPATH
+      return_type: STRING
+    relative_name:
+      selector: .//span[@class="name"]/text()
+      selector_type: XPATH
+      return_type: STRING
+    css_name:
+      selector: span.name::text
+      selector_type: CSS
+      return_type: STRING
+    item_id:
+      selector: //li/@data-id
+      selector_type: XPATH
+      return_type: INTEGER
+    price:
+      selector: //span[@class="price"]
+      selector_type: XPATH
+      return_type: MAP
+      children:
+        amount:
+          selector: //b/text()
+          selector_type: XPATH
+          return_type: FLOAT
+"""
+
+ITEMS_HTML = """
+<html><body>
+<span class="name">Page</span>
+<ul class="items">
+  <li data-id="1"><span class="name">First</span><span class="price"><b>1,50</b></span></li>
+  <li data-id="2"><span class="name">Second</span></li>
+</ul>
+</body></html>
+"""
+
+
+def test_in_place_matches_reparsed_items(page):
+    assert page.expected() == page.expected(reparse_items=True)
+
+
+def test_in_place_items_are_scoped():
+    parser = Parsy.from_string(ITEMS_YAML)
+    assert parser.field_selectors.get("items").in_place
+    items = parser.parse(ITEMS_HTML).get("items")
+    assert [item.get("name") for item in items] == ["First", "Second"]
+    assert [item.get("relative_name") for item in items] == ["First", "Second"]
+    assert [item.get("css_name") for item in items] == ["First", "Second"]
+    assert [item.get("item_id") for item in items] == [1, 2]
+    assert items[0].get("price").get("amount") == 1.5
+    assert items[1].get("price").get("amount") is None
+
+
+def test_unscopable_child_falls_back_to_reparse():
+    parser = Parsy.from_string(ITEMS_YAML.replace("//b/text()", "string(//b)"))
+    assert not parser.field_selectors.get("items").in_place
+    items = parser.parse(ITEMS_HTML).get("items")
+    assert [item.get("name") for item in items] == ["First", "Second"]
+    assert items[0].get("price").get("amount") == 1.5
+
+
+def test_relative_children_keep_reparsed_semantics():
+    # Relative paths run on the root of the item document, where the span isn't a child
+    parser = Parsy.from_string(ITEMS_YAML.replace(".//span[@class", "span[@class"))
+    assert not parser.field_selectors.get("items").in_place
+    items = parser.parse(ITEMS_HTML).get("items")
+    assert [item.get("relative_name") for item in items] == [None, None]
+    assert [item.get("name") for item in items] == ["First", "Second"]
+
+
+EQUIVALENCE_HTML = """<html><body><div id="main"><ul class="items">
+<li class="item first" data-id="1"><span class="name">First</span> <b>1,5</b><a href="/a">A</a>
+  <div class="inner"><span class="name">Inner</span><p>para <i>it</i></p></div></li>
+<li class="item" data-id="2"><span class="name">Second</span><b>2</b></li>
+<li class="item" data-id="3">Third<ul><li class="sub">Sub</li></ul></li>
+</ul><table><tr class="row"><td>c1</td><td>c2</td></tr><tr class="row"><td>c3</td></tr></table>
+<p class="par">p1 <span>s</span></p><p class="par">p2</p><a id="x" href="/x">X</a></div>
+</body></html>"""
+EQUIVALENCE_ITEMS = ['//ul[@class="items"]/li', "//tr", '//p[@class="par"]']
+
+
+@pytest.mark.parametrize("selector_type,selector", [
+    *[("XPATH", xpath) for xpath in [
+        'span[@class="name"]/text()', "./span/text()", ".//span/text()", "//span/text()",
+        "text()", "//text()", ".//text()", "string(.)", "normalize-space()", "string(//b)",
+        "@data-id", "//@data-id", "//li/@data-id", "//li//li/text()", "//body/li/text()",
+        "/html/body/li/text()", "//html", "//body", "//*", "//*[@class]/@class", "*",
+        "descendant::span/text()", "descendant-or-self::li/@class", "self::li/@class",
+        "..//text()", "../@class", "ancestor::ul/@class", "following-sibling::li/@data-id",
+        "count(.//span)", "td/text()", "//td/text()", "(//span)[1]/text()",
+        "//span[1]/text()", "//a/@href | //b/text()", "local-name(*)",
+        "//a[id('x')]/@href", "count(id('x'))=0", "id('x')/text()",
+    ]],
+    *[("CSS", css) for css in [
+        "span.name::text", "li::attr(data-id)", "*::text", "body span::text",
+        "body > li::attr(class)", "li li::text", "ul > li::text", "td::text",
+        "div.inner span::text", "li:first-child::text", "span:nth-of-type(1)::text",
+    ]],
+])
+def test_in_place_matches_reparsed_items_beyond_fixtures(selector_type, selector):
+    child = {"selector": selector, "selector_type": selector_type, "return_type": "STRING"}
+    for item_selector in EQUIVALENCE_ITEMS:
+        for children in (
+            {"single": child, "multiple": {**child, "multiple": True}},
+            {
+                "nested": {
+                    "selector": '//div[@class="inner"] | //td',
+                    "selector_type": "XPATH",
+                    "return_type": "MAP",
+                    "children": {"child": child},
+                }
+            },
+        ):
+            definition = {
+                "items": {
+                    "selector": item_selector,
+                    "selector_type": "XPATH",
+                    "return_type": "MAP",
+                    "multiple": True,
+                    "children": children,
+                }
+            }
+            reparsed = Parsy(definition, reparse_items=True).parse(EQUIVALENCE_HTML)
+            assert Parsy(definition).parse(EQUIVALENCE_HTML) == reparsed
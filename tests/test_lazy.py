@@ -0,0 +1,115 @@
+from pathlib import Path
+
+import pytest
+
+from pyparsy import LazyResult, ParseStats, Parsy
+from pyparsy.exceptions import FieldNotFoundException
+
+YAML = """
+title:
+  selector: //h1/text()
+  selector_type: XPATH
+  return_type: STRING
+count:
+  selector: //span[@id="count"]/text()
+  selector_type: XPATH
+  return_type: INTEGER
+items:
+  selector: //li
+  selector_type: XPATH
+  multiple: true
+  return_type: MAP
+  children:
+    name:
+      selector: //i/text()
+      selector_type: XPATH
+      return_type: STRING
+    price:
+      selector: //b/text()
+      selector_type: XPATH
+      return_type: FLOAT
+"""
+HTML = """<html><body><h1>Title</h1><span id="count">2 items</span>
+<ul><li><i>A</i><b>1,50</b></li><li><i>B</i><b>2,00</b></li></ul></body></html>"""
+
+
+def test_fields_projection():
+    parser = Parsy.from_string(YAML)
+    result = parser.parse(HTML, fields=["count", "title"])
+    # Fields keep the order of the definition
+    assert list(result) == ["title", "count"]
+    assert result == {"title": "Title", "count": 2}
+
+
+def test_nested_fields_projection():
+    parser = Parsy.from_string(YAML)
+    result = parser.parse(HTML, fields=["items.price"])
+    assert result == {"items": [{"price": 1.5}, {"price": 2.0}]}
+    # A whole field includes all of its children
+    assert parser.parse(HTML, fields=["items.price", "items"]) == {
+        "items": parser.parse(HTML)["items"]
+    }
+    # The full definitions are not changed by a projection
+    assert list(parser.field_selectors["items"].children) == ["name", "price"]
+
+
+@pytest.mark.parametrize("options", [{}, {"reparse_items": True}, {"document_index": True}])
+def test_projection_matches_full_parse(options):
+    yaml_file = Path(__file__).parent / "assets" / "amazon_bestseller_de.yaml"
+    html = (Path(__file__).parent / "assets" / "amazon_bestseller_de.html").read_text()
+    parser = Parsy.from_file(yaml_file, **options)
+    expected = parser.parse(html)
+    result = parser.parse(html, fields=["title", "products.title"])
+    assert result["title"] == expected["title"]
+    assert result["products"] == [{"title": p["title"]} for p in expected["products"]]
+
+
+def test_projection_records():
+    parser = Parsy.from_string(YAML, records=True)
+    result = parser.parse(HTML, fields=["title", "items.name"])
+    assert result.title == "Title"
+    assert [item.name for item in result.items_] == ["A", "B"]
+    assert result.to_dict() == {"title": "Title", "items": [{"name": "A"}, {"name": "B"}]}
+
+
+def test_projection_unknown_fields():
+    parser = Parsy.from_string(YAML)
+    with pytest.raises(FieldNotFoundException, match="items.color"):
+        parser.parse(HTML, fields=["items.color"])
+    with pytest.raises(FieldNotFoundException, match="title is not a MAP"):
+        parser.parse(HTML, fields=["title.text"])
+
+
+def test_projection_only_evaluates_requested_fields():
+    stats = ParseStats()
+    parser = Parsy.from_string(YAML).instrument(stats)
+    parser.parse(HTML, fields=["items.price"])
+    assert set(stats.fields) == {"items", "items.price"}
+
+
+def test_lazy_result():
+    stats = ParseStats()
+    parser = Parsy.from_string(YAML).instrument(stats)
+    result = parser.parse(HTML, lazy=True)
+    assert isinstance(result, LazyResult)
+    assert list(result) == ["title", "count", "items"]
+    assert "count" in result and len(result) == 3
+    assert stats.fields == {}
+    assert result["count"] == 2
+    assert result["count"] == 2
+    assert result.evaluated == ["count"]
+    assert stats.fields["count"].calls == 1
+    assert "title" not in stats.fields
+    assert result.to_dict() == Parsy.from_string(YAML).parse(HTML)
+    assert result == Parsy.from_string(YAML).parse(HTML)
+    # The document is freed once every field is known
+    assert result._html_data is None
+    with pytest.raises(KeyError):
+        result["unknown"]
+
+
+def test_lazy_projection():
+    parser = Parsy.from_string(YAML, records=True)
+    result = parser.parse(HTML, fields=["items.name"], lazy=True)
+    assert list(result) == ["items"]
+    assert [item.name for item in result["items"]] == ["A", "B"]
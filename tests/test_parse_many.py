@@ -0,0 +1,67 @@
+import inspect
+import pickle
+
+import pyparsy
+from pyparsy import Budget, Parsy, ResultCache
+
+
+def test_parser_can_be_pickled(page):
+    parser = page.parser(strip_strings=True)
+    clone = pickle.loads(pickle.dumps(parser))
+    assert clone.strip_strings
+    assert clone.parse(page.html) == parser.parse(page.html)
+
+
+def test_parser_of_compiled_definitions_can_be_pickled(page):
+    parser = Parsy(definitions=page.parser().field_selectors, validate=False, **page.options)
+    clone = pickle.loads(pickle.dumps(parser))
+    assert list(clone.field_selectors) == list(parser.field_selectors)
+    assert clone.parse(page.html) == page.expected()
+
+
+def test_pickled_and_thread_copies_keep_every_option(pages):
+    parameters = set(inspect.signature(Parsy).parameters)
+    # Options passed explicitly or only needed while constructing
+    assert parameters - set(pyparsy._OPTIONS + pyparsy._THREAD_OPTIONS) == {
+        "yaml_def",
+        "validate",
+        "definitions",
+    }
+    options = {
+        "strip_strings": True,
+        "reparse_items": True,
+        "document_index": True,
+        "records": True,
+        "raw_regex": True,
+        "prune": ("script",),
+        "backend": "lxml",
+        "budget": Budget(max_input_size=10),
+        "result_cache": ResultCache(),
+    }
+    assert set(options) == set(pyparsy._OPTIONS + pyparsy._THREAD_OPTIONS)
+    thread_copy = pages["base_test"].parser(**options)._thread_copy()
+    options["result_cache"] = None
+    parser = pages["base_test"].parser(**options)
+    pickled = pickle.loads(pickle.dumps(parser))
+    for name in pyparsy._OPTIONS:
+        assert getattr(thread_copy, name) is options[name]
+        if name != "budget":
+            assert getattr(pickled, name) == options[name]
+    assert thread_copy.result_cache is not None
+    assert pickled.budget.max_input_size == 10
+
+
+def test_parse_many_ordered(pages):
+    parser = pages["google_com"].parser()
+    htmls = [page.html for page in pages.values()] * 2
+    expected = [parser.parse(html) for html in htmls]
+    assert list(parser.parse_many(htmls, workers=2, chunksize=2)) == expected
+
+
+def test_parse_many_unordered_from_generator(pages):
+    parser = pages["google_com"].parser()
+    htmls = [page.html for page in pages.values()]
+    expected = [parser.parse(html) for html in htmls]
+    results = list(parser.parse_many(iter(htmls), workers=2, ordered=False))
+    assert len(results) == len(expected)
+    assert all(result in expected for result in results)
@@ -0,0 +1,67 @@
+from pathlib import Path
+
+import pytest
+
+from pyparsy import FieldEvent, ParseStats, Parsy
+
+
+@pytest.fixture
+def base_parser():
+    return Parsy.from_file(Path("tests/assets/base_test.yaml"))
+
+
+@pytest.fixture
+def base_html():
+    return Path("tests/assets/base_test.html").read_text()
+
+
+def test_instrumented_parse_returns_same_result(base_parser, base_html):
+    expected = base_parser.parse(base_html)
+    assert base_parser.instrument(ParseStats()).parse(base_html) == expected
+
+
+def test_stats_by_field_path(base_parser, base_html):
+    stats = ParseStats()
+    base_parser.instrument(stats)
+    base_parser.parse(base_html)
+    base_parser.parse(base_html)
+    fields = stats.as_dict()
+    assert set(fields) >= {"title", "components", "components.count", "components.link"}
+    assert fields["title"]["calls"] == 2
+    assert fields["title"]["alternatives"] == {0: 2}
+    # The first XPath of the fallback list doesn't match
+    assert fields["image"]["alternatives"] == {1: 2}
+    assert fields["re_not_existing"]["misses"] == 2
+    assert fields["multiple_re"]["matches"] == 4
+    assert fields["components"]["time"] >= fields["components.count"]["time"]
+    assert "components.link" in stats.report()
+    stats.reset()
+    assert not stats.as_dict()
+
+
+def test_multiple_map_item_fields():
+    parser = Parsy.from_file(Path("tests/assets/google_com.yaml"))
+    stats = ParseStats()
+    parser.instrument(stats)
+    result = parser.parse(Path("tests/assets/google_com.html").read_text())
+    fields = stats.as_dict()
+    assert fields["results"]["matches"] == len(result["results"])
+    assert fields["results.title"]["calls"] == len(result["results"])
+
+
+def test_callback_receives_events(base_parser, base_html):
+    events = []
+    base_parser.instrument(events.append)
+    base_parser.parse(base_html)
+    assert all(isinstance(event, FieldEvent) for event in events)
+    assert {event.path for event in events} >= set(base_parser.field_selectors)
+    title = next(event for event in events if event.path == "title")
+    assert title.alternative == 0 and title.matches == 1 and title.elapsed > 0
+
+
+def test_instrumentation_can_be_removed(base_parser, base_html):
+    events = []
+    base_parser.instrument(events.append).instrument()
+    base_parser.parse(base_html)
+    assert not events
+    assert "_parse_field" not in vars(base_parser)
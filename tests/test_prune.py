@@ -0,0 +1,137 @@
+import pickle
+import pytest
+
+from pyparsy import Parsy, ParsyBundle
+from pyparsy.enum_types import SelectorType
+from pyparsy.internal.tree import create_root_node
+
+HTML = """<html><head><style>h1 { color: red }</style>
+<script type="application/ld+json">{"sku": "A1"}</script></head>
+<body><!-- tracking --><h1>Title</h1><script>var id = 7;</script>tail<svg><path/></svg></body></html>
+"""
+TEXT = {"text": {"selector": "string(//body)", "selector_type": "XPATH", "return_type": "STRING"}}
+TITLE = {"title": {"selector": "//h1/text()", "selector_type": "XPATH", "return_type": "STRING"}}
+
+
+def _definition(selector: str, selector_type: str = "XPATH") -> dict:
+    return {"field": {"selector": selector, "selector_type": selector_type, "return_type": "STRING"}}
+
+
+def test_create_root_node_prunes_elements_and_comments():
+    root = create_root_node(HTML, prune=("script", "style", "#comment"))
+    assert not root.xpath("//script | //style | //comment()")
+    assert root.xpath("string(//body)") == "Titletail"
+    root = create_root_node(HTML.encode(), prune=("svg",))
+    assert root.xpath("count(//script)") == 2
+    assert root.xpath("//comment()")
+    assert not root.xpath("//svg")
+
+
+@pytest.mark.parametrize(
+    "definition, pruned",
+    [
+        (TITLE, ("script", "style", "#comment")),
+        (_definition("//a/@href | //h1/text()[1]"), ("script", "style", "#comment")),
+        (_definition('//script[@type="application/ld+json"]/text()'), ("style", "#comment")),
+        (_definition("style::text", "CSS"), ("script", "#comment")),
+        (_definition("//comment()"), ("script", "style")),
+        (_definition("var id = (\\d+)", "REGEX"), ()),
+        # Fields that can return the content of pruned nodes
+        (TEXT, ()),
+        (_definition('//body[@class="page"]'), ()),
+        (_definition("normalize-space(//body)"), ()),
+        (_definition("//body//text()"), ()),
+        (_definition("//*[@type]/text()"), ()),
+        (_definition("//body/node()"), ()),
+        (_definition("//body[contains(., 'id')]/@class"), ()),
+        (_definition("body", "CSS"), ()),
+    ],
+)
+def test_inferred_pruning(definition, pruned):
+    assert Parsy(definition, prune=True)._pruned == pruned
+
+
+def test_maps_and_booleans_select_elements_without_their_content():
+    definition = {
+        "body": {
+            "selector": "//body",
+            "selector_type": "XPATH",
+            "return_type": "MAP",
+            "children": {
+                **TITLE,
+                "has_svg": {**TITLE["title"], "selector": "//svg", "return_type": "BOOLEAN"},
+            },
+        }
+    }
+    assert Parsy(definition, prune=True)._pruned == ("script", "style", "#comment")
+    definition["body"]["children"]["text"] = TEXT["text"]
+    assert Parsy(definition, prune=True)._pruned == ()
+
+
+@pytest.mark.parametrize(
+    "selector",
+    [
+        "//p/text()",
+        "//p/text()[2]",
+        "//p/b/text()",
+        "//p/@class",
+        "count(//p/text())",
+        "string(//p)",
+        "//p",
+        "//p//text()",
+        "//*[@type]/text()",
+        "//p/node()",
+    ],
+)
+def test_inferred_pruning_keeps_results(selector):
+    html = '<html><body><p class="x">a<!-- c -->b<script>var x;</script>c<b>d</b></p></body></html>'
+    for multiple in (False, True):
+        definition = _definition(selector)
+        definition["field"]["multiple"] = multiple
+        assert Parsy(definition, prune=True).parse(html) == Parsy(definition).parse(html)
+
+
+def test_regex_fields_keep_scripts():
+    definition = {**TITLE, **_definition("var id = (\\d+)", "REGEX")}
+    assert Parsy(definition, prune=True).parse(HTML)["field"] == "7"
+    # Top level REGEX fields are evaluated on the input text with raw_regex
+    parser = Parsy(definition, prune=True, raw_regex=True)
+    assert parser._pruned == ("script", "style", "#comment")
+    assert parser.parse(HTML) == {"title": "Title", "field": "7"}
+
+
+def test_pruned_parse():
+    assert Parsy(TEXT).parse(HTML)["text"] == "Titlevar id = 7;tail"
+    # Only names given in a list are pruned from the content of selected elements
+    assert Parsy(TEXT, prune=True).parse(HTML)["text"] == "Titlevar id = 7;tail"
+    assert Parsy(TEXT, prune=["svg", "script"]).parse(HTML)["text"] == "Titletail"
+    assert Parsy(TEXT, prune=["svg"]).parse(HTML)["text"] == "Titlevar id = 7;tail"
+
+
+def test_pruning_keeps_fixture_results(page):
+    parser = page.parser(prune=True)
+    # Nothing is pruned when REGEX fields are evaluated on the tree
+    regex = any(
+        definition.selector_type == SelectorType.REGEX
+        for definition in parser.field_selectors.values()
+    )
+    assert bool(parser._pruned) != regex
+    assert parser.parse(page.html) == page.expected()
+
+
+def test_bundle_prunes_nodes_of_all_parsers():
+    bundle = ParsyBundle(
+        {
+            "text": Parsy(TEXT, prune=["script", "style", "#comment"]),
+            "json": Parsy(_definition("//script[@type='application/ld+json']/text()"), prune=True),
+        }
+    )
+    assert bundle._pruned == ("style", "#comment")
+    results = bundle.parse(HTML)
+    assert results["json"]["field"] == '{"sku": "A1"}'
+    assert results["text"]["text"] == "Titlevar id = 7;tail"
+
+
+def test_pickled_parser_keeps_pruning():
+    parser = pickle.loads(pickle.dumps(Parsy(TEXT, prune=["script"])))
+    assert parser._pruned == ("script",)
@@ -0,0 +1,86 @@
+import pickle
+
+import pytest
+
+from pyparsy import Parsy, Record
+from pyparsy.records import record_class
+
+YAML = """
+title:
+  selector: //h1/text()
+  selector_type: XPATH
+  return_type: STRING
+product-info:
+  selector: //div[@id="info"]
+  selector_type: XPATH
+  return_type: MAP
+  children:
+    class:
+      selector: //span/@class
+      selector_type: XPATH
+      return_type: STRING
+    get:
+      selector: //span/text()
+      selector_type: XPATH
+      return_type: STRING
+items:
+  selector: //li
+  selector_type: XPATH
+  multiple: true
+  return_type: MAP
+  children:
+    price:
+      selector: //b/text()
+      selector_type: XPATH
+      return_type: FLOAT
+"""
+HTML = """<html><body><h1>Title</h1><div id="info"><span class="x">Info</span></div>
+<ul><li><b>1,50</b></li><li><b>2,00</b></li></ul></body></html>"""
+
+
+def test_records_equal_dict_result():
+    expected = Parsy.from_string(YAML).parse(HTML)
+    result = Parsy.from_string(YAML, records=True).parse(HTML)
+    assert isinstance(result, Record)
+    assert result == expected
+    assert result.to_dict() == expected
+    assert type(result.to_dict()["items"][0]) is dict
+
+
+def test_record_access():
+    result = Parsy.from_string(YAML, records=True).parse(HTML)
+    assert result.title == result["title"] == result.get("title") == "Title"
+    info = result["product-info"]
+    # Fields that aren't valid identifiers or collide with methods are mangled
+    assert info["class"] == "x" and info["get"] == "Info"
+    assert info.get("class") == "x"
+    assert list(info) == ["class", "get"]
+    assert [item.price for item in result.items_] == [1.5, 2.0]
+    assert result.get("unknown") is None
+    with pytest.raises(KeyError):
+        result["unknown"]
+    assert not hasattr(result, "__dict__")
+
+
+def test_records_can_be_pickled():
+    result = Parsy.from_string(YAML, records=True).parse(HTML)
+    clone = pickle.loads(pickle.dumps(result))
+    assert type(clone) is type(result)
+    assert clone == result
+
+
+def test_record_class_is_cached():
+    assert record_class("ItemRecord", ("a", "b")) is record_class("ItemRecord", ("a", "b"))
+
+
+def test_records_fixtures(page):
+    expected = page.expected()
+    assert page.expected(records=True) == expected
+    assert page.expected(records=True, reparse_items=True) == expected
+
+
+def test_records_parse_many():
+    parser = Parsy.from_string(YAML, records=True)
+    results = list(parser.parse_many([HTML, HTML], workers=2))
+    assert results == [parser.parse(HTML)] * 2
+    assert isinstance(results[0], Record)
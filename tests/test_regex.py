@@ -0,0 +1,94 @@
+import io
+import re
+
+import pytest
+from parsel.utils import extract_regex
+
+from pyparsy import Parsy
+from pyparsy.internal import tree
+from pyparsy.internal.tree import ContextNodes, search_regex
+
+TEXT = 'let a = "1 &amp; 2"; let b = "x &quot;y&quot;"; const c = ""; <b>&lt;tag&gt;</b>'
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    [
+        r'let \w = "(.*?)"',
+        r"let (\w) = \"(.*?)\"",
+        r"let \w = \"[^\"]*\"",
+        r"const c = \"(.*)\"",
+        r"const c = (x)?",
+        r"(?P<extract>b) = ",
+        r"(?P<extract>z)?let",
+        r"<b>(.*?)</b>",
+        r"missing (\d+)",
+    ],
+)
+def test_search_regex_matches_first_extracted_string(pattern):
+    regex = re.compile(pattern)
+    expected = extract_regex(regex, TEXT)
+    assert search_regex(regex, ContextNodes((), [TEXT])) == (expected[0] if expected else None)
+
+
+def test_search_regex_skips_nodes_without_match():
+    regex = re.compile(r"<i>(\w+)</i>")
+    nodes = ContextNodes((), ["<b>no</b>", "<i>yes</i>", "<i>later</i>"])
+    assert search_regex(regex, nodes) == "yes"
+
+
+YAML = r"""
+script:
+  selector: let foo = "([^"]*)"
+  selector_type: REGEX
+  return_type: STRING
+fallback:
+  selector:
+    - var foo = "([^"]*)"
+    - const bar = "([^"]*)"
+  selector_type: REGEX
+  return_type: STRING
+numbers:
+  selector: data-n="(\d+)"
+  selector_type: REGEX
+  multiple: true
+  return_type: INTEGER
+"""
+HTML = """<html><head><script>let foo = "Foo"; const bar = "Bar";</script></head>
+<body><p data-n="1">a</p><p data-n="22">b</p></body></html>"""
+
+
+def test_regex_fields_serialize_document_once(monkeypatch):
+    calls = []
+    serialize = tree.serialize
+    monkeypatch.setattr(tree, "serialize", lambda node: calls.append(node) or serialize(node))
+    result = Parsy.from_string(YAML).parse(HTML)
+    assert result == {"script": "Foo", "fallback": "Bar", "numbers": [1, 22]}
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize(
+    "html", [HTML, HTML.encode("utf-8"), memoryview(HTML.encode("utf-8"))], ids=type
+)
+def test_raw_regex_without_tree(monkeypatch, html):
+    expected = Parsy.from_string(YAML).parse(HTML)
+    parser = Parsy.from_string(YAML, raw_regex=True)
+
+    def create_root_node(*args):
+        raise AssertionError("The tree isn't needed")
+
+    monkeypatch.setattr("pyparsy.create_root_node", create_root_node)
+    assert parser.parse(html) == expected
+    assert parser.parse(io.BytesIO(HTML.encode("utf-8"))) == expected
+
+
+def test_raw_regex_with_other_fields():
+    yaml = YAML + "\ntitle:\n  selector: //p/text()\n  selector_type: XPATH\n  return_type: STRING\n"
+    parser = Parsy.from_string(yaml, raw_regex=True)
+    # Regex fields see the input as it is, e.g. with the original quotes of attributes
+    html = HTML.replace('data-n="1"', "data-n='1' data-n=\"3\"")
+    result = parser.parse(io.BytesIO(html.encode("utf-8")))
+    assert result["title"] == "a"
+    assert result["numbers"] == [3, 22]
+    # Only the projected fields decide whether the tree is built
+    assert parser.parse(html, fields=["script"]) == {"script": "Foo"}
@@ -0,0 +1,131 @@
+import shutil
+from pathlib import Path
+
+import pytest
+import yaml
+from schema import SchemaError
+
+from pyparsy import Parsy, ParsyRegistry, Validator
+from pyparsy.exceptions import DefinitionValidationException, XPathValidationException
+
+ASSETS = Path("tests/assets")
+
+NESTED = """
+products:
+  selector: //li
+  selector_type: XPATH
+  multiple: true
+  return_type: MAP
+  children:
+    title:
+      selector: //h2[.text()
+      selector_type: XPATH
+      return_type: STRING
+    available:
+      selector: //span[@class="stock"]
+      selector_type: XPATH
+      return_type: BOOLEAN
+    details:
+      selector: //div
+      selector_type: XPATH
+      return_type: MAP
+      children:
+        color:
+          selector: .color::text(
+          selector_type: CSS
+          return_type: STRING
+"""
+
+
+def test_validator_recurses_into_children():
+    yaml_def = yaml.safe_load(NESTED)
+    with pytest.raises(XPathValidationException, match="products.title"):
+        Validator(yaml_def)
+    validator = Validator(yaml_def, collect_errors=True)
+    assert [field for field, _ in validator.errors] == [
+        "products.title",
+        "products.details.color",
+    ]
+
+
+def test_validator_accepts_boolean():
+    Validator({"flag": {"selector": "//b", "selector_type": "XPATH", "return_type": "BOOLEAN"}})
+    with pytest.raises(SchemaError):
+        Validator({"flag": {"selector": "//b", "selector_type": "XPATH", "return_type": "DATE"}})
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_registry_from_directory(tmp_path, workers):
+    for name in ("amazon_com", "google_com"):
+        shutil.copy(ASSETS / f"{name}.yaml", tmp_path / f"{name}.yaml")
+    (tmp_path / "ebay").mkdir()
+    shutil.copy(ASSETS / "ebay_de.yaml", tmp_path / "ebay" / "listing.yaml")
+    registry = ParsyRegistry.from_directory(
+        tmp_path, pattern="**/*.yaml", workers=workers, strip_strings=True
+    )
+    assert registry.names == ["amazon_com", "ebay/listing", "google_com"]
+    assert "ebay/listing" in registry and len(registry) == 3
+    parser = registry["google_com"]
+    # Parsers are created once, on their first request
+    assert registry.get("google_com") is parser
+    assert parser.strip_strings
+    html = (ASSETS / "google_com.html").read_text()
+    expected = Parsy.from_file(ASSETS / "google_com.yaml", strip_strings=True).parse(html)
+    assert parser.parse(html) == expected
+    with pytest.raises(KeyError):
+        registry["missing"]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_registry_reports_all_errors(tmp_path, workers):
+    for path in (ASSETS / "invalid").glob("*.yaml"):
+        shutil.copy(path, tmp_path / path.name)
+    shutil.copy(ASSETS / "google_com.yaml", tmp_path / "google_com.yaml")
+    (tmp_path / "nested.yaml").write_text(NESTED)
+    (tmp_path / "empty.yaml").write_text("")
+    (tmp_path / "broken.yaml").write_text("title: [")
+    with pytest.raises(DefinitionValidationException) as error:
+        ParsyRegistry.from_directory(tmp_path, workers=workers)
+    errors = error.value.errors
+    assert sorted(errors) == [
+        "broken",
+        "empty",
+        "invalid_css",
+        "invalid_regex",
+        "invalid_schema",
+        "invalid_xpath",
+        "nested",
+    ]
+    assert [field for field, _ in errors["nested"]] == ["products.title", "products.details.color"]
+    assert "invalid_xpath: title: XPathValidationException" in str(error.value)
+    # Without validation only unreadable definitions are errors
+    with pytest.raises(DefinitionValidationException) as error:
+        ParsyRegistry.from_directory(tmp_path, workers=workers, validate=False)
+    assert sorted(error.value.errors) == ["broken", "empty"]
+
+
+@pytest.mark.parametrize(
+    "definition",
+    [
+        {"selector": "//a", "selector_type": "XPATH", "return_type": "STRING"},
+        {"selector": ["//a", "//b"], "selector_type": "css", "return_type": "map", "children": {}},
+        {"selector": "a", "selector_type": "REGEX", "return_type": "INTEGER", "multiple": True},
+        {"selector": [], "selector_type": "XPATH", "return_type": "STRING"},
+        {"selector": 1, "selector_type": "XPATH", "return_type": "STRING"},
+        {"selector": "//a", "selector_type": "JSON", "return_type": "STRING"},
+        {"selector": "//a", "selector_type": "XPATH", "return_type": "DOUBLE"},
+        {"selector": "//a", "selector_type": "XPATH", "return_type": "STRING", "multiple": 1},
+        {"selector": "//a", "selector_type": "XPATH", "return_type": "STRING", "children": "x"},
+        {"selector": "//a", "selector_type": "XPATH", "return_type": "STRING", "other": 1},
+        {"selector": "//a", "return_type": "STRING"},
+    ],
+)
+def test_fast_validation_agrees_with_schema(definition):
+    from pyparsy.validator import _is_valid_definition, definition_schema
+
+    try:
+        definition_schema().validate(definition)
+        valid = True
+    except SchemaError:
+        valid = False
+    assert _is_valid_definition(definition) == valid
@@ -0,0 +1,176 @@
+import io
+import os
+import time
+
+from pyparsy import _OPTIONS, Budget, DiskBackend, MemoryBackend, Parsy, ResultCache
+from pyparsy.internal import Definition
+
+YAML = """
+title:
+  selector: //h1/text()
+  selector_type: XPATH
+  return_type: STRING
+links:
+  selector: //a/@href
+  selector_type: XPATH
+  return_type: STRING
+  multiple: true
+"""
+HTML = "<html><body><h1> Title </h1><h2>Subtitle</h2><a href='/a'>a</a></body></html>"
+
+
+def test_unchanged_page_is_a_hit():
+    cache = ResultCache()
+    parser = Parsy.from_string(YAML, result_cache=cache)
+    first = parser.parse(HTML)
+    second = parser.parse(HTML.encode())
+    assert first == second == Parsy.from_string(YAML).parse(HTML)
+    assert (cache.hits, cache.misses) == (0, 2)
+    assert parser.parse(HTML) == first
+    assert parser.parse(io.BytesIO(HTML.encode())) == first
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_hits_are_copies():
+    parser = Parsy.from_string(YAML, result_cache=ResultCache())
+    parser.parse(HTML)["links"].append("/b")
+    assert parser.parse(HTML)["links"] == ["/a"]
+
+
+def test_changed_page_is_a_miss():
+    cache = ResultCache()
+    parser = Parsy.from_string(YAML, result_cache=cache)
+    parser.parse(HTML)
+    assert parser.parse(HTML.replace("Title", "Other"))["title"] == " Other "
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test_changed_definition_never_returns_stale_results(tmp_path):
+    for backend in (MemoryBackend(), DiskBackend(tmp_path)):
+        cache = ResultCache(backend)
+        assert Parsy.from_string(YAML, result_cache=cache).parse(HTML)["title"] == " Title "
+        changed = Parsy.from_string(YAML.replace("//h1", "//h2"), result_cache=cache)
+        assert changed.parse(HTML)["title"] == "Subtitle"
+        stripped = Parsy.from_string(YAML, strip_strings=True, result_cache=cache)
+        assert stripped.parse(HTML)["title"] == "Title"
+        assert stripped.parse(HTML, fields=["links"]) == {"links": ["/a"]}
+        assert (cache.hits, cache.misses) == (0, 4)
+
+
+def _compiled_parser(field: str, xpath: str, cache: ResultCache) -> Parsy:
+    definition = {"selector": xpath, "selector_type": "XPATH", "return_type": "STRING"}
+    return Parsy(
+        definitions={field: Definition(field, definition)}, validate=False, result_cache=cache
+    )
+
+
+def test_parsers_of_compiled_definitions_share_a_cache():
+    cache = ResultCache()
+    parsers = [
+        _compiled_parser("title", "//h1/text()", cache),
+        _compiled_parser("title", "//h2/text()", cache),
+        _compiled_parser("heading", "//h1/text()", cache),
+    ]
+    results = [parser.parse(HTML) for parser in parsers]
+    assert results == [{"title": " Title "}, {"title": "Subtitle"}, {"heading": " Title "}]
+    assert (cache.hits, cache.misses) == (0, 3)
+    assert [parser.parse(HTML) for parser in parsers] == results
+    assert (cache.hits, cache.misses) == (3, 3)
+
+
+def test_field_order_is_part_of_the_key():
+    cache = ResultCache()
+    title, links = YAML.split("\nlinks:")
+    parser = Parsy.from_string(YAML, records=True, result_cache=cache)
+    reordered = Parsy.from_string(f"\nlinks:{links}{title}", records=True, result_cache=cache)
+    assert parser.parse(HTML).title == " Title "
+    assert reordered.parse(HTML).links == ["/a"]
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test_every_option_is_part_of_the_key():
+    options = [
+        {"strip_strings": True},
+        {"reparse_items": True},
+        {"document_index": True},
+        {"records": True},
+        {"raw_regex": True},
+        {"prune": True},
+        {"backend": "auto"},
+        {"budget": Budget(page_timeout=10)},
+    ]
+    assert [name for option in options for name in option] == list(_OPTIONS)
+    cache = ResultCache()
+    for option in [{}, *options]:
+        Parsy.from_string(YAML, result_cache=cache, **option).parse(HTML)
+    assert (cache.hits, cache.misses) == (0, len(options) + 1)
+
+
+def test_lazy_results_bypass_the_cache():
+    cache = ResultCache()
+    parser = Parsy.from_string(YAML, result_cache=cache)
+    assert parser.parse(HTML, lazy=True)["title"] == " Title "
+    assert (cache.hits, cache.misses) == (0, 0)
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryBackend(maxsize=2)
+    backend.set("a", b"1")
+    backend.set("b", b"2")
+    assert backend.get("a") == b"1"
+    backend.set("c", b"3")
+    assert backend.get("b") is None
+    assert (backend.get("a"), backend.get("c")) == (b"1", b"3")
+
+
+def test_memory_backend_bounds_size():
+    backend = MemoryBackend(max_bytes=10)
+    backend.set("a", b"12345")
+    backend.set("b", b"12345")
+    backend.set("c", b"1")
+    assert backend.get("a") is None
+    assert len(backend) == 2
+    assert backend.size == 6
+
+
+def test_memory_backend_expires_entries():
+    backend = MemoryBackend(ttl=0.05)
+    backend.set("a", b"1")
+    assert backend.get("a") == b"1"
+    time.sleep(0.1)
+    assert backend.get("a") is None
+    assert backend.size == 0
+
+
+def test_disk_backend_survives_restart(tmp_path):
+    parser = Parsy.from_string(YAML, result_cache=ResultCache(DiskBackend(tmp_path)))
+    result = parser.parse(HTML)
+    cache = ResultCache(DiskBackend(tmp_path))
+    assert Parsy.from_string(YAML, result_cache=cache).parse(HTML) == result
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_disk_backend_evicts_and_expires(tmp_path):
+    backend = DiskBackend(tmp_path, maxsize=10)
+    for number in range(10):
+        backend.set(f"key{number}", b"value")
+        os.utime(tmp_path / f"key{number}.result", (number, number))
+    assert backend.get("key0") == b"value"
+    backend.set("key10", b"value")
+    assert len(list(tmp_path.glob("*.result"))) <= 10
+    assert backend.get("key0") == b"value"
+    assert backend.get("key1") is None
+    expiring = DiskBackend(tmp_path, ttl=-1)
+    assert expiring.get("key0") is None
+    assert not (tmp_path / "key0.result").exists()
+
+
+def test_clear_resets_counters():
+    cache = ResultCache()
+    parser = Parsy.from_string(YAML, result_cache=cache)
+    parser.parse(HTML)
+    parser.parse(HTML)
+    cache.clear()
+    assert (cache.hits, cache.misses) == (0, 0)
+    parser.parse(HTML)
+    assert cache.misses == 1
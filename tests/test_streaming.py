@@ -0,0 +1,120 @@
+import io
+import subprocess
+import sys
+
+import pytest
+
+from pyparsy import Parsy
+from pyparsy.exceptions import StreamingNotSupportedException
+
+ITEMS_YAML = """
+title:
+  selector: //title/text()
+  selector_type: XPATH
+  return_type: STRING
+items:
+  selector: //ul[@class="items"]/li
+  selector_type: XPATH
+  multiple: true
+  return_type: MAP
+  children:
+    name:
+      selector: //span[@class="name"]/text()
+      selector_type: XPATH
+      return_type: STRING
+    price:
+      selector: //b/text()
+      selector_type: XPATH
+      return_type: FLOAT
+"""
+
+# Streams a generated document with the given number of items and prints the peak RSS in KiB
+RSS_SCRIPT = """
+import resource, sys
+from pyparsy import Parsy
+
+path, count = sys.argv[1], int(sys.argv[2])
+with open(path, "w") as file:
+    file.write('<html><head><title>Items</title></head><body><ul class="items">')
+    for i in range(count):
+        file.write(f'<li><span class="name">Item {i}</span><b>{i},99</b><p>{"x" * 150}</p></li>')
+    file.write("</ul></body></html>")
+parser = Parsy.from_string(sys.stdin.read())
+assert sum(1 for _ in parser.iter_items(path)) == count
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def test_iter_items_matches_parse(items_page):
+    expected = items_page.expected()[items_page.items]
+    items = items_page.parser().iter_items(items_page.html_file, encoding="utf-8")
+    assert list(items) == expected
+
+
+def test_iter_items_from_binary_stream():
+    html = b"""<html><body><ul class="items">
+    <li><span class="name">First</span><b>1,50</b></li>
+    <li><span class="name">Second</span></li>
+    </ul></body></html>"""
+    items = list(Parsy.from_string(ITEMS_YAML).iter_items(io.BytesIO(html), field="items"))
+    assert [item.get("name") for item in items] == ["First", "Second"]
+    assert [item.get("price") for item in items] == [1.5, None]
+
+
+STREAM_HTML = b"""<html><body><ul class="items">
+<li><span class="name">First</span><b>1,50</b></li>
+<li><span class="name">Second</span><b>2</b></li>
+</ul></body></html>"""
+
+
+def test_iter_items_with_unscoped_children():
+    # string(//b) can't be scoped to an item, so the items are parsed on their own
+    parser = Parsy.from_string(ITEMS_YAML.replace("//b/text()", "string(//b)"))
+    assert not parser.field_selectors["items"].in_place
+    expected = parser.parse(STREAM_HTML)["items"]
+    assert [item["price"] for item in expected] == [1.5, 2.0]
+    assert list(parser.iter_items(io.BytesIO(STREAM_HTML))) == expected
+
+
+def test_iter_items_with_reparse_items():
+    # Relative paths run on the root of the reparsed item, where the span isn't a child
+    yaml = ITEMS_YAML.replace('//span[@class="name"]/text()', "span/text()")
+    for reparse_items in (False, True):
+        parser = Parsy.from_string(yaml, reparse_items=reparse_items)
+        expected = parser.parse(STREAM_HTML)["items"]
+        assert list(parser.iter_items(io.BytesIO(STREAM_HTML))) == expected
+    reparsed = Parsy.from_string(ITEMS_YAML, reparse_items=True)
+    items = list(reparsed.iter_items(io.BytesIO(STREAM_HTML)))
+    assert items == reparsed.parse(STREAM_HTML)["items"]
+
+
+def test_iter_items_can_be_closed_early(pages):
+    page = pages["amazon_de_search"]
+    items = page.parser().iter_items(page.html_file, encoding="utf-8")
+    assert next(items).get("asin")
+    items.close()
+
+
+@pytest.mark.parametrize("selector", [
+    '//ul[@class="items"]/li[1]',
+    "//li[span]",
+    "//li/text()",
+    "(//li)",
+])
+def test_iter_items_unsupported_selector(selector):
+    parser = Parsy.from_string(ITEMS_YAML.replace('//ul[@class="items"]/li', selector))
+    with pytest.raises(StreamingNotSupportedException):
+        next(parser.iter_items(io.BytesIO(b"<html></html>")))
+
+
+def test_iter_items_peak_rss_is_bounded(tmp_path):
+    def peak_rss(count):
+        result = subprocess.run(
+            [sys.executable, "-c", RSS_SCRIPT, str(tmp_path / f"{count}.html"), str(count)],
+            input=ITEMS_YAML, capture_output=True, text=True, check=True,
+        )
+        return int(result.stdout)
+
+    small, large = peak_rss(2000), peak_rss(60000)
+    # The whole tree of the large document alone would take more than 100 MiB
+    assert large - small < 15 * 1024
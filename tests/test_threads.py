@@ -0,0 +1,64 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pyparsy import ParseStats, Parsy
+
+
+def test_shared_parser_in_threads(pages, options):
+    parsers = [(page.parser(**options), page.html) for page in pages.values()]
+    expected = [page.expected(**options) for page in pages.values()]
+    jobs = [index % len(parsers) for index in range(4 * len(parsers))]
+
+    def parse(index):
+        parser, html = parsers[index]
+        return parser.parse(html)
+
+    with ThreadPoolExecutor(8) as executor:
+        results = list(executor.map(parse, jobs))
+    assert results == [expected[index] for index in jobs]
+
+
+def test_shared_instrumented_parser_in_threads(pages):
+    stats = ParseStats()
+    page = pages["amazon_bestseller_de"]
+    parser, html = page.parser(), page.html
+    expected = page.expected()
+    parser.instrument(stats)
+    with ThreadPoolExecutor(8) as executor:
+        results = list(executor.map(lambda _: parser.parse(html), range(32)))
+    assert all(result == expected for result in results)
+    assert stats.fields["title"].calls == 32
+
+
+def test_parse_many_threads(pages):
+    parser = pages["google_com"].parser()
+    htmls = [pages["google_com"].html, pages["ebay_de"].html, ""] * 5
+    expected = [parser.parse(html) for html in htmls]
+    assert list(parser.parse_many(htmls, workers=4, executor="threads")) == expected
+    results = list(parser.parse_many(htmls, workers=4, ordered=False, executor="threads"))
+    assert sorted(map(repr, results)) == sorted(map(repr, expected))
+
+
+def test_parse_many_threads_share_hooks():
+    stats = ParseStats()
+    yaml = """
+title:
+  selector:
+    - //h2/text()
+    - //h1/text()
+  selector_type: XPATH
+  return_type: STRING
+"""
+    parser = Parsy.from_string(yaml).instrument(stats)
+    pages = ["<html><body><h1>Title</h1></body></html>"] * 6
+    assert list(parser.parse_many(pages, workers=3, executor="threads")) == [
+        {"title": "Title"}
+    ] * 6
+    assert stats.fields["title"].calls == 6
+    assert stats.fields["title"].alternatives == {1: 6}
+
+
+def test_parse_many_unknown_executor(pages):
+    with pytest.raises(ValueError):
+        list(pages["google_com"].parser().parse_many([""], executor="fibers"))
@@ -3,7 +3,7 @@ from decimal import Decimal
 import pytest
 
 from pyparsy import extract_float, extract_integer
-from pyparsy.utils import extract_decimal
+from pyparsy.utils import extract_decimal, extract_floats, extract_integers
 
 
 @pytest.mark.parametrize("input_string,expected",
@@ -30,3 +30,29 @@ def test_extract_integer(input_string, expected):
                           (None, None)])
 def test_extract_decimal(input_string, expected):
     assert extract_decimal(input_string) == expected
+
+
+NUMBER_STRINGS = ["13,44 €", "56.65EUR", "1.234,56", "1,234.56", "test 12,99", None, "", "12\n34", "7"]
+
+
+def test_extract_floats_matches_extract_float():
+    assert extract_floats(NUMBER_STRINGS) == [extract_float(s) for s in NUMBER_STRINGS]
+
+
+def test_extract_integers_matches_extract_integer():
+    assert extract_integers(NUMBER_STRINGS) == [extract_integer(s) for s in NUMBER_STRINGS]
+
+
+def test_extract_floats_invalid_number():
+    with pytest.raises(ValueError):
+        extract_floats(["12,99", "n/a"])
+
+
+def test_extract_numbers_as_array():
+    numpy = pytest.importorskip("numpy")
+    floats = extract_floats(["13,44 €", None], as_array=True)
+    assert floats.dtype == numpy.float64
+    assert floats[0] == 13.44 and numpy.isnan(floats[1])
+    integers = extract_integers(["test123", "543,231 reviews"], as_array=True)
+    assert integers.dtype == numpy.int64
+    assert integers.tolist() == [123, 543231]
@@ -0,0 +1,60 @@
+import csv
+import io
+import json
+
+import pytest
+
+from pyparsy import ArrowWriter, CSVWriter, JSONLinesWriter
+
+
+def test_jsonlines_writer(page, tmp_path):
+    path = tmp_path / "out.jsonl"
+    assert page.parser().parse_to([page.html] * 3, JSONLinesWriter(path)) == 3
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line) for line in lines] == [page.expected()] * 3
+
+
+def test_jsonlines_writer_records_and_file_object(pages):
+    page = pages["google_com"]
+    parser = page.parser(records=True)
+    output = io.StringIO()
+    count = parser.parse_to([page.html] * 3, JSONLinesWriter(output), field="results")
+    items = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert count == len(items) == 3 * len(parser.parse(page.html)["results"])
+    assert items[0] == parser.parse(page.html)["results"][0]
+    assert not output.closed
+
+
+def test_csv_writer_items(pages, tmp_path):
+    page = pages["google_com"]
+    path = tmp_path / "out.csv"
+    page.parser().parse_to([page.html] * 3, CSVWriter(path), field="results")
+    rows = list(csv.DictReader(path.open(encoding="utf-8", newline="")))
+    expected = page.expected()["results"]
+    assert len(rows) == 3 * len(expected)
+    assert rows[0] == {key: value or "" for key, value in expected[0].items()}
+
+
+def test_csv_writer_rejects_nested_definitions(pages, tmp_path):
+    page = pages["google_com"]
+    with pytest.raises(ValueError):
+        page.parser().parse_to([page.html] * 3, CSVWriter(tmp_path / "out.csv"))
+
+
+@pytest.mark.parametrize("format", ["parquet", "ipc"])
+def test_arrow_writer(pages, format, tmp_path):
+    pyarrow = pytest.importorskip("pyarrow")
+    import pyarrow.parquet
+
+    page = pages["amazon_bestseller_de"]
+    path = tmp_path / f"out.{format}"
+    writer = ArrowWriter(path, format=format, batch_size=16)
+    count = page.parser().parse_to([page.html] * 3, writer, field="products")
+    if format == "parquet":
+        table = pyarrow.parquet.read_table(path)
+    else:
+        table = pyarrow.ipc.open_file(pyarrow.memory_map(str(path))).read_all()
+    expected = page.expected()["products"]
+    assert table.num_rows == count == 3 * len(expected)
+    assert table.to_pylist()[: len(expected)] == expected
+    assert table.schema.field("price").type == pyarrow.float64()